@@ -41,6 +41,8 @@ const langConfig = {
             btnSearch: "Investigar",
             resultTitle: "Descrição Técnica",
             resultVector: "Vetor de Ataque (CVSS v3)",
+            resultClass: "Classificação",
+            resultRefs: "Referências",
             resultLink: "Ver no NVD NIST →",
             publishedLabel: "Publicado em:",
             errors: {
@@ -156,9 +158,9 @@ const langConfig = {
             pageTitle: "Mapa de Ameaças | Project Aegis",
             sidebar: "Mapa de Ameaças",
             title: "Mapa Global de Ameaças (AbuseIPDB)",
-            notice: "Os pontos no mapa representam a concentração de IPs maliciosos detectados, com o tamanho do círculo indicando o volume de ocorrências. O mapa é renderizado em 2D usando D3.js e dados simulados de geolocalização.",
+            notice: "Os pontos no mapa representam a concentração de IPs maliciosos detectados, com o tamanho do círculo indicando o volume de ocorrências. O mapa é renderizado em 2D usando D3.js, com cada país posicionado no seu centroide.",
             notice_loaded: "Mapa carregado com sucesso. Passe o mouse sobre os pontos para detalhes.",
-            notice_error: "Erro ao carregar o mapa. Verifique a conexão e o arquivo paises_kpis.json: ",
+            notice_error: "Erro ao carregar o mapa. Verifique a conexão e o arquivo mapa_paises.json: ",
             notice_recent: "AVISO: O mapa exibe apenas os 10.000 registros de IPs maliciosos mais recentes da base de dados, refletindo a atividade do dia de hoje e o histórico mais recente.",
             tooltip: {
                 attacks: "Ataques Registrados"
@@ -208,6 +210,8 @@ const langConfig = {
             btnSearch: "Investigate",
             resultTitle: "Technical Description",
             resultVector: "Attack Vector (CVSS v3)",
+            resultClass: "Classification",
+            resultRefs: "References",
             resultLink: "View on NVD NIST →",
             publishedLabel: "Published on:",
             errors: {
@@ -323,9 +327,9 @@ const langConfig = {
             pageTitle: "Threat Map | Project Aegis",
             sidebar: "Threat Map",
             title: "Global Threat Map (AbuseIPDB)",
-            notice: "The points on the map represent the concentration of detected malicious IPs, with the circle size indicating the volume of occurrences. The map is rendered in 2D using D3.js and simulated geolocation data.",
+            notice: "The points on the map represent the concentration of detected malicious IPs, with the circle size indicating the volume of occurrences. The map is rendered in 2D using D3.js, with each country placed at its centroid.",
             notice_loaded: "Map successfully loaded. Hover over the points for details.",
-            notice_error: "Error loading map. Check connection and paises_kpis.json file: ",
+            notice_error: "Error loading map. Check connection and mapa_paises.json file: ",
             notice_recent: "NOTICE: The map displays only the 10,000 most recent malicious IP records from the database, reflecting today's activity and the latest history.",
             tooltip: {
                 attacks: "Registered Attacks"
@@ -0,0 +1,95 @@
+/* ==================================================================
+   CARREGAMENTO DOS DADOS (dados.js)
+   Compartilhado pelas páginas que leem os datasets:
+   1. manifest.json -> cópias com hash de conteúdo (cache permanente)
+   2. Formato colunar (*.col.json) com reserva para o JSON em linhas
+   ================================================================== */
+
+// Promessa do manifesto: baixado uma única vez por página
+let PROMESSA_MANIFESTO = null;
+
+/**
+ * Carrega o manifest.json gerado por src/scripts/publicacao.py.
+ * @returns {Promise<Object>} nome lógico -> { url, hash, bytes, gz, br }; vazio se não houver manifesto.
+ */
+function carregarManifesto() {
+    if (PROMESSA_MANIFESTO === null) {
+        // no-cache: o navegador pode guardar o manifesto, mas sempre o revalida
+        PROMESSA_MANIFESTO = fetch('manifest.json', { cache: 'no-cache' })
+            .then(response => response.ok ? response.json() : {})
+            .then(manifesto => manifesto.arquivos || {})
+            .catch(() => ({}));
+    }
+    return PROMESSA_MANIFESTO;
+}
+
+/**
+ * Baixa um arquivo de dados do site. Com o manifesto, usa a cópia com hash
+ * (só muda de URL quando o conteúdo muda); sem ele, revalida o arquivo original.
+ * @param {string} nomeArquivo - Nome lógico (ex: 'otx_kpis.json').
+ */
+async function buscarArquivoDados(nomeArquivo) {
+    const arquivos = await carregarManifesto();
+    const entrada = arquivos[nomeArquivo];
+    const response = entrada
+        ? await fetch(entrada.url)
+        : await fetch(nomeArquivo, { cache: 'no-cache' });
+    if (!response.ok) throw new Error(`Erro ao carregar ${nomeArquivo}`);
+    return await response.json();
+}
+
+/**
+ * Reconstrói a lista de registros a partir do formato colunar (*.col.json).
+ * Datas voltam como 'YYYY-MM-DD', como no JSON em linhas; datas inválidas voltam como null.
+ */
+function decodificarColunar(doc) {
+    const nomes = Object.keys(doc.colunas);
+    const colunas = nomes.map(nome => decodificarColuna(doc.colunas[nome]));
+    const registros = new Array(doc.linhas);
+    for (let i = 0; i < doc.linhas; i++) {
+        const item = {};
+        for (let c = 0; c < nomes.length; c++) item[nomes[c]] = colunas[c][i];
+        registros[i] = item;
+    }
+    return registros;
+}
+
+function decodificarColuna(coluna) {
+    switch (coluna.tipo) {
+        case 'texto':
+        case 'numero':
+            return coluna.valores;
+        case 'categoria':
+            return coluna.codigos.map(c => coluna.dicionario[c]);
+        case 'lista_categoria':
+            return coluna.codigos.map(lista => lista.map(c => coluna.dicionario[c]));
+        case 'data': {
+            const base = new Date(coluna.base + "T00:00:00Z").getTime();
+            const textos = new Map(); // poucos dias distintos: converte cada um uma vez
+            return coluna.dias.map(d => {
+                if (d === null) return null;
+                if (!textos.has(d)) textos.set(d, new Date(base + d * 86400000).toISOString().slice(0, 10));
+                return textos.get(d);
+            });
+        }
+        default:
+            throw new Error(`Tipo de coluna desconhecido: ${coluna.tipo}`);
+    }
+}
+
+/**
+ * Busca um dataset preferindo a versão colunar; cai no JSON em linhas se ela não existir.
+ * @param {string} nome - Nome do arquivo sem extensão (ex: 'cve_kpis').
+ */
+async function carregarDataset(nome) {
+    const arquivos = await carregarManifesto();
+    const colunar = `${nome}.col.json`;
+
+    // Com manifesto, ele diz se a versão colunar existe; sem manifesto, tentamos
+    if (arquivos[colunar] || Object.keys(arquivos).length === 0) {
+        try {
+            return decodificarColunar(await buscarArquivoDados(colunar));
+        } catch (e) { console.warn(`${colunar} indisponível, usando ${nome}.json:`, e); }
+    }
+    return await buscarArquivoDados(`${nome}.json`);
+}
@@ -19,6 +19,10 @@ let DADOS_COMPLETOS_HIBP = [];
 let DADOS_COMPLETOS_OTX = []; 
 let DADOS_COMPLETOS_PAISES = []; 
 
+// Agregados pré-calculados pelo pipeline Python (dashboard_summary.json).
+// Quando disponível, o dashboard não precisa baixar nem percorrer os dados brutos.
+let RESUMO_DASHBOARD = null;
+
 // Variável dinâmica para rastrear a data mais recente encontrada em TODOS os dados carregados.
 // Inicializada com 1/1/1970 (Epoch) para garantir que qualquer data real seja mais nova.
 let latestDataDate = new Date(0);
@@ -52,11 +56,15 @@ document.addEventListener('DOMContentLoaded', () => {
     
     // 4. Carga Inicial de Dados (Apenas se houver KPIs - página principal)
     if (document.querySelector('.kpi-grid')) {
-        carregarDadosCVE(); 
-        carregarDadosHIBP();
-        carregarDadosOTX();
-        // O carregamento de Países já inclui a renderização inicial
-        carregarDadosPaises(); 
+        carregarResumoDashboard().then(ok => {
+            if (ok) return;
+            // Sem o resumo, voltamos a calcular tudo a partir dos dados brutos
+            carregarDadosCVE(); 
+            carregarDadosHIBP();
+            carregarDadosOTX();
+            // O carregamento de Países já inclui a renderização inicial
+            carregarDadosPaises(); 
+        });
     }
 });
 
@@ -311,12 +319,31 @@ function updateLatestDataDate(date) {
     }
 }
 
+/**
+ * Carrega os agregados pré-calculados por período.
+ * @returns {Promise<boolean>} true se o resumo foi carregado.
+ */
+async function carregarResumoDashboard() {
+    try {
+        RESUMO_DASHBOARD = await buscarArquivoDados('dashboard_summary.json');
+
+        if (RESUMO_DASHBOARD.ultima_data) {
+            updateLatestDataDate(new Date(RESUMO_DASHBOARD.ultima_data + "T00:00:00"));
+        }
+        console.log(`Sucesso! Resumo do dashboard carregado (dados até ${RESUMO_DASHBOARD.ultima_data}).`);
+        atualizarTelaSePossivel();
+        displayLastUpdateDate();
+        return true;
+    } catch (e) {
+        console.warn("Resumo indisponível, usando dados brutos:", e);
+        RESUMO_DASHBOARD = null;
+        return false;
+    }
+}
+
 async function carregarDadosCVE() {
     try {
-        const response = await fetch(`cve_kpis.json?v=${new Date().getTime()}`);
-        if (!response.ok) throw new Error(`Erro ao carregar cve_kpis.json`);
-        
-        const data = await response.json(); 
+        const data = await carregarDataset('cve_kpis');
         
         let newestDate = latestDataDate;
 
@@ -337,9 +364,7 @@ async function carregarDadosCVE() {
 
 async function carregarDadosHIBP() {
     try {
-        const response = await fetch(`hibp_kpis.json?v=${new Date().getTime()}`);
-        if (!response.ok) throw new Error(`Erro ao carregar hibp_kpis.json`);
-        const data = await response.json();
+        const data = await carregarDataset('hibp_kpis');
         
         let listaBruta = Array.isArray(data) ? data : (data.vazamentos_recentes_tabela || []);
 
@@ -361,9 +386,7 @@ async function carregarDadosHIBP() {
 
 async function carregarDadosOTX() {
     try {
-        const response = await fetch(`otx_kpis.json?v=${new Date().getTime()}`);
-        if (!response.ok) throw new Error(`Erro ao carregar otx_kpis.json`);
-        const data = await response.json();
+        const data = await carregarDataset('otx_kpis');
         
         DADOS_COMPLETOS_OTX = data.map(item => {
             if (item.data_criacao) {
@@ -383,9 +406,7 @@ async function carregarDadosOTX() {
 
 async function carregarDadosPaises() {
     try {
-        const response = await fetch(`paises_kpis.json?v=${new Date().getTime()}`);
-        if (!response.ok) throw new Error(`Erro ao carregar paises_kpis.json`);
-        const data = await response.json();
+        const data = await carregarDataset('paises_kpis');
 
         DADOS_COMPLETOS_PAISES = data.map(item => {
             if (item.data_report && item.data_report !== "N/A") {
@@ -422,13 +443,18 @@ function atualizarTelaSePossivel() {
  */
 function filtrarEAtualizarDashboard(periodo) {
     
-    // 1. Calcular a Data de Corte
-    const agora = new Date();
+    if (RESUMO_DASHBOARD) {
+        atualizarDashboardComResumo(periodo);
+        return;
+    }
+
+    // 1. Calcular a Data de Corte (a partir do registro mais recente, como o resumo pré-calculado)
+    const agora = latestDataDate.getTime() > 0 ? new Date(latestDataDate) : new Date();
     let dias = 30;
     if (periodo === '90d') dias = 90;
     if (periodo === '1ano') dias = 365;
     
-    const dataLimite = new Date();
+    const dataLimite = new Date(agora);
     dataLimite.setDate(agora.getDate() - dias);
 
     // --- ATUALIZAR CVE (NVD) ---
@@ -469,34 +495,11 @@ function filtrarEAtualizarDashboard(periodo) {
         
         // KPI Total Contas
         const totalContas = filtrados.reduce((acc, curr) => acc + (curr.contas_afetadas || 0), 0);
-        let formatado = totalContas.toLocaleString('pt-BR');
-        if (totalContas > 1000000) formatado = (totalContas/1000000).toFixed(1) + " M";
-        else if (totalContas > 1000) formatado = (totalContas/1000).toFixed(1) + " k";
-        
-        const kpiContasEl = document.getElementById('kpi-contas-vazadas');
-        if(kpiContasEl) kpiContasEl.innerText = formatado;
+        atualizarKpiContas(totalContas);
 
         // Tabela Recentes (Apenas na página principal)
-        const tabela = document.querySelector("#tabela-vazamentos tbody");
-        if (tabela) {
-            tabela.innerHTML = '';
-            const topVaz = filtrados.sort((a,b) => b.contas_afetadas - a.contas_afetadas).slice(0, 5);
-            
-            if (topVaz.length === 0) {
-                tabela.innerHTML = `<tr><td colspan="3">${langConfig[idiomaAtual].table.empty}</td></tr>`;
-            } else {
-                const locale = idiomaAtual.replace('_', '-');
-                topVaz.forEach(v => {
-                    const tr = document.createElement('tr');
-                    const dataFmt = v.data_vazamento ? v.data_vazamento.toLocaleDateString(locale) : "N/A";
-                    tr.innerHTML = `
-                        <td><strong>${v.nome_vazamento}</strong><br><span style="font-size:0.8em;color:var(--cor-texto-secundario)">${dataFmt}</span></td>
-                        <td>${v.setor||'N/A'}</td>
-                        <td>${(v.contas_afetadas||0).toLocaleString(locale)}</td>`;
-                    tabela.appendChild(tr);
-                });
-            }
-        }
+        const topVaz = filtrados.sort((a,b) => b.contas_afetadas - a.contas_afetadas).slice(0, 5);
+        renderizarTabelaVazamentos(topVaz);
     }
 
     // --- ATUALIZAR OTX (Ameaças e Setores) ---
@@ -545,6 +548,80 @@ function filtrarEAtualizarDashboard(periodo) {
 }
 
 
+/**
+ * Atualiza todos os componentes a partir dos agregados do dashboard_summary.json,
+ * sem filtrar registros no navegador.
+ * @param {string} periodo - '30d', '90d', ou '1ano'.
+ */
+function atualizarDashboardComResumo(periodo) {
+    const resumo = RESUMO_DASHBOARD.periodos[periodo];
+    if (!resumo) return;
+
+    // --- CVE (NVD) ---
+    const kpiVulnsEl = document.getElementById('kpi-novas-vulns');
+    if(kpiVulnsEl) kpiVulnsEl.innerText = resumo.cve.total.toLocaleString('pt-BR');
+    renderizarGraficoSeveridade(resumo.cve.severidade);
+    renderizarGraficoLinha(resumo.cve.criticas_por_dia);
+    renderizarGraficoVertical('tiposVulnChart', meuGraficoTiposVuln, resumo.cve.top_tipos, langConfig[idiomaAtual].chartLabels.occurrences);
+
+    // --- VAZAMENTOS (HIBP) ---
+    atualizarKpiContas(resumo.hibp.total_contas);
+    renderizarTabelaVazamentos(resumo.hibp.top_vazamentos.map(v => ({
+        ...v,
+        data_vazamento: v.data_vazamento ? new Date(v.data_vazamento + "T00:00:00") : null
+    })));
+
+    // --- OTX (Ameaças e Setores) ---
+    const kpiA = document.getElementById('kpi-ameaca-comum');
+    if(kpiA) kpiA.innerText = Object.keys(resumo.otx.top_ameacas)[0] || "N/A";
+    const kpiS = document.getElementById('kpi-setor-atacado');
+    if(kpiS) kpiS.innerText = Object.keys(resumo.otx.top_setores)[0] || "N/A";
+    renderizarGraficoBarras('setoresChart', meuGraficoSetores, resumo.otx.top_setores, langConfig[idiomaAtual].charts.sectors);
+
+    // --- PAÍSES (AbuseIPDB) ---
+    renderizarGraficoBarras('paisesChart', meuGraficoPaises, resumo.paises.top_paises, langConfig[idiomaAtual].charts.countries);
+}
+
+/**
+ * Formata e exibe o KPI de contas vazadas.
+ * @param {number} totalContas - Soma das contas afetadas no período.
+ */
+function atualizarKpiContas(totalContas) {
+    let formatado = totalContas.toLocaleString('pt-BR');
+    if (totalContas > 1000000) formatado = (totalContas/1000000).toFixed(1) + " M";
+    else if (totalContas > 1000) formatado = (totalContas/1000).toFixed(1) + " k";
+    
+    const kpiContasEl = document.getElementById('kpi-contas-vazadas');
+    if(kpiContasEl) kpiContasEl.innerText = formatado;
+}
+
+/**
+ * Preenche a tabela de maiores vazamentos (Apenas na página principal).
+ * @param {Array} topVaz - Vazamentos já ordenados, com data_vazamento como Date.
+ */
+function renderizarTabelaVazamentos(topVaz) {
+    const tabela = document.querySelector("#tabela-vazamentos tbody");
+    if (!tabela) return;
+    tabela.innerHTML = '';
+    
+    if (topVaz.length === 0) {
+        tabela.innerHTML = `<tr><td colspan="3">${langConfig[idiomaAtual].table.empty}</td></tr>`;
+        return;
+    }
+
+    const locale = idiomaAtual.replace('_', '-');
+    topVaz.forEach(v => {
+        const tr = document.createElement('tr');
+        const dataFmt = v.data_vazamento ? v.data_vazamento.toLocaleDateString(locale) : "N/A";
+        tr.innerHTML = `
+            <td><strong>${v.nome_vazamento}</strong><br><span style="font-size:0.8em;color:var(--cor-texto-secundario)">${dataFmt}</span></td>
+            <td>${v.setor||'N/A'}</td>
+            <td>${(v.contas_afetadas||0).toLocaleString(locale)}</td>`;
+        tabela.appendChild(tr);
+    });
+}
+
+
 // --- FUNÇÕES DE RENDERIZAÇÃO DE GRÁFICOS (Chart.js) ---
 
 function getChartColors() {
@@ -0,0 +1,103 @@
+# Benchmark da busca textual (busca_cves.py): construção, tamanho em disco e latência das consultas
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from itertools import accumulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+os.environ.setdefault("API_OTX", "benchmark")
+
+import busca_cves
+import coletor_cve
+from bench_classificador import medir
+from bench_transformacao import cves_sinteticas
+
+CONSULTAS = [
+    ("sql injection", {}),
+    ("remote code execution", {}),
+    ("remote code execution", {'severidades': ["CRITICAL"]}),
+    ("cross-site scripting", {'desde': "2025-07-01"}),
+    ("denial of service", {'desde': "2025-10-01", 'ate': "2025-10-31"}),
+    ("gain privileges linux kernel", {'todos': True}),
+    ("heap corruption chrome", {'desde': "2025-01-01", 'ate': "2025-12-31"}),
+]
+
+
+def com_vocabulario(itens, palavras=20_000, semente=42):
+    """
+    As descrições do bench_classificador usam ~100 termos; as da NVD, dezenas
+    de milhares. Acrescenta a cada uma um trecho com versões e nomes de
+    componentes sorteados com distribuição de Zipf, para o índice ter um
+    vocabulário e um comprimento de documento próximos dos reais.
+    """
+    aleatorio = random.Random(semente)
+    vocabulario = ["".join(aleatorio.choices(string.ascii_lowercase, k=aleatorio.randint(4, 10)))
+                   for _ in range(palavras)]
+    pesos = list(accumulate(1 / (posicao + 1) for posicao in range(palavras)))
+    for item in itens:
+        componentes = " ".join(aleatorio.choices(vocabulario, cum_weights=pesos, k=aleatorio.randint(5, 30)))
+        versao = f"{aleatorio.randint(1, 20)}.{aleatorio.randint(0, 30)}.{aleatorio.randint(0, 99)}"
+        item['cve']['descriptions'][0]['value'] += f" Affected: {componentes} before {versao}."
+    return itens
+
+
+def varredura(registros, consulta, limite=10, desde=None, ate=None, severidades=None, todos=False):
+    """
+    Sem índice: tokeniza todas as descrições a cada consulta e conta os termos.
+    """
+    pedidos = set(busca_cves.termos(consulta))
+    resultados = []
+    for registro in registros:
+        if (desde and registro['data_publicacao'] < desde) or (ate and registro['data_publicacao'] > ate):
+            continue
+        if severidades and registro['severidade'] not in severidades:
+            continue
+        presentes = pedidos.intersection(busca_cves.termos(registro['descricao']))
+        if presentes and (not todos or presentes == pedidos):
+            resultados.append((len(presentes), registro['cve_id']))
+    return sorted(resultados, reverse=True)[:limite]
+
+
+def tamanho_pasta(pasta):
+    return sum(os.path.getsize(os.path.join(pasta, nome)) for nome in os.listdir(pasta))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o índice de busca textual das CVEs.")
+    parser.add_argument('--cves', type=int, default=250_000, help="CVEs sintéticas (~o histórico da NVD).")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    validos, _ = coletor_cve.transformar_pagina(com_vocabulario(cves_sinteticas(args.cves)))
+    registros = sorted(validos, key=lambda r: (r['data_publicacao'], r['cve_id']))
+    bytes_texto = sum(len(r['descricao'].encode("utf-8")) for r in registros)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        inicio = time.perf_counter()
+        documentos, vocabulario, shards = busca_cves.construir(registros, pasta)
+        construcao = time.perf_counter() - inicio
+        print(f"Construção: {documentos} CVEs, {vocabulario} termos, {shards} shards em {construcao:.1f}s")
+        print(f"Em disco: {tamanho_pasta(pasta):,} bytes (descrições: {bytes_texto:,} bytes)\n")
+
+        # Primeira consulta de um processo novo: manifesto, tabela de documentos e shards
+        inicio = time.perf_counter()
+        busca_cves.IndiceBusca(pasta).buscar(*CONSULTAS[0][:1], **CONSULTAS[0][1])
+        print(f"Primeira consulta (abre o índice): {(time.perf_counter() - inicio) * 1000:.1f} ms\n")
+
+        indice = busca_cves.IndiceBusca(pasta)
+        print(f"{'consulta':<40} {'filtros':<34} {'índice (ms)':>11} {'varredura (ms)':>15} {'razão':>8}")
+        for consulta, filtros in CONSULTAS:
+            t_indice, _ = medir(lambda: indice.buscar(consulta, **filtros), args.repeticoes)
+            t_varredura, _ = medir(lambda: varredura(registros, consulta, **filtros), 1)
+            descricao_filtros = ", ".join(f"{chave}={valor}" for chave, valor in filtros.items()) or "-"
+            print(f"{consulta:<40} {descricao_filtros:<34} {t_indice * 1000:>11.2f} "
+                  f"{t_varredura * 1000:>15.1f} {t_varredura / t_indice:>7.0f}x")
+        print(f"\nShards carregados: {len(indice.shards)} de {shards}")
+
+
+if __name__ == "__main__":
+    main()
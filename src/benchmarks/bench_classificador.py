@@ -0,0 +1,159 @@
+# Micro-benchmark do classificador de CVEs: versão antiga x classificador.py
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from classificador import classificar_descricoes, classificar_lote, classificar_por_cwe, extrair_cwes, extrair_descricao
+
+# ==============================================================================
+# 0. CLASSIFICADOR ANTIGO (cópia fiel, só para comparação)
+# ==============================================================================
+def classificar_vulnerabilidade_antigo(descricao):
+    if not descricao:
+        return 'Outros'
+
+    desc = descricao.lower()
+
+    if 'remote code execution' in desc or 'execute arbitrary code' in desc:
+        return 'RCE (Execução Remota)'
+    elif 'denial of service' in desc or 'dos' in desc:
+        return 'DoS (Negação de Serviço)'
+    elif 'sql injection' in desc:
+        return 'SQL Injection'
+    elif 'cross-site scripting' in desc or 'xss' in desc:
+        return 'XSS'
+    elif 'privilege escalation' in desc or 'gain privileges' in desc:
+        return 'Escalada de Privilégio'
+    elif 'buffer overflow' in desc:
+        return 'Buffer Overflow'
+    else:
+        return 'Outros'
+
+
+# ==============================================================================
+# 1. CORPUS (arquivos brutos da NVD ou sintético)
+# ==============================================================================
+# "Kudos Boards" e "Dossier" reproduzem o falso positivo do antigo 'dos' in desc
+PRODUTOS = ["Microsoft Windows", "Apache HTTP Server", "WordPress plugin", "Linux kernel",
+            "Cisco IOS XE", "Google Chrome", "Jenkins", "GitLab", "HCL Kudos Boards", "Dossier CMS"]
+
+# (modelo de descrição, CWE, peso) — pesos aproximados da distribuição de CWEs
+# publicada pela NVD num ano típico: muitas CVEs caem fora das 6 categorias.
+MODELOS = [
+    ("Cross-site scripting (XSS) in {p} allows injection of arbitrary web script.", "CWE-79", 15),
+    ("{p} is vulnerable to SQL injection through the 'id' parameter.", "CWE-89", 7),
+    ("Out-of-bounds write in {p} could allow memory corruption.", "CWE-787", 6),
+    ("Improper input validation in {p} endpoints leads to information disclosure.", "CWE-20", 5),
+    ("Path traversal in {p} allows reading files outside the web root.", "CWE-22", 5),
+    ("Cross-site request forgery in {p} allows changing the administrator e-mail.", "CWE-352", 5),
+    ("Out-of-bounds read in {p} may disclose sensitive memory.", "CWE-125", 4),
+    ("Use-after-free in {p} allows a remote attacker to potentially exploit heap corruption.", "CWE-416", 4),
+    ("Missing authorization in {p} lets authenticated users access other tenants' documents.", "CWE-862", 4),
+    ("OS command injection in {p} allows attackers to execute arbitrary code as root.", "CWE-78", 3),
+    ("Unrestricted file upload in {p} may lead to remote code execution.", "CWE-434", 3),
+    ("Stack-based buffer overflow in {p} when parsing malformed packets.", "CWE-121", 3),
+    ("NULL pointer dereference in {p} allows attackers to cause a denial of service.", "CWE-476", 3),
+    ("A flaw in {p} allows a local user to gain privileges via a race condition.", "CWE-269", 2),
+    ("{p} allows attackers to cause a denial of service (crash) via malformed input.", "CWE-400", 2),
+    ("Authentication bypass in {p} via a crafted session cookie.", "CWE-287", 2),
+    ("An issue was discovered in {p}. Details are not public.", "NVD-CWE-noinfo", 6),
+    ("A vulnerability in {p} could allow an attacker to execute arbitrary code.", "NVD-CWE-Other", 4),
+]
+
+
+def corpus_sintetico(quantidade, semente=42):
+    aleatorio = random.Random(semente)
+    itens = []
+    for i in range(quantidade):
+        modelo, cwe, _ = aleatorio.choices(MODELOS, weights=[m[2] for m in MODELOS])[0]
+        descricao = modelo.format(p=aleatorio.choice(PRODUTOS))
+        # Parte dos registros chega sem CWE, como acontece na NVD
+        fraquezas = [] if aleatorio.random() < 0.2 else [{'description': [{'lang': 'en', 'value': cwe}]}]
+        itens.append({'cve': {'id': f"CVE-2025-{i:05d}",
+                              'descriptions': [{'lang': 'en', 'value': descricao}],
+                              'weaknesses': fraquezas}})
+    return itens
+
+
+def carregar_arquivos(caminhos):
+    """
+    Aceita respostas da API da NVD salvas em disco ({'vulnerabilities': [...]})
+    ou listas de itens.
+    """
+    itens = []
+    for caminho in caminhos:
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        itens.extend(dados.get('vulnerabilities', []) if isinstance(dados, dict) else dados)
+    return itens
+
+
+def medir(funcao, repeticoes):
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+# ==============================================================================
+# 2. EXECUÇÃO
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara o classificador antigo com o classificador.py.")
+    parser.add_argument('arquivos', nargs='*', help="Respostas da API da NVD em JSON (padrão: corpus sintético).")
+    parser.add_argument('--quantidade', type=int, default=40000,
+                        help="Tamanho do corpus sintético (~1 ano de CVEs).")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    itens = carregar_arquivos(args.arquivos) if args.arquivos else corpus_sintetico(args.quantidade)
+    print(f"Corpus: {len(itens)} CVEs ({sum(1 for i in itens if extrair_cwes(i.get('cve', {})))} com CWE).")
+
+    # Inclui a extração da descrição, como o loop antigo do coletor_cve.py fazia
+    t_antigo, antigos = medir(lambda: [classificar_vulnerabilidade_antigo(extrair_descricao(i.get('cve', {})))
+                                       for i in itens], args.repeticoes)
+    t_novo, novos = medir(lambda: classificar_lote(itens), args.repeticoes)
+
+    # Separa os registros resolvidos pela tabela CWE dos que caem na regex
+    com_cwe = [i for i in itens if classificar_por_cwe(extrair_cwes(i.get('cve', {})))]
+    sem_cwe = [i for i in itens if not classificar_por_cwe(extrair_cwes(i.get('cve', {})))]
+
+    linhas = [("antigo (substrings)", len(itens), t_antigo),
+              ("novo (CWE + descrição)", len(itens), t_novo)]
+    for nome, subconjunto in [("CWE mapeado", com_cwe), ("reserva pela descrição", sem_cwe)]:
+        if not subconjunto:
+            continue
+        t_a, _ = medir(lambda: [classificar_vulnerabilidade_antigo(extrair_descricao(i.get('cve', {})))
+                                for i in subconjunto], args.repeticoes)
+        t_n, _ = medir(lambda: classificar_lote(subconjunto), args.repeticoes)
+        linhas += [(f"  antigo, {nome}", len(subconjunto), t_a),
+                   (f"  novo, {nome}", len(subconjunto), t_n)]
+    if sem_cwe:
+        descricoes = [extrair_descricao(i.get('cve', {})) for i in sem_cwe]
+        t_a, _ = medir(lambda: [classificar_vulnerabilidade_antigo(d) for d in descricoes], args.repeticoes)
+        t_n, _ = medir(lambda: classificar_descricoes(descricoes), args.repeticoes)
+        linhas += [("  antigo, só descrições", len(descricoes), t_a),
+                   ("  novo, só descrições", len(descricoes), t_n)]
+
+    print(f"\n{'versão':<32} {'CVEs':>7} {'tempo (s)':>10} {'CVEs/s':>12}")
+    for nome, quantidade, tempo in linhas:
+        print(f"{nome:<32} {quantidade:>7} {tempo:>10.4f} {quantidade / tempo:>12,.0f}")
+    print(f"\nRazão de vazão (novo / antigo): {t_antigo / t_novo:.2f}x")
+    # O antigo é só uma sequência de 'in' (em C) e erra os limites de palavra;
+    # a reserva correta custa mais: o ganho aqui é de acerto, não de vazão
+    print(f"Resolvidos pela tabela CWE: {len(com_cwe)} de {len(itens)} ({100 * len(com_cwe) / len(itens):.1f}%)")
+
+    divergencias = sum(1 for a, n in zip(antigos, novos) if a != n)
+    print(f"Classificações diferentes da versão antiga: {divergencias} ({100 * divergencias / len(itens):.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
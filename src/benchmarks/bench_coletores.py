@@ -0,0 +1,216 @@
+# Benchmark dos coletores contra as APIs simuladas: tempo, req/s, registros/s e RSS máximo
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import servidor_simulado
+
+PASTA_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+
+# coletor -> (fonte no servidor simulado, tabela com os registros gravados)
+COLETORES = {
+    'coletor_cve': ('nvd', 'cves'),
+    'coletor_otx': ('otx', 'pulsos_otx'),
+    'coletor_paises': ('abuseipdb', 'reports_abuseipdb'),
+    'coletor_vazamentos': ('hibp', 'vazamentos_hibp'),
+}
+
+# Os coletores leem as chaves no import; qualquer valor serve para o servidor simulado
+CHAVES_API = ['API_NVD_CVE', 'API_OTX', 'API_ABUSEIPDB']
+
+MARCADOR = "RESULTADO_BENCH "
+
+# Roda num processo novo por medição: RSS e estado de módulo não vazam entre coletores.
+# O cwd é uma pasta temporária, então dados/ e site/ começam vazios (coleta completa)
+CODIGO = """
+import json, resource, sys, time
+sys.path.insert(0, {pasta!r})
+
+def rss_maximo_kb():
+    # ru_maxrss herda o pico do processo pai (fork antes do exec); VmHWM não
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(l.split()[1]) for l in f if l.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+inicio_import = time.perf_counter()
+import {modulo} as coletor
+from limitador import LimitadorTaxa
+duracao_import = time.perf_counter() - inicio_import
+
+coletor.API_URL = {url!r}
+if not {cotas_reais!r}:
+    # Mede o coletor, não a cota da API real (o servidor simulado tem a sua, --cota)
+    if hasattr(coletor, 'limitador'):
+        coletor.limitador = LimitadorTaxa(quota=1_000_000, periodo=1, capacidade=1_000)
+
+for _ in range({rodadas} - 1):
+    coletor.main([])  # rodadas anteriores: preparam o caminho incremental/304
+antes = coletor.cliente.estatisticas()
+
+inicio = time.perf_counter()
+coletor.main([])
+duracao = time.perf_counter() - inicio
+
+import armazenamento
+con = armazenamento.conectar()
+registros = con.execute("SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+armazenamento.fechar(con)
+depois = coletor.cliente.estatisticas()
+print({marcador!r} + json.dumps({{
+    'duracao_s': duracao,
+    'import_s': duracao_import,
+    'rss_kb': rss_maximo_kb(),
+    'requisicoes': depois['requisicoes'] - antes['requisicoes'],
+    'novas_tentativas': depois['novas_tentativas'] - antes['novas_tentativas'],
+    'tempo_em_backoff_s': depois['tempo_em_backoff_s'] - antes['tempo_em_backoff_s'],
+    'nao_modificados': depois['nao_modificados'] - antes['nao_modificados'],
+    'registros': registros,
+}}))
+"""
+
+
+def medir_coletor(modulo, base, args):
+    """
+    Roda 'modulo' num interpretador novo, numa pasta temporária.
+    Retorna o dicionário impresso pelo processo filho.
+    """
+    fonte, tabela = COLETORES[modulo]
+    codigo = CODIGO.format(
+        pasta=PASTA_SCRIPTS, modulo=modulo, url=base + servidor_simulado.ROTAS[fonte],
+        cotas_reais=args.cotas_reais, rodadas=args.rodadas, tabela=tabela, marcador=MARCADOR,
+    )
+    ambiente = dict(os.environ, **{chave: os.getenv(chave) or "simulada" for chave in CHAVES_API})
+    ambiente.pop('AEGIS_SEM_CACHE', None)
+    if args.base_ips:
+        ambiente['AEGIS_BASE_IPS'] = os.path.abspath(args.base_ips)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=pasta, env=ambiente,
+                                   capture_output=True, text=True)
+    if args.verboso or resultado.returncode != 0:
+        print(resultado.stdout + resultado.stderr)
+    for linha in reversed(resultado.stdout.splitlines()):
+        if linha.startswith(MARCADOR):
+            return json.loads(linha[len(MARCADOR):])
+    raise RuntimeError(f"{modulo} terminou sem resultado (código {resultado.returncode}).")
+
+
+def resumir(medidas, status):
+    """
+    Mediana das repetições + taxas derivadas.
+    """
+    duracao = statistics.median(m['duracao_s'] for m in medidas)
+    requisicoes = statistics.median(m['requisicoes'] for m in medidas)
+    registros = statistics.median(m['registros'] for m in medidas)
+    return {
+        'duracao_s': round(duracao, 3),
+        'import_s': round(statistics.median(m['import_s'] for m in medidas), 3),
+        'requisicoes': requisicoes,
+        'requisicoes_por_s': round(requisicoes / duracao, 1) if duracao else 0.0,
+        'registros': registros,
+        'registros_por_s': round(registros / duracao, 1) if duracao else 0.0,
+        'rss_mb': round(statistics.median(m['rss_kb'] for m in medidas) / 1024, 1),
+        'novas_tentativas': statistics.median(m['novas_tentativas'] for m in medidas),
+        'tempo_em_backoff_s': round(statistics.median(m['tempo_em_backoff_s'] for m in medidas), 2),
+        'nao_modificados': statistics.median(m['nao_modificados'] for m in medidas),
+        'status_servidor': status,
+    }
+
+
+# ==============================================================================
+# HISTÓRICO (comparação entre execuções)
+# ==============================================================================
+def commit_atual():
+    try:
+        resultado = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PASTA_SCRIPTS,
+                                   capture_output=True, text=True, check=True)
+        return resultado.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def carregar_historico(caminho):
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def variacao(atual, anterior):
+    if not anterior:
+        return ""
+    return f"{(atual - anterior) / anterior:+.0%}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede os coletores contra APIs simuladas locais.")
+    parser.add_argument('coletores', nargs='*', help=f"Coletores a medir (padrão: {', '.join(COLETORES)}).")
+    servidor_simulado.adicionar_argumentos(parser)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--rodadas', type=int, default=1,
+                        help="Execuções por medição; só a última é medida (2 = caminho incremental/304). "
+                             "A coluna status conta as respostas de todas as rodadas.")
+    parser.add_argument('--cotas-reais', action='store_true',
+                        help="Mantém os limitadores de taxa e sleeps dos coletores (padrão: desligados).")
+    parser.add_argument('--base-ips', help="Base de faixas de IP para o coletor_paises (AEGIS_BASE_IPS).")
+    parser.add_argument('--historico', help="JSON onde cada execução é acrescentada e comparada com a anterior.")
+    parser.add_argument('--verboso', action='store_true', help="Mostra a saída dos coletores.")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    servidor = servidor_simulado.criar_servidor(args)
+    base = servidor.iniciar()
+    print(f"APIs simuladas em {base} (dados gerados em {time.perf_counter() - inicio:.1f}s) | "
+          f"latência {args.latencia * 1000:.0f} ms, erros {args.erros:.0%}, quedas {args.quedas:.0%}, "
+          f"cota {args.cota or '-'}/{args.periodo:g}s | {args.repeticoes} repetições (mediana)\n")
+
+    parametros = {k: v for k, v in vars(args).items() if k not in ('historico', 'verboso', 'coletores')}
+    historico = carregar_historico(args.historico) if args.historico else []
+    # Só faz sentido comparar com execuções de mesmos parâmetros
+    comparaveis = [h for h in historico if h['parametros'] == parametros]
+    anterior = comparaveis[-1]['resultados'] if comparaveis else {}
+
+    resultados = {}
+    print(f"{'coletor':<20} {'tempo (s)':>9} {'req':>6} {'req/s':>7} {'registros':>10} {'reg/s':>9} "
+          f"{'RSS (MB)':>9} {'retries':>8}  status")
+    try:
+        for modulo in args.coletores or list(COLETORES):
+            fonte = COLETORES[modulo][0]
+            antes = servidor.estatisticas(fonte)[fonte]['status']
+            medidas = [medir_coletor(modulo, base, args) for _ in range(args.repeticoes)]
+            depois = servidor.estatisticas(fonte)[fonte]['status']
+            status = {str(codigo): total - antes.get(codigo, 0) for codigo, total in depois.items()
+                      if total - antes.get(codigo, 0)}
+
+            r = resultados[modulo] = resumir(medidas, status)
+            comparacao = variacao(r['duracao_s'], anterior.get(modulo, {}).get('duracao_s'))
+            print(f"{modulo:<20} {r['duracao_s']:>9.2f} {r['requisicoes']:>6g} {r['requisicoes_por_s']:>7.1f} "
+                  f"{r['registros']:>10g} {r['registros_por_s']:>9.0f} {r['rss_mb']:>9.1f} "
+                  f"{r['novas_tentativas']:>8g}  {status}" + (f"  (tempo {comparacao} vs anterior)" if comparacao else ""))
+    finally:
+        servidor.parar()
+
+    if args.historico:
+        historico.append({
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit_atual(),
+            'python': sys.version.split()[0],
+            'parametros': parametros,
+            'resultados': resultados,
+        })
+        with open(args.historico, "w", encoding="utf-8") as f:
+            json.dump(historico, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados acrescentados a '{args.historico}' ({len(historico)} execuções).")
+
+
+if __name__ == "__main__":
+    main()
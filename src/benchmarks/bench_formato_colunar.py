@@ -0,0 +1,64 @@
+# Compara o JSON em linhas (*.json) com o formato colunar (*.col.json): tamanho e parse
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import formato_colunar
+
+
+def medir(funcao, repeticoes):
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara o JSON em linhas com o formato colunar.")
+    parser.add_argument('--pasta', default="site", help="Pasta com os *_kpis.json (padrão: site).")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'dataset':<18} {'linhas':>7} {'formato':<9} {'bytes':>10} {'gzip':>9} {'parse (ms)':>11}")
+    for nome_arquivo, esquema in formato_colunar.ESQUEMAS.items():
+        caminho = os.path.join(args.pasta, nome_arquivo)
+        if not os.path.exists(caminho):
+            print(f"{nome_arquivo:<18} (arquivo ausente)")
+            continue
+
+        with open(caminho, "r", encoding="utf-8") as f:
+            registros = json.load(f)
+
+        # Exatamente o que o site baixa: o JSON em linhas com o salvar_json padrão
+        # e o colunar compacto
+        linhas = json.dumps(registros, ensure_ascii=False).encode("utf-8")
+        colunar = json.dumps(formato_colunar.codificar(registros, esquema),
+                             ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+        t_linhas, _ = medir(lambda: json.loads(linhas), args.repeticoes)
+        # O parse do colunar inclui a reconstrução das linhas
+        t_colunar, decodificados = medir(lambda: formato_colunar.decodificar(json.loads(colunar)),
+                                         args.repeticoes)
+
+        for formato, dados, tempo in [("linhas", linhas, t_linhas), ("colunar", colunar, t_colunar)]:
+            print(f"{nome_arquivo:<18} {len(registros):>7} {formato:<9} {len(dados):>10,} "
+                  f"{len(gzip.compress(dados)):>9,} {tempo * 1000:>11.2f}")
+
+        # Campos que não são datas ISO (ex: 'N/A') voltam como None
+        datas = [c for c, t in esquema.items() if t == 'data']
+        diferentes = sum(1 for a, b in zip(registros, decodificados)
+                         if any(a.get(c) != b[c] for c in esquema if c not in datas))
+        print(f"{'':<18} redução: {100 * (1 - len(colunar) / len(linhas)):.1f}% "
+              f"| registros diferentes após ida e volta: {diferentes}\n")
+
+
+if __name__ == "__main__":
+    main()
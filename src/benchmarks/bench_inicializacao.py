@@ -0,0 +1,101 @@
+# Custo de inicialização a frio de cada script: tempo de import (-X importtime) e RSS
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+PASTA_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+
+MODULOS = [
+    'coletor_cve', 'coletor_otx', 'coletor_paises', 'coletor_vazamentos',
+    'armazenamento', 'resumo_dashboard', 'publicacao', 'orquestrador',
+]
+# Só para comparação: o que cada coletor pagava antes de ficar sem pandas
+REFERENCIAS = ['pandas']
+
+# Roda num processo novo a cada medição: nada fica em cache de módulos
+CODIGO = """
+import resource, sys
+sys.path.insert(0, {pasta!r})
+{importacao}
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def medir_processo(modulo):
+    """
+    Importa 'modulo' num interpretador novo.
+    Retorna (tempo total do processo em s, RSS máximo em KB, saída do -X importtime).
+    """
+    importacao = f"import {modulo}" if modulo else ""
+    inicio = time.perf_counter()
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODIGO.format(pasta=PASTA_SCRIPTS, importacao=importacao)],
+        capture_output=True, text=True, check=True,
+    )
+    duracao = time.perf_counter() - inicio
+    return duracao, int(resultado.stdout.strip()), resultado.stderr
+
+
+def ler_importtime(saida):
+    """
+    Soma o tempo próprio (self) por pacote raiz a partir da saída do -X importtime.
+    """
+    por_pacote = Counter()
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        campos = linha[len("import time:"):].split("|")
+        try:
+            proprio = int(campos[0])
+        except ValueError:
+            continue  # cabeçalho
+        por_pacote[campos[2].strip().split(".")[0]] += proprio
+    return por_pacote
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o custo de inicialização a frio dos scripts do pipeline.")
+    parser.add_argument('modulos', nargs='*', help=f"Módulos a medir (padrão: {', '.join(MODULOS)}).")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--top', type=int, default=3, help="Pacotes mais pesados listados por módulo.")
+    args = parser.parse_args(argv)
+
+    modulos = args.modulos or MODULOS
+    referencias = []
+    for modulo in REFERENCIAS:
+        try:
+            subprocess.run([sys.executable, "-c", f"import {modulo}"], capture_output=True, check=True)
+            referencias.append(modulo)
+        except subprocess.CalledProcessError:
+            print(f"('{modulo}' não está instalado; linha de referência omitida)")
+
+    # Linha de base: interpretador sem nenhum import do projeto
+    base = [medir_processo(None) for _ in range(args.repeticoes)]
+    tempo_base = statistics.median(d for d, _, _ in base)
+    rss_base = statistics.median(r for _, r, _ in base)
+    # Imports da inicialização do próprio interpretador (site, encodings...) não contam
+    pacotes_base = ler_importtime(base[-1][2])
+
+    print(f"Python {sys.version.split()[0]} | {args.repeticoes} repetições (mediana) | "
+          f"interpretador vazio: {tempo_base * 1000:.0f} ms, {rss_base / 1024:.1f} MB\n")
+    print(f"{'módulo':<20} {'processo (ms)':>14} {'imports (ms)':>13} {'RSS (MB)':>9} {'+RSS (MB)':>10}  mais pesados")
+
+    for modulo in modulos + referencias:
+        medidas = [medir_processo(modulo) for _ in range(args.repeticoes)]
+        duracao = statistics.median(d for d, _, _ in medidas)
+        rss = statistics.median(r for _, r, _ in medidas)
+        pacotes = ler_importtime(medidas[-1][2]) - pacotes_base
+        tempo_imports = sum(pacotes.values()) / 1000
+        pesados = ", ".join(f"{nome} {us / 1000:.0f}ms" for nome, us in pacotes.most_common(args.top))
+
+        rotulo = f"{modulo} (ref.)" if modulo in referencias else modulo
+        print(f"{rotulo:<20} {duracao * 1000:>14.0f} {tempo_imports:>13.0f} {rss / 1024:>9.1f} "
+              f"{(rss - rss_base) / 1024:>10.1f}  {pesados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Benchmark da geolocalização offline: carga da base de faixas e 1 milhão de consultas
+import argparse
+import gzip
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import localizacao_ips
+
+PAISES = ["US", "CN", "RU", "DE", "NL", "FR", "GB", "IN", "BR", "VN", "KR", "JP", "SG", "HK", "ID"]
+
+
+# ==============================================================================
+# 0. BASE SINTÉTICA (mesmo formato do ip2asn-combined.tsv.gz)
+# ==============================================================================
+def texto_ipv4(valor):
+    return socket.inet_ntop(socket.AF_INET, valor.to_bytes(4, "big"))
+
+
+def gerar_base(caminho, faixas, semente):
+    """
+    Divide o espaço IPv4 em 'faixas' blocos contíguos com donos aleatórios,
+    deixando ~10% sem dono (ASN 0), como na base real.
+    """
+    aleatorio = random.Random(semente)
+    cortes = sorted(aleatorio.sample(range(1, 2 ** 32), faixas - 1))
+    limites = [0] + cortes + [2 ** 32]
+    with gzip.open(caminho, "wt", encoding="utf-8") as f:
+        for inicio, proximo in zip(limites, limites[1:]):
+            if aleatorio.random() < 0.1:
+                asn, pais, organizacao = 0, "None", "Not routed"
+            else:
+                asn = aleatorio.randrange(1, 60000)
+                pais, organizacao = aleatorio.choice(PAISES), f"ORG-{asn}"
+            f.write(f"{texto_ipv4(inicio)}\t{texto_ipv4(proximo - 1)}\t{asn}\t{pais}\t{organizacao}\n")
+
+
+# ==============================================================================
+# 1. MEDIÇÕES
+# ==============================================================================
+def medir(rotulo, funcao, quantidade):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"  {rotulo:<38} {duracao:>7.2f}s  {quantidade / duracao / 1e6:>6.2f} M consultas/s")
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a base de faixas de IP offline (localizacao_ips.py).")
+    parser.add_argument('--base', help="Base real (.tsv.gz do ip2asn ou CSV). Padrão: base sintética.")
+    parser.add_argument('--faixas', type=int, default=500_000, help="Faixas da base sintética.")
+    parser.add_argument('--consultas', type=int, default=1_000_000)
+    parser.add_argument('--distintos', type=int, default=10_000,
+                        help="IPs distintos no lote (a blacklist tem ~10.000).")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = args.base
+        if caminho is None:
+            caminho = os.path.join(pasta, "ip2asn-sintetica.tsv.gz")
+            gerar_base(caminho, args.faixas, args.semente)
+
+        inicio = time.perf_counter()
+        base = localizacao_ips.carregar_base(caminho)
+        carga = time.perf_counter() - inicio
+        if base is None:
+            return
+        print(f"Base: {len(base)} faixas carregadas em {carga:.2f}s\n")
+
+        aleatorio = random.Random(args.semente)
+        unicos = [texto_ipv4(aleatorio.getrandbits(32)) for _ in range(args.consultas)]
+        # Lote realista: poucos IPs distintos, muito repetidos
+        amostra = unicos[:args.distintos]
+        repetidos = [aleatorio.choice(amostra) for _ in range(args.consultas)]
+
+        print(f"{args.consultas:,} consultas:")
+        individuais = medir("localizar() - IPs distintos", lambda: [base.localizar(ip) for ip in unicos],
+                            args.consultas)
+        lote = medir("localizar_lote() - IPs distintos", lambda: base.localizar_lote(unicos), args.consultas)
+        medir(f"localizar_lote() - {args.distintos:,} distintos", lambda: base.localizar_lote(repetidos),
+              args.consultas)
+
+        assert individuais == lote
+        localizados = sum(r is not None for r in lote)
+        print(f"\n{localizados / len(lote):.1%} dos IPs encontrados na base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Benchmark da transformação: registro a registro x em lote (transformacao_vetorizada.py)
+# As CVEs só têm o caminho registro a registro (o lote saía 0,8x): a linha delas fica como referência
+import argparse
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+# Os coletores leem as chaves no import; aqui nenhuma requisição é feita
+os.environ.setdefault("API_OTX", "benchmark")
+os.environ.pop("AEGIS_VETORIZADO", None)
+
+import coletor_cve
+import coletor_otx
+import servidor_simulado
+import transformacao_vetorizada
+from bench_classificador import carregar_arquivos, corpus_sintetico, medir
+
+PAGINA_NVD = coletor_cve.PAGE_SIZE
+PAGINA_OTX = coletor_otx.RESULTS_PER_PAGE
+
+
+# ==============================================================================
+# 0. CORPUS
+# ==============================================================================
+def cves_sinteticas(quantidade, semente=42):
+    """
+    Descrições e CWEs do bench_classificador + datas e notas CVSS como as da NVD.
+    """
+    aleatorio = random.Random(semente)
+    itens = corpus_sintetico(quantidade, semente)
+    for item in itens:
+        publicada = datetime(2025, 1, 1) + (datetime(2026, 1, 1) - datetime(2025, 1, 1)) * aleatorio.random()
+        item['cve']['published'] = publicada.strftime(servidor_simulado.FORMATO_DATA)
+        if aleatorio.random() > 0.15:  # ~15% ainda sem nota v3.1
+            severidade, nota = aleatorio.choice(servidor_simulado.SEVERIDADES)
+            item['cve']['metrics'] = {'cvssMetricV31': [{'cvssData': {'baseScore': nota, 'baseSeverity': severidade}}]}
+    return itens
+
+
+def em_paginas(itens, tamanho):
+    return [itens[i:i + tamanho] for i in range(0, len(itens), tamanho)]
+
+
+# ==============================================================================
+# 1. OS DOIS CAMINHOS
+# ==============================================================================
+def cves_escalar(paginas):
+    validos, removidos = [], []
+    for pagina in paginas:
+        v, r = coletor_cve.transformar_pagina(pagina)
+        validos += v
+        removidos += r
+    return validos, removidos
+
+
+def pulsos_escalar(paginas):
+    return [t for pagina in paginas for t in (coletor_otx.transformar_pulso(p) for p in pagina)]
+
+
+def pulsos_em_lote(paginas):
+    return [t for pagina in paginas for t in transformacao_vetorizada.transformar_pulsos(pagina)]
+
+
+# ==============================================================================
+# 2. EXECUÇÃO
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara a transformação registro a registro com a em lote.")
+    parser.add_argument('arquivos', nargs='*', help="Respostas da API da NVD em JSON (padrão: corpus sintético).")
+    parser.add_argument('--cves', type=int, default=100_000, help="CVEs sintéticas (~4 anos da NVD).")
+    parser.add_argument('--pulsos', type=int, default=10_000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if not transformacao_vetorizada.TEM_PANDAS:
+        print("ERRO: o caminho em lote precisa do pandas ('pip install pandas').")
+        return
+    import pandas
+    import numpy
+    print(f"pandas {pandas.__version__}, NumPy {numpy.__version__} | melhor de {args.repeticoes} repetições\n")
+
+    itens = carregar_arquivos(args.arquivos) if args.arquivos else cves_sinteticas(args.cves)
+    paginas_nvd = em_paginas(itens, PAGINA_NVD)
+    pulsos = servidor_simulado.gerar_pulsos(args.pulsos, datetime.now(), random.Random(42))
+    paginas_otx = em_paginas(pulsos, PAGINA_OTX)
+
+    linhas = []
+    tempo, _ = medir(lambda: cves_escalar(paginas_nvd), args.repeticoes)
+    linhas.append(("CVEs, registro a registro", len(itens), tempo, None, True))
+
+    t_base, referencia = medir(lambda: pulsos_escalar(paginas_otx), args.repeticoes)
+    linhas.append(("pulsos, registro a registro", len(pulsos), t_base, None, True))
+    tempo, resultado = medir(lambda: pulsos_em_lote(paginas_otx), args.repeticoes)
+    linhas.append((f"pulsos, em lote ({PAGINA_OTX})", len(pulsos), tempo, t_base, resultado == referencia))
+
+    print(f"{'caminho':<30} {'registros':>10} {'tempo (s)':>10} {'registros/s':>12} {'razão':>7}  saída")
+    for nome, quantidade, tempo, base, igual in linhas:
+        razao = f"{base / tempo:.2f}x" if base else "-"
+        print(f"{nome:<30} {quantidade:>10} {tempo:>10.4f} {quantidade / tempo:>12,.0f} {razao:>7}  "
+              f"{'idêntica' if igual else 'DIFERENTE'}")
+
+
+if __name__ == "__main__":
+    main()
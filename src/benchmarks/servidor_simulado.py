@@ -0,0 +1,363 @@
+# Servidor HTTP local que imita NVD, OTX, AbuseIPDB e HIBP para os benchmarks dos coletores
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+# Rota de cada fonte; a URL completa é http://127.0.0.1:<porta><rota>
+ROTAS = {
+    'nvd': "/rest/json/cves/2.0",
+    'otx': "/api/v1/pulses/subscribed",
+    'abuseipdb': "/api/v2/blacklist",
+    'hibp': "/api/v3/breaches",
+}
+
+# Com --gravacoes, cada fonte lê <pasta>/<fonte>.json: a resposta real salva
+# (ex.: com curl) ou só a lista de itens
+CHAVES_GRAVACAO = {'nvd': 'vulnerabilities', 'otx': 'results', 'abuseipdb': 'data', 'hibp': None}
+
+FORMATO_DATA = '%Y-%m-%dT%H:%M:%S.000'
+
+SEVERIDADES = [("LOW", 3.1), ("MEDIUM", 5.4), ("HIGH", 7.5), ("CRITICAL", 9.8)]
+DESCRICOES = [
+    "Remote code execution via crafted request in the admin panel.",
+    "SQL injection in the login form allows authentication bypass.",
+    "Cross-site scripting (XSS) in the search parameter.",
+    "Buffer overflow in the image parser leads to denial of service.",
+    "Improper privilege management allows local privilege escalation.",
+    "Path traversal allows reading arbitrary files.",
+]
+CWES = ["CWE-79", "CWE-89", "CWE-787", "CWE-22", "CWE-269", "CWE-400", "NVD-CWE-noinfo"]
+SETORES = ["Government", "Finance", "Healthcare", "Technology", "Energy", "Telecommunications"]
+TAGS = ["phishing", "ransomware", "apt", "botnet", "malware", "c2", "stealer", "exploit"]
+PAISES = ["US", "CN", "RU", "DE", "NL", "FR", "GB", "IN", "BR", "VN", "KR", "JP", "SG", "ZA"]
+
+
+# ==============================================================================
+# 1. DADOS SINTÉTICOS (mesmo formato das APIs reais)
+# ==============================================================================
+def gerar_cves(quantidade, agora, aleatorio):
+    cves = []
+    for i in range(quantidade):
+        publicada = agora - timedelta(seconds=aleatorio.randrange(365 * 86400))
+        modificada = min(agora, publicada + timedelta(days=aleatorio.randrange(30)))
+        metricas = {}
+        if aleatorio.random() > 0.15:  # ~15% ainda sem nota v3.1, como na NVD
+            severidade, nota = aleatorio.choice(SEVERIDADES)
+            metricas['cvssMetricV31'] = [{"cvssData": {"baseScore": nota, "baseSeverity": severidade}}]
+        cves.append({"cve": {
+            "id": f"CVE-{publicada.year}-{100000 + i}",
+            "published": publicada.strftime(FORMATO_DATA),
+            "lastModified": modificada.strftime(FORMATO_DATA),
+            "descriptions": [{"lang": "en", "value": aleatorio.choice(DESCRICOES)}],
+            "weaknesses": [{"description": [{"lang": "en", "value": aleatorio.choice(CWES)}]}],
+            "metrics": metricas,
+        }})
+    return cves
+
+
+def gerar_pulsos(quantidade, agora, aleatorio):
+    # Do mais novo para o mais antigo, como a OTX; os últimos passam de 1 ano
+    # para o coletor exercitar a parada pela data limite
+    intervalo = 400 * 86400 / max(1, quantidade)
+    pulsos = []
+    for i in range(quantidade):
+        criado = agora - timedelta(seconds=i * intervalo)
+        pulsos.append({
+            "id": f"{i:024x}",
+            "name": f"Pulso sintético {i}",
+            "created": criado.strftime('%Y-%m-%dT%H:%M:%S.%f'),
+            "modified": criado.strftime('%Y-%m-%dT%H:%M:%S.%f'),
+            "industries": aleatorio.sample(SETORES, aleatorio.randrange(3)),
+            "tags": aleatorio.sample(TAGS, aleatorio.randrange(1, 4)),
+            "countries": aleatorio.sample(PAISES, aleatorio.randrange(2)),
+        })
+    return pulsos
+
+
+def gerar_ips(quantidade, agora, aleatorio):
+    ips = []
+    for i in range(quantidade):
+        if i % 10 == 0:
+            endereco = f"2001:db8:{aleatorio.getrandbits(16):x}::{i:x}"
+        else:
+            endereco = ".".join(str(aleatorio.randrange(1, 255)) for _ in range(4))
+        reportado = agora - timedelta(seconds=aleatorio.randrange(3 * 86400))
+        ips.append({
+            "ipAddress": endereco,
+            "countryCode": aleatorio.choice(PAISES) if aleatorio.random() > 0.05 else None,
+            "abuseConfidenceScore": 100,
+            "lastReportedAt": reportado.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        })
+    return ips
+
+
+def gerar_vazamentos(quantidade, agora, aleatorio):
+    return [{
+        "Name": f"Vazamento{i}",
+        "Title": f"Vazamento {i}",
+        "BreachDate": (agora - timedelta(days=aleatorio.randrange(15 * 365))).strftime('%Y-%m-%d'),
+        "PwnCount": aleatorio.randrange(1000, 50_000_000),
+        "Industry": aleatorio.choice(SETORES),
+    } for i in range(quantidade)]
+
+
+def carregar_gravacao(caminho, fonte):
+    with open(caminho, "r", encoding="utf-8") as f:
+        conteudo = json.load(f)
+    chave = CHAVES_GRAVACAO[fonte]
+    if chave and isinstance(conteudo, dict):
+        conteudo = conteudo.get(chave, [])
+    return conteudo
+
+
+# ==============================================================================
+# 2. SERVIDOR
+# ==============================================================================
+class ServidorSimulado:
+    """
+    Serve as quatro APIs a partir de dados sintéticos (ou gravados), com:
+    - 'latencia' (s) antes de cada resposta;
+    - 'erros' (fração) de respostas 500/502/503 e 'quedas' (fração) de conexões
+      fechadas sem resposta;
+    - cota por fonte de 'cota' requisições a cada 'periodo' s (janela deslizante):
+      acima dela, 429 com Retry-After de 'retry_after' s (cota 0 = sem limite);
+    - ETag em todas as respostas (If-None-Match igual devolve 304).
+    """
+
+    def __init__(self, cves=20_000, pulsos=3_000, ips=10_000, vazamentos=800, latencia=0.0,
+                 erros=0.0, quedas=0.0, cota=0, periodo=1.0, retry_after=1.0, gravacoes=None,
+                 semente=42, porta=0):
+        self.latencia = latencia
+        self.erros = erros
+        self.quedas = quedas
+        self.cota = cota
+        self.periodo = periodo
+        self.retry_after = retry_after
+        self.porta = porta
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+        self._chamadas = {fonte: deque() for fonte in ROTAS}
+        self.requisicoes = Counter()
+        self.status = {fonte: Counter() for fonte in ROTAS}
+        self.bytes_enviados = Counter()
+        self._servidor = None
+
+        agora = datetime.now(timezone.utc).replace(tzinfo=None)
+        geradores = {
+            'nvd': (gerar_cves, cves), 'otx': (gerar_pulsos, pulsos),
+            'abuseipdb': (gerar_ips, ips), 'hibp': (gerar_vazamentos, vazamentos),
+        }
+        self.dados = {}
+        for fonte, (gerar, quantidade) in geradores.items():
+            caminho = os.path.join(gravacoes, f"{fonte}.json") if gravacoes else None
+            if caminho and os.path.exists(caminho):
+                self.dados[fonte] = carregar_gravacao(caminho, fonte)
+            else:
+                self.dados[fonte] = gerar(quantidade, agora, random.Random(f"{semente}-{fonte}"))
+
+        # Filtros de data da NVD viram buscas binárias sobre a data de publicação
+        self.dados['nvd'].sort(key=lambda item: item['cve']['published'])
+        self._publicacoes = [item['cve']['published'][:19] for item in self.dados['nvd']]
+
+    # --- Respostas de cada fonte (status, corpo) ---
+    def responder_nvd(self, q):
+        if 'pubStartDate' in q:
+            i = bisect_left(self._publicacoes, q['pubStartDate'][:19])
+            j = bisect_right(self._publicacoes, q['pubEndDate'][:19])
+            selecionadas = self.dados['nvd'][i:j]
+        elif 'lastModStartDate' in q:
+            inicio, fim = q['lastModStartDate'][:19], q['lastModEndDate'][:19]
+            selecionadas = [item for item in self.dados['nvd']
+                            if inicio <= item['cve']['lastModified'][:19] <= fim]
+        else:
+            selecionadas = self.dados['nvd']
+        inicio = int(q.get('startIndex', 0))
+        tamanho = int(q.get('resultsPerPage', 2000))
+        return 200, {
+            "resultsPerPage": tamanho, "startIndex": inicio, "totalResults": len(selecionadas),
+            "format": "NVD_CVE", "version": "2.0",
+            "vulnerabilities": selecionadas[inicio:inicio + tamanho],
+        }
+
+    def responder_otx(self, q):
+        pulsos = self.dados['otx']
+        if 'modified_since' in q:
+            desde = q['modified_since'][:19]
+            pulsos = [p for p in pulsos if p['modified'][:19] > desde]
+        limite, pagina = int(q.get('limit', 50)), int(q.get('page', 1))
+        inicio = (pagina - 1) * limite
+        proxima = inicio + limite < len(pulsos)
+        return 200, {"results": pulsos[inicio:inicio + limite], "count": len(pulsos),
+                     "next": f"?page={pagina + 1}" if proxima else None, "previous": None}
+
+    def responder_abuseipdb(self, q):
+        limite = int(q.get('limit', 10000))
+        return 200, {"meta": {"generatedAt": datetime.now(timezone.utc).isoformat()},
+                     "data": self.dados['abuseipdb'][:limite]}
+
+    def responder_hibp(self, q):
+        return 200, self.dados['hibp']
+
+    def dentro_da_cota(self, fonte):
+        if not self.cota:
+            return True
+        agora = time.monotonic()
+        with self._trava:
+            chamadas = self._chamadas[fonte]
+            while chamadas and agora - chamadas[0] >= self.periodo:
+                chamadas.popleft()
+            if len(chamadas) >= self.cota:
+                return False
+            chamadas.append(agora)
+            return True
+
+    def sortear(self):
+        # random.Random não é thread-safe para sequências reprodutíveis
+        with self._trava:
+            return self._aleatorio.random()
+
+    def registrar(self, fonte, status, tamanho):
+        with self._trava:
+            self.requisicoes[fonte] += 1
+            self.status[fonte][status] += 1
+            self.bytes_enviados[fonte] += tamanho
+
+    def estatisticas(self, fonte=None):
+        with self._trava:
+            fontes = [fonte] if fonte else list(ROTAS)
+            return {f: {'requisicoes': self.requisicoes[f], 'bytes': self.bytes_enviados[f],
+                        'status': dict(self.status[f])} for f in fontes}
+
+    # --- Ciclo de vida ---
+    def iniciar(self):
+        """
+        Sobe o servidor numa thread e retorna a URL base (sem a rota).
+        """
+        servidor_simulado = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como as APIs reais
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                servidor_simulado.atender(self)
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", self.porta), Manipulador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+
+    def atender(self, manipulador):
+        url = urlparse(manipulador.path)
+        fonte = next((f for f, rota in ROTAS.items() if url.path == rota), None)
+        if fonte is None:
+            return self.enviar(manipulador, None, 404, {"message": "rota desconhecida"})
+
+        if self.latencia:
+            time.sleep(self.latencia)
+        if not self.dentro_da_cota(fonte):
+            return self.enviar(manipulador, fonte, 429, {"message": "Rate limit exceeded"},
+                               {'Retry-After': f"{self.retry_after:g}"})
+        sorteio = self.sortear()
+        if sorteio < self.quedas:
+            self.registrar(fonte, 'queda', 0)
+            manipulador.close_connection = True
+            return  # fecha a conexão sem resposta: o cliente vê um ConnectionError
+        if sorteio < self.quedas + self.erros:
+            status = [500, 502, 503][int(sorteio * 1000) % 3]
+            return self.enviar(manipulador, fonte, status, {"message": "erro injetado"})
+
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        status, corpo = getattr(self, f"responder_{fonte}")(q)
+        self.enviar(manipulador, fonte, status, corpo)
+
+    def enviar(self, manipulador, fonte, status, corpo, cabecalhos=None):
+        conteudo = json.dumps(corpo).encode("utf-8")
+        etag = '"' + hashlib.md5(conteudo).hexdigest() + '"'
+        if status == 200 and manipulador.headers.get('If-None-Match') == etag:
+            status, conteudo = 304, b""
+        if fonte is not None:
+            self.registrar(fonte, status, len(conteudo))
+        manipulador.send_response(status)
+        manipulador.send_header('Content-Type', 'application/json')
+        manipulador.send_header('Content-Length', str(len(conteudo)))
+        if status in (200, 304):
+            manipulador.send_header('ETag', etag)
+        for nome, valor in (cabecalhos or {}).items():
+            manipulador.send_header(nome, valor)
+        manipulador.end_headers()
+        manipulador.wfile.write(conteudo)
+
+
+# ==============================================================================
+# 3. LINHA DE COMANDO
+# ==============================================================================
+def adicionar_argumentos(parser):
+    """
+    Opções do servidor, compartilhadas com o bench_coletores.py.
+    """
+    parser.add_argument('--cves', type=int, default=20_000, help="CVEs sintéticas (último ano).")
+    parser.add_argument('--pulsos', type=int, default=3_000, help="Pulsos OTX sintéticos.")
+    parser.add_argument('--ips', type=int, default=10_000, help="IPs na blacklist sintética.")
+    parser.add_argument('--vazamentos', type=int, default=800, help="Vazamentos HIBP sintéticos.")
+    parser.add_argument('--gravacoes', help="Pasta com nvd.json/otx.json/abuseipdb.json/hibp.json gravados.")
+    parser.add_argument('--latencia', type=float, default=0.05, help="Latência por resposta, em segundos.")
+    parser.add_argument('--erros', type=float, default=0.0, help="Fração de respostas 5xx.")
+    parser.add_argument('--quedas', type=float, default=0.0, help="Fração de conexões fechadas sem resposta.")
+    parser.add_argument('--cota', type=int, default=0, help="Requisições por fonte a cada --periodo (0 = sem limite).")
+    parser.add_argument('--periodo', type=float, default=1.0)
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After das respostas 429, em segundos.")
+    parser.add_argument('--semente', type=int, default=42)
+
+
+def criar_servidor(args, porta=0):
+    return ServidorSimulado(
+        cves=args.cves, pulsos=args.pulsos, ips=args.ips, vazamentos=args.vazamentos,
+        latencia=args.latencia, erros=args.erros, quedas=args.quedas, cota=args.cota,
+        periodo=args.periodo, retry_after=args.retry_after, gravacoes=args.gravacoes,
+        semente=args.semente, porta=porta,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sobe as APIs simuladas para testes manuais dos coletores.")
+    adicionar_argumentos(parser)
+    parser.add_argument('--porta', type=int, default=8099)
+    args = parser.parse_args(argv)
+
+    servidor = criar_servidor(args, args.porta)
+    base = servidor.iniciar()
+    for fonte, rota in ROTAS.items():
+        print(f"  {fonte:<10} {base}{rota}  ({len(servidor.dados[fonte])} itens)")
+    print("Ctrl+C para encerrar.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.parar()
+        print(json.dumps(servidor.estatisticas(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
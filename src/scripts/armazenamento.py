@@ -0,0 +1,692 @@
+# Banco SQLite local: sistema de registro do pipeline
+import argparse
+import json
+import os
+import sqlite3
+from datetime import date, timedelta
+from itertools import chain
+
+import formato_colunar
+import indice_cves
+import indice_ips
+import tabela_paises
+from exportacao import salvar_json_stream, salvar_ndjson
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+CAMINHO_BANCO = os.path.join("dados", "aegis.db")
+PASTA_SITE = "site"
+
+# Janela exportada para o site (o banco guarda todo o histórico)
+DIAS_NO_SITE = 365
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cves (
+    cve_id          TEXT PRIMARY KEY,
+    data_publicacao TEXT NOT NULL,
+    cvss_score      REAL,
+    severidade      TEXT,
+    tipo_falha      TEXT,
+    descricao       TEXT,           -- detalhes: só vão para o índice estático (indice_cves.py)
+    vetor_cvss      TEXT,
+    cwes            TEXT,           -- listas guardadas como JSON
+    referencias     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cves_data_publicacao ON cves (data_publicacao);
+
+-- Shards do índice estático de CVEs a regerar ('AAAA/NNN'), marcados pelos
+-- gatilhos de ESQUEMA_INDICE_CVES e esvaziados por exportar_indice_cves
+CREATE TABLE IF NOT EXISTS cves_shards_pendentes (
+    shard TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS pulsos_otx (
+    pulso_id     TEXT PRIMARY KEY,
+    data_criacao TEXT NOT NULL,
+    setores      TEXT NOT NULL,  -- listas guardadas como JSON
+    ameacas      TEXT NOT NULL,
+    paises       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pulsos_otx_data_criacao ON pulsos_otx (data_criacao);
+
+CREATE TABLE IF NOT EXISTS reports_abuseipdb (
+    ip          TEXT PRIMARY KEY,
+    pais        TEXT,
+    data_report TEXT,
+    coletado_em TEXT NOT NULL,  -- data da blacklist em que o IP apareceu por último
+    asn         INTEGER,        -- da base de faixas offline (localizacao_ips.py)
+    organizacao TEXT,
+    codigo_pais TEXT            -- ISO-3166 ('pais' guarda o nome em inglês)
+);
+CREATE INDEX IF NOT EXISTS idx_reports_abuseipdb_data_report ON reports_abuseipdb (data_report);
+CREATE INDEX IF NOT EXISTS idx_reports_abuseipdb_coletado_em ON reports_abuseipdb (coletado_em);
+
+CREATE TABLE IF NOT EXISTS vazamentos_hibp (
+    nome_vazamento  TEXT PRIMARY KEY,
+    data_vazamento  TEXT,
+    contas_afetadas INTEGER,
+    setor           TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vazamentos_hibp_data_vazamento ON vazamentos_hibp (data_vazamento);
+
+-- Séries diárias de vários anos: uma linha por fonte, dia, dimensão e valor,
+-- mantida pelos gatilhos de ESQUEMA_AGREGADOS (só os dias alterados mudam)
+CREATE TABLE IF NOT EXISTS agregados_diarios (
+    fonte      TEXT NOT NULL,               -- cve, otx, paises, hibp
+    dia        TEXT NOT NULL,               -- YYYY-MM-DD
+    dimensao   TEXT NOT NULL,               -- severidade, tipo_falha, ameaca, setor, pais
+    valor      TEXT NOT NULL,
+    quantidade INTEGER NOT NULL DEFAULT 0,  -- registros no dia
+    soma       INTEGER NOT NULL DEFAULT 0,  -- contas afetadas (hibp)
+    PRIMARY KEY (fonte, dia, dimensao, valor)
+) WITHOUT ROWID;
+"""
+
+# Colunas criadas depois da primeira versão do banco: (tabela, coluna, tipo).
+# O CREATE TABLE acima já as tem; bancos antigos ganham um ALTER TABLE
+COLUNAS_ADICIONADAS = [
+    ("reports_abuseipdb", "asn", "INTEGER"),
+    ("reports_abuseipdb", "organizacao", "TEXT"),
+    ("reports_abuseipdb", "codigo_pais", "TEXT"),
+    ("cves", "descricao", "TEXT"),
+    ("cves", "vetor_cvss", "TEXT"),
+    ("cves", "cwes", "TEXT"),
+    ("cves", "referencias", "TEXT"),
+]
+
+
+# ==============================================================================
+# 0.1 AGREGADOS DIÁRIOS (gatilhos)
+# ==============================================================================
+# Por tabela: fonte, coluna com o dia, colunas agregadas e as dimensões
+# (nome, valor, soma, lista JSON). '{r}' é a linha (new/old nos gatilhos);
+# com lista JSON, cada item da lista é {j}.value, e um item repetido na mesma
+# linha conta uma vez só
+AGREGACOES = {
+    'cves': ('cve', 'data_publicacao', ['severidade', 'tipo_falha'], [
+        ('severidade', '{r}.severidade', '0', None),
+        ('tipo_falha', '{r}.tipo_falha', '0', None),
+    ]),
+    'pulsos_otx': ('otx', 'data_criacao', ['ameacas', 'setores'], [
+        ('ameaca', 'lower(trim({j}.value))', '0', 'ameacas'),
+        ('setor', 'trim({j}.value)', '0', 'setores'),
+    ]),
+    'vazamentos_hibp': ('hibp', 'data_vazamento', ['setor', 'contas_afetadas'], [
+        ('setor', "coalesce({r}.setor, 'N/A')", 'coalesce({r}.contas_afetadas, 0)', None),
+    ]),
+    # A blacklist é uma foto: cada IP só aparece uma vez no banco, e o
+    # data_report dele é sobrescrito. Por isso essa série só acumula: cada
+    # (IP, dia de reporte) novo soma 1 no dia, e nada é descontado depois
+    'reports_abuseipdb': ('paises', 'data_report', ['pais'], [
+        ('pais', 'trim({r}.pais)', '0', None),
+    ]),
+}
+SO_ACUMULA = {'reports_abuseipdb'}
+
+DIA_VALIDO = "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'"
+
+
+def _selecao_agregados(tabela, r, sinal, de_tabela=False):
+    """
+    SELECT das linhas (fonte, dia, dimensao, valor, quantidade, soma) da linha
+    'r' da tabela. de_tabela=True percorre a tabela inteira, com 'r' de alias.
+    """
+    fonte, coluna_dia, _, dimensoes = AGREGACOES[tabela]
+    selecoes = []
+    for dimensao, valor, soma, lista in dimensoes:
+        origens = ([f"{tabela} {r}"] if de_tabela else []) + ([f"json_each({r}.{lista}) j"] if lista else [])
+        repetido = (f" AND NOT EXISTS (SELECT 1 FROM json_each({r}.{lista}) k"
+                    f" WHERE k.key < j.key AND {valor.format(r=r, j='k')} = {valor.format(r=r, j='j')})"
+                    if lista else "")
+        valor, soma = valor.format(r=r, j='j'), soma.format(r=r)
+        selecoes.append(
+            f"SELECT '{fonte}' AS fonte, substr({r}.{coluna_dia}, 1, 10) AS dia, '{dimensao}' AS dimensao, "
+            f"{valor} AS valor, {sinal} AS quantidade, {sinal} * {soma} AS soma"
+            + (f" FROM {', '.join(origens)}" if origens else "")
+            + f" WHERE {r}.{coluna_dia} GLOB {DIA_VALIDO} AND {valor} IS NOT NULL AND {valor} <> ''"
+            + repetido
+        )
+    return " UNION ALL ".join(selecoes)
+
+
+def _somar_agregados(selecao):
+    # 'WHERE true': sem ele o SQLite não distingue o ON CONFLICT de um JOIN
+    return f"""
+        INSERT INTO agregados_diarios (fonte, dia, dimensao, valor, quantidade, soma)
+        SELECT * FROM ({selecao}) WHERE true
+        ON CONFLICT (fonte, dia, dimensao, valor) DO UPDATE SET
+            quantidade = quantidade + excluded.quantidade,
+            soma       = soma + excluded.soma;"""
+
+
+def _limpar_dia(tabela, r):
+    fonte, coluna_dia, _, _ = AGREGACOES[tabela]
+    return f"""
+        DELETE FROM agregados_diarios
+        WHERE fonte = '{fonte}' AND dia = substr({r}.{coluna_dia}, 1, 10) AND quantidade <= 0;"""
+
+
+def _gatilhos_agregados():
+    """
+    INSERT soma a linha nova nos seus dias; DELETE desconta a antiga; UPDATE faz
+    os dois. Cada execução mexe só nos dias das linhas que mudaram.
+    """
+    comandos = []
+    for tabela, (_, coluna_dia, colunas, _) in AGREGACOES.items():
+        comandos.append(f"""
+CREATE TRIGGER IF NOT EXISTS agregar_{tabela}_insert AFTER INSERT ON {tabela} BEGIN
+    {_somar_agregados(_selecao_agregados(tabela, 'new', 1))}
+END;""")
+        if tabela in SO_ACUMULA:
+            comandos.append(f"""
+CREATE TRIGGER IF NOT EXISTS agregar_{tabela}_update AFTER UPDATE ON {tabela}
+WHEN old.{coluna_dia} IS NOT new.{coluna_dia} BEGIN
+    {_somar_agregados(_selecao_agregados(tabela, 'new', 1))}
+END;""")
+            continue
+        # Só quando algo agregado muda: os upserts reescrevem a linha inteira
+        mudou = " OR ".join(f"old.{c} IS NOT new.{c}" for c in [coluna_dia] + colunas)
+        comandos.append(f"""
+CREATE TRIGGER IF NOT EXISTS agregar_{tabela}_update AFTER UPDATE ON {tabela} WHEN {mudou} BEGIN
+    {_somar_agregados(_selecao_agregados(tabela, 'old', -1))}
+    {_limpar_dia(tabela, 'old')}
+    {_somar_agregados(_selecao_agregados(tabela, 'new', 1))}
+END;
+CREATE TRIGGER IF NOT EXISTS agregar_{tabela}_delete AFTER DELETE ON {tabela} BEGIN
+    {_somar_agregados(_selecao_agregados(tabela, 'old', -1))}
+    {_limpar_dia(tabela, 'old')}
+END;""")
+    return "\n".join(comandos)
+
+
+ESQUEMA_AGREGADOS = _gatilhos_agregados()
+
+
+def reconstruir_agregados(con):
+    """
+    Recalcula todas as séries a partir das tabelas (banco anterior aos
+    agregados, ou depois de uma correção manual). A série de países volta a
+    ter só o último dia de reporte de cada IP.
+    """
+    with con:
+        con.execute("DELETE FROM agregados_diarios")
+        for tabela in AGREGACOES:
+            con.execute(f"""
+                INSERT INTO agregados_diarios (fonte, dia, dimensao, valor, quantidade, soma)
+                SELECT fonte, dia, dimensao, valor, SUM(quantidade), SUM(soma)
+                FROM ({_selecao_agregados(tabela, 't', 1, de_tabela=True)})
+                GROUP BY fonte, dia, dimensao, valor
+            """)
+
+
+# ==============================================================================
+# 0.2 ÍNDICE ESTÁTICO DE CVEs (gatilhos)
+# ==============================================================================
+# Qualquer mudança numa CVE marca o shard dela; só esses são regravados
+COLUNAS_INDICE_CVES = ['data_publicacao', 'cvss_score', 'severidade', 'tipo_falha',
+                       'descricao', 'vetor_cvss', 'cwes', 'referencias']
+
+
+def _marcar_shard(r):
+    return f"INSERT OR IGNORE INTO cves_shards_pendentes (shard) VALUES ({indice_cves.expressao_shard(f'{r}.cve_id')});"
+
+
+ESQUEMA_INDICE_CVES = f"""
+CREATE TRIGGER IF NOT EXISTS indice_cves_insert AFTER INSERT ON cves BEGIN
+    {_marcar_shard('new')}
+END;
+CREATE TRIGGER IF NOT EXISTS indice_cves_update AFTER UPDATE ON cves
+WHEN {" OR ".join(f"old.{c} IS NOT new.{c}" for c in COLUNAS_INDICE_CVES)} BEGIN
+    {_marcar_shard('new')}
+END;
+CREATE TRIGGER IF NOT EXISTS indice_cves_delete AFTER DELETE ON cves BEGIN
+    {_marcar_shard('old')}
+END;
+"""
+
+
+def marcar_todos_shards(con):
+    """
+    Marca todos os shards para regravação (índice novo ou apagado).
+    """
+    with con:
+        con.execute(f"""
+            INSERT OR IGNORE INTO cves_shards_pendentes (shard)
+            SELECT DISTINCT {indice_cves.expressao_shard('cve_id')} FROM cves
+        """)
+
+
+def _migrar(con):
+    for tabela, coluna, tipo in COLUNAS_ADICIONADAS:
+        existentes = {linha[1] for linha in con.execute(f"PRAGMA table_info({tabela})")}
+        if coluna not in existentes:
+            try:
+                con.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+            except sqlite3.OperationalError as e:
+                # Outro coletor, em paralelo, migrou primeiro
+                if "duplicate column" not in str(e):
+                    raise
+
+
+def conectar(caminho=CAMINHO_BANCO):
+    """
+    Abre (e cria, se preciso) o banco. O modo WAL e o busy timeout permitem
+    que os coletores, rodando em processos paralelos, gravem no mesmo arquivo.
+    """
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    con = sqlite3.connect(caminho, timeout=60)
+    con.execute("PRAGMA journal_mode=WAL")
+    novo = con.execute("SELECT 1 FROM sqlite_master WHERE name = 'agregados_diarios'").fetchone() is None
+    con.executescript(ESQUEMA)
+    _migrar(con)
+    con.executescript(ESQUEMA_AGREGADOS)
+    con.executescript(ESQUEMA_INDICE_CVES)
+    if novo:
+        # Banco de antes das séries diárias (ou novo em folha): parte do que já existe
+        reconstruir_agregados(con)
+    return con
+
+
+def fechar(con):
+    # Incorpora o WAL ao arquivo principal: só o aegis.db vai para o cache do CI
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    con.close()
+
+
+def data_corte(dias=DIAS_NO_SITE):
+    return (date.today() - timedelta(days=dias)).isoformat()
+
+
+# ==============================================================================
+# 1. UPSERTS (executemany em uma única transação)
+# ==============================================================================
+def salvar_cves(con, registros):
+    with con:
+        con.executemany("""
+            INSERT INTO cves (cve_id, data_publicacao, cvss_score, severidade, tipo_falha,
+                              descricao, vetor_cvss, cwes, referencias)
+            VALUES (:cve_id, :data_publicacao, :cvss_score, :severidade, :tipo_falha,
+                    :descricao, :vetor_cvss, :cwes, :referencias)
+            ON CONFLICT (cve_id) DO UPDATE SET
+                data_publicacao = excluded.data_publicacao,
+                cvss_score      = excluded.cvss_score,
+                severidade      = excluded.severidade,
+                tipo_falha      = excluded.tipo_falha,
+                descricao       = excluded.descricao,
+                vetor_cvss      = excluded.vetor_cvss,
+                cwes            = excluded.cwes,
+                referencias     = excluded.referencias
+        """, ({'descricao': None, 'vetor_cvss': None, **r,
+               'cwes': json.dumps(r.get('cwes') or [], ensure_ascii=False),
+               'referencias': json.dumps(r.get('referencias') or [], ensure_ascii=False)}
+              for r in registros))
+
+
+def remover_cves(con, cve_ids):
+    with con:
+        con.executemany("DELETE FROM cves WHERE cve_id = ?", [(i,) for i in cve_ids])
+
+
+def manter_apenas_cves(con, cve_ids, desde):
+    """
+    Remove as CVEs publicadas a partir de 'desde' que não estão em 'cve_ids'.
+    Usado depois de uma coleta completa bem-sucedida.
+    """
+    with con:
+        con.execute("CREATE TEMP TABLE IF NOT EXISTS cves_recebidas (cve_id TEXT PRIMARY KEY)")
+        con.execute("DELETE FROM cves_recebidas")
+        con.executemany("INSERT OR IGNORE INTO cves_recebidas VALUES (?)", [(i,) for i in cve_ids])
+        con.execute("""
+            DELETE FROM cves
+            WHERE data_publicacao >= ?
+              AND cve_id NOT IN (SELECT cve_id FROM cves_recebidas)
+        """, (desde,))
+
+
+def salvar_pulsos(con, pulsos):
+    with con:
+        con.executemany("""
+            INSERT INTO pulsos_otx (pulso_id, data_criacao, setores, ameacas, paises)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (pulso_id) DO UPDATE SET
+                data_criacao = excluded.data_criacao,
+                setores      = excluded.setores,
+                ameacas      = excluded.ameacas,
+                paises       = excluded.paises
+        """, ((p['pulso_id'], p['data_criacao'],
+               json.dumps(p['setores'], ensure_ascii=False),
+               json.dumps(p['ameacas'], ensure_ascii=False),
+               json.dumps(p['paises'], ensure_ascii=False)) for p in pulsos))
+
+
+def salvar_reports(con, reports, coletado_em):
+    """
+    Aceita qualquer iterável de reports. Retorna o número de linhas gravadas.
+    """
+    with con:
+        cursor = con.executemany("""
+            INSERT INTO reports_abuseipdb (ip, pais, data_report, coletado_em, asn, organizacao, codigo_pais)
+            VALUES (:ip, :pais, :data_report, :coletado_em, :asn, :organizacao, :codigo_pais)
+            ON CONFLICT (ip) DO UPDATE SET
+                pais        = excluded.pais,
+                data_report = excluded.data_report,
+                coletado_em = excluded.coletado_em,
+                asn         = excluded.asn,
+                organizacao = excluded.organizacao,
+                codigo_pais = excluded.codigo_pais
+        """, ({'asn': None, 'organizacao': None, 'codigo_pais': None, **r, 'coletado_em': coletado_em}
+              for r in reports))
+    return cursor.rowcount
+
+
+def salvar_vazamentos(con, vazamentos):
+    """
+    Aceita qualquer iterável de vazamentos. Retorna o número de linhas gravadas.
+    """
+    with con:
+        cursor = con.executemany("""
+            INSERT INTO vazamentos_hibp (nome_vazamento, data_vazamento, contas_afetadas, setor)
+            VALUES (:nome_vazamento, :data_vazamento, :contas_afetadas, :setor)
+            ON CONFLICT (nome_vazamento) DO UPDATE SET
+                data_vazamento  = excluded.data_vazamento,
+                contas_afetadas = excluded.contas_afetadas,
+                setor           = excluded.setor
+        """, vazamentos)
+    return cursor.rowcount
+
+
+# ==============================================================================
+# 2. CONSULTAS (usam os índices de data/chave)
+# ==============================================================================
+# São geradores: as linhas saem do cursor direto para o arquivo, uma por vez
+def consultar_cves(con, desde):
+    cursor = con.execute("""
+        SELECT cve_id, data_publicacao, cvss_score, severidade, tipo_falha
+        FROM cves WHERE data_publicacao >= ?
+        ORDER BY data_publicacao, cve_id
+    """, (desde,))
+    colunas = [c[0] for c in cursor.description]
+    for linha in cursor:
+        yield dict(zip(colunas, linha))
+
+
+def consultar_detalhes_cves(con, ano):
+    """
+    CVEs de um ano (pelo ID, como nos shards) que já têm os detalhes gravados.
+    Bancos anteriores aos detalhes só os ganham quando a CVE é coletada de novo.
+    """
+    cursor = con.execute("""
+        SELECT cve_id, data_publicacao, cvss_score, severidade, tipo_falha,
+               descricao, vetor_cvss, cwes, referencias
+        FROM cves
+        WHERE cve_id >= ? AND cve_id < ? AND descricao IS NOT NULL
+    """, (f"CVE-{ano}-", f"CVE-{ano}."))  # '.' vem logo depois de '-' na tabela ASCII
+    colunas = [c[0] for c in cursor.description]
+    for linha in cursor:
+        registro = dict(zip(colunas, linha))
+        registro['cwes'] = json.loads(registro['cwes'] or '[]')
+        registro['referencias'] = json.loads(registro['referencias'] or '[]')
+        yield registro
+
+
+def consultar_descricoes_cves(con):
+    """
+    CVEs com descrição, em ordem de publicação (a ordem dos documentos do busca_cves.py).
+    """
+    cursor = con.execute("""
+        SELECT cve_id, data_publicacao, severidade, descricao
+        FROM cves
+        WHERE descricao IS NOT NULL
+        ORDER BY data_publicacao, cve_id
+    """)
+    colunas = [c[0] for c in cursor.description]
+    for linha in cursor:
+        yield dict(zip(colunas, linha))
+
+
+def consultar_pulsos(con, desde):
+    cursor = con.execute("""
+        SELECT data_criacao, setores, ameacas, paises
+        FROM pulsos_otx WHERE data_criacao >= ?
+        ORDER BY data_criacao DESC, pulso_id
+    """, (desde,))
+    for data_criacao, setores, ameacas, paises in cursor:
+        # Listas em ordem alfabética: a API devolve as tags em ordem variável
+        yield {
+            "data_criacao": data_criacao,
+            "setores": sorted(json.loads(setores), key=str),
+            "ameacas": sorted(json.loads(ameacas), key=str),
+            "paises": sorted(json.loads(paises), key=str),
+        }
+
+
+def pulsos_existentes(con, pulso_ids):
+    """
+    Devolve o subconjunto de 'pulso_ids' que já está no banco.
+    """
+    existentes = set()
+    ids = list(pulso_ids)
+    # Lotes abaixo do limite de parâmetros do SQLite
+    for inicio in range(0, len(ids), 500):
+        lote = ids[inicio:inicio + 500]
+        marcadores = ", ".join("?" * len(lote))
+        existentes.update(linha[0] for linha in con.execute(
+            f"SELECT pulso_id FROM pulsos_otx WHERE pulso_id IN ({marcadores})", lote))
+    return existentes
+
+
+def consultar_reports(con):
+    # Apenas a blacklist mais recente, como o paises_kpis.json sempre foi.
+    # Os endereços ficam de fora: vão empacotados no ips_blacklist.json
+    cursor = con.execute("""
+        SELECT pais, data_report
+        FROM reports_abuseipdb
+        WHERE coletado_em = (SELECT MAX(coletado_em) FROM reports_abuseipdb)
+        ORDER BY data_report DESC, ip
+    """)
+    for pais, data_report in cursor:
+        yield {"pais": pais, "data_report": data_report}
+
+
+def consultar_ips(con):
+    cursor = con.execute("""
+        SELECT ip FROM reports_abuseipdb
+        WHERE coletado_em = (SELECT MAX(coletado_em) FROM reports_abuseipdb)
+    """)
+    for (ip,) in cursor:
+        yield ip
+
+
+def consultar_mapa_paises(con):
+    # Uma linha por país da blacklist mais recente, já com nomes e centroide
+    cursor = con.execute("""
+        SELECT codigo_pais, COUNT(*) AS ips
+        FROM reports_abuseipdb
+        WHERE coletado_em = (SELECT MAX(coletado_em) FROM reports_abuseipdb) AND codigo_pais IS NOT NULL
+        GROUP BY codigo_pais
+        ORDER BY ips DESC, codigo_pais
+    """)
+    for codigo, ips in cursor:
+        yield tabela_paises.linha_mapa(codigo, ips)
+
+
+def consultar_top_asns(con, limite=5):
+    # Donos de rede mais frequentes na blacklist mais recente
+    return con.execute("""
+        SELECT asn, organizacao, COUNT(*) AS ips
+        FROM reports_abuseipdb
+        WHERE coletado_em = (SELECT MAX(coletado_em) FROM reports_abuseipdb) AND asn IS NOT NULL
+        GROUP BY asn, organizacao
+        ORDER BY ips DESC, asn
+        LIMIT ?
+    """, (limite,)).fetchall()
+
+
+def consultar_vazamentos(con):
+    cursor = con.execute("""
+        SELECT nome_vazamento, data_vazamento, contas_afetadas, setor
+        FROM vazamentos_hibp ORDER BY nome_vazamento
+    """)
+    colunas = [c[0] for c in cursor.description]
+    for linha in cursor:
+        yield dict(zip(colunas, linha))
+
+
+# Séries: leem só agregados_diarios, então custam O(dias), não O(registros)
+PERIODOS_SERIE = {'dia': 10, 'mes': 7, 'ano': 4}  # tamanho do prefixo de 'YYYY-MM-DD'
+TOP_TENDENCIAS = 10
+
+
+def consultar_serie(con, fonte, dimensao, desde=None, ate=None, periodo='dia'):
+    """
+    Série de uma dimensão (ex.: 'cve', 'severidade') entre as datas 'desde' e
+    'ate' (inclusivas), somada por dia, mês ou ano.
+    Gera (periodo, valor, quantidade, soma).
+    """
+    tamanho = PERIODOS_SERIE[periodo]
+    cursor = con.execute(f"""
+        SELECT substr(dia, 1, {tamanho}) AS periodo, valor, SUM(quantidade), SUM(soma)
+        FROM agregados_diarios
+        WHERE fonte = ? AND dia BETWEEN ? AND ? AND dimensao = ?
+        GROUP BY periodo, valor
+        ORDER BY periodo, SUM(quantidade) DESC, valor
+    """, (fonte, desde or '0000-00-00', ate or '9999-12-31', dimensao))
+    yield from cursor
+
+
+def consultar_tendencias(con, top=TOP_TENDENCIAS):
+    """
+    Todo o histórico, mês a mês, dos 'top' valores mais frequentes de cada
+    fonte/dimensão (as tags da OTX, por exemplo, são milhares).
+    """
+    cursor = con.execute("""
+        WITH mensal AS (
+            SELECT fonte, dimensao, substr(dia, 1, 7) AS mes, valor,
+                   SUM(quantidade) AS quantidade, SUM(soma) AS soma
+            FROM agregados_diarios
+            GROUP BY fonte, dimensao, mes, valor
+        ), ranking AS (
+            SELECT fonte, dimensao, valor,
+                   ROW_NUMBER() OVER (PARTITION BY fonte, dimensao ORDER BY SUM(quantidade) DESC, valor) AS posicao
+            FROM mensal
+            GROUP BY fonte, dimensao, valor
+        )
+        SELECT m.fonte, m.dimensao, m.mes, m.valor, m.quantidade, m.soma
+        FROM mensal m JOIN ranking r USING (fonte, dimensao, valor)
+        WHERE r.posicao <= ? AND m.quantidade > 0
+        ORDER BY m.fonte, m.dimensao, m.mes, m.quantidade DESC, m.valor
+    """, (top,))
+    colunas = [c[0] for c in cursor.description]
+    for linha in cursor:
+        yield dict(zip(colunas, linha))
+
+
+# ==============================================================================
+# 3. EXPORTAÇÃO (deriva os *_kpis.json do banco)
+# ==============================================================================
+EXPORTACOES = {
+    'cve_kpis.json': lambda con: consultar_cves(con, data_corte()),
+    'otx_kpis.json': lambda con: consultar_pulsos(con, data_corte()),
+    'paises_kpis.json': consultar_reports,
+    'mapa_paises.json': consultar_mapa_paises,
+    'hibp_kpis.json': consultar_vazamentos,
+    'tendencias.json': consultar_tendencias,
+}
+
+
+def exportar(con, nome_arquivo):
+    """
+    Gera site/<nome_arquivo> a partir do banco (e a versão colunar, se ativa),
+    gravando registro por registro. Retorna o número de registros.
+    """
+    registros = EXPORTACOES[nome_arquivo](con)
+    primeiro = next(registros, None)
+    if primeiro is None:
+        # Banco sem dados: mantém o JSON atual em vez de publicar uma lista vazia
+        return 0
+
+    total = salvar_json_stream(os.path.join(PASTA_SITE, nome_arquivo), chain([primeiro], registros))
+    if formato_colunar.ativo() and nome_arquivo in formato_colunar.ESQUEMAS:
+        # Segunda leitura do banco: as colunas são montadas sem guardar as linhas
+        formato_colunar.salvar(PASTA_SITE, nome_arquivo, EXPORTACOES[nome_arquivo](con))
+    return total
+
+
+def exportar_indice_ips(con):
+    """
+    Gera site/ips_blacklist.json (IPs empacotados + agregados por rede). Retorna o número de IPs.
+    """
+    indice = indice_ips.IndiceIPs.de_enderecos(consultar_ips(con))
+    if len(indice) == 0:
+        return 0
+    indice_ips.salvar(os.path.join(PASTA_SITE, indice_ips.ARQUIVO_SAIDA), indice)
+    return len(indice)
+
+
+def exportar_indice_cves(con, completo=False):
+    """
+    Regrava em site/cves/ os shards marcados como alterados (todos, com
+    'completo' ou se o índice ainda não existe). Lê só os anos desses shards.
+    Retorna (shards regerados, arquivos que mudaram).
+    """
+    if completo or indice_cves.carregar_manifesto() is None:
+        marcar_todos_shards(con)
+    pendentes = {shard for (shard,) in con.execute("SELECT shard FROM cves_shards_pendentes")}
+    if not pendentes:
+        return 0, 0
+
+    por_shard = {}
+    for ano in sorted({shard.split("/")[0] for shard in pendentes}):
+        for registro in consultar_detalhes_cves(con, ano):
+            shard = indice_cves.shard_de(registro['cve_id'])
+            if shard in pendentes:
+                por_shard.setdefault(shard, []).append(registro)
+    alterados = indice_cves.salvar_shards(por_shard, pendentes)
+    with con:
+        con.executemany("DELETE FROM cves_shards_pendentes WHERE shard = ?", [(s,) for s in pendentes])
+    return len(pendentes), alterados
+
+
+def main(argv=None):
+    """
+    Regera todos os *_kpis.json a partir do banco, sem chamar nenhuma API.
+    """
+    parser = argparse.ArgumentParser(description="Regera os datasets do site a partir do banco.")
+    parser.add_argument('--ndjson', metavar='PASTA',
+                        help="Em vez do site, exporta cada dataset como NDJSON (um registro por linha) em PASTA.")
+    parser.add_argument('--reconstruir-agregados', action='store_true',
+                        help="Recalcula as séries diárias a partir das tabelas antes de exportar.")
+    parser.add_argument('--serie', nargs=2, metavar=('FONTE', 'DIMENSAO'),
+                        help="Só mostra uma série (ex.: cve severidade), sem exportar nada.")
+    parser.add_argument('--por', choices=list(PERIODOS_SERIE), default='mes', help="Período da --serie.")
+    parser.add_argument('--desde', help="Data inicial da --serie (YYYY-MM-DD).")
+    parser.add_argument('--indice-cves-completo', action='store_true',
+                        help="Regrava todos os shards do índice de CVEs, não só os alterados.")
+    args = parser.parse_args(argv)
+
+    con = conectar()
+    if args.reconstruir_agregados:
+        reconstruir_agregados(con)
+        print("Séries diárias recalculadas.")
+    if args.serie:
+        for periodo, valor, quantidade, soma in consultar_serie(con, *args.serie, desde=args.desde, periodo=args.por):
+            print(f"{periodo:<10} {valor:<40} {quantidade:>8}" + (f" {soma:>14,}" if soma else ""))
+        fechar(con)
+        return
+    for nome_arquivo, consulta in EXPORTACOES.items():
+        if args.ndjson:
+            caminho = os.path.join(args.ndjson, nome_arquivo[:-len(".json")] + ".ndjson")
+            total = salvar_ndjson(caminho, consulta(con))
+        else:
+            total = exportar(con, nome_arquivo)
+        print(f"{nome_arquivo}: {total} registros exportados.")
+    if not args.ndjson:
+        print(f"{indice_ips.ARQUIVO_SAIDA}: {exportar_indice_ips(con)} IPs indexados.")
+        shards, alterados = exportar_indice_cves(con, completo=args.indice_cves_completo)
+        print(f"Índice de CVEs: {shards} shards regerados, {alterados} arquivos alterados.")
+    fechar(con)
+
+
+if __name__ == "__main__":
+    main()
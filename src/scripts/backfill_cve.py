@@ -0,0 +1,206 @@
+# Backfill do histórico completo da NVD: shards por data de publicação, com checkpoint e retomada
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+import argparse
+import json
+import os
+import time
+
+import armazenamento
+import coletor_cve
+from exportacao import salvar_json
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+# As CVEs mais antigas da NVD têm publicação em 1988
+INICIO_HISTORICO = "1988-01-01"
+# Cada shard é uma consulta por pubDate: no máximo coletor_cve.DIAS_POR_CHAMADA dias
+DIAS_POR_SHARD = 60
+# Shards concluídos (a cota e o cliente HTTP são os do coletor_cve). Fica fora do
+# git, junto com o aegis.db no cache do CI: um não vale sem o outro
+CAMINHO_CHECKPOINT = os.path.join("dados", "backfill_cve.json")
+
+
+# ==============================================================================
+# 1. SHARDS
+# ==============================================================================
+def calcular_shards(desde, ate, dias):
+    """
+    Divide [desde, ate] em blocos de 'dias' dias. Blocos vizinhos dividem a
+    borda (a NVD trata pubEndDate como inclusiva); o upsert por cve_id
+    elimina a duplicata.
+    """
+    shards = []
+    inicio = desde
+    while inicio < ate:
+        fim = min(inicio + timedelta(days=dias), ate)
+        shards.append((inicio, fim))
+        inicio = fim
+    return shards
+
+
+def buscar_shard(inicio, fim):
+    """
+    Busca todas as páginas de um shard e as transforma como o coletor_cve.
+    Retorna (registros válidos, cve_ids sem nota v3.1, CVEs recebidas), ou
+    None se alguma página falhar (o shard fica para a próxima execução).
+    Roda nas threads: não toca no banco.
+    """
+    filtro = {
+        'pubStartDate': inicio.strftime(coletor_cve.FORMATO_DATA_NVD),
+        'pubEndDate': fim.strftime(coletor_cve.FORMATO_DATA_NVD),
+    }
+    validos, removidos = [], []
+    recebidas, total = 0, 1
+    while recebidas < total:
+        data = coletor_cve.buscar_pagina(filtro, recebidas)
+        if data is None:
+            return None
+        pagina = data.get('vulnerabilities', [])
+        total = data.get('totalResults', 0)
+        if not pagina and recebidas < total:
+            print(f"    Página vazia no índice {recebidas} de {total} do bloco {inicio:%Y-%m-%d}.")
+            return None
+        pagina_validos, pagina_removidos = coletor_cve.transformar_pagina(pagina)
+        validos += pagina_validos
+        removidos += pagina_removidos
+        recebidas += len(pagina)
+    return validos, removidos, recebidas
+
+
+# ==============================================================================
+# 2. CHECKPOINT
+# ==============================================================================
+def carregar_checkpoint():
+    try:
+        with open(CAMINHO_CHECKPOINT, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def banco_sem_cves():
+    con = armazenamento.conectar()
+    try:
+        return con.execute("SELECT COUNT(*) FROM cves").fetchone()[0] == 0
+    finally:
+        armazenamento.fechar(con)
+
+
+def formatar_duracao(segundos):
+    segundos = int(segundos)
+    if segundos >= 3600:
+        return f"{segundos // 3600}h{segundos % 3600 // 60:02d}m"
+    return f"{segundos // 60}m{segundos % 60:02d}s"
+
+
+# ==============================================================================
+# 3. EXECUÇÃO
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill retomável do histórico completo de CVEs da NVD.")
+    parser.add_argument('--desde', help=f"Data inicial YYYY-MM-DD (padrão: {INICIO_HISTORICO}, ou a do checkpoint).")
+    parser.add_argument('--dias-por-shard', type=int,
+                        help=f"Dias por shard, até {coletor_cve.DIAS_POR_CHAMADA} (padrão: {DIAS_POR_SHARD}, ou o do checkpoint).")
+    parser.add_argument('--paralelos', type=int, default=coletor_cve.MAX_CONEXOES,
+                        help="Shards buscados ao mesmo tempo; a cota da NVD vale para todos juntos.")
+    parser.add_argument('--reiniciar', action='store_true', help="Descarta o checkpoint e recomeça do início.")
+    args = parser.parse_args(argv)
+
+    print("="*80)
+    print("ATRIBUIÇÃO: Este produto usa dados da NVD API, mas não é endossado ou certificado pela NVD.")
+    print("="*80 + "\n")
+
+    checkpoint = None if args.reiniciar else carregar_checkpoint()
+    if checkpoint and checkpoint['concluidos'] and banco_sem_cves():
+        # Banco novo (ex.: o cache do CI expirou) com checkpoint antigo: os shards "concluídos" não estão nele
+        print("AVISO: checkpoint sem o banco correspondente; recomeçando do início.")
+        checkpoint = None
+    desde = args.desde or (checkpoint or {}).get('desde', INICIO_HISTORICO)
+    dias = args.dias_por_shard or (checkpoint or {}).get('dias_por_shard', DIAS_POR_SHARD)
+    if not 1 <= dias <= coletor_cve.DIAS_POR_CHAMADA:
+        parser.error(f"--dias-por-shard deve ficar entre 1 e {coletor_cve.DIAS_POR_CHAMADA}.")
+
+    if checkpoint is not None and (checkpoint['desde'], checkpoint['dias_por_shard']) != (desde, dias):
+        print("AVISO: o checkpoint é de outros parâmetros; recomeçando do início.")
+        checkpoint = None
+    if checkpoint is None:
+        # O fim fica fixo no checkpoint: ao retomar, os shards são os mesmos.
+        # O que for publicado depois disso é trabalho do coletor incremental
+        checkpoint = {
+            'desde': desde,
+            'ate': datetime.now(timezone.utc).strftime(coletor_cve.FORMATO_DATA_NVD),
+            'dias_por_shard': dias,
+            'concluidos': {},
+        }
+        salvar_json(CAMINHO_CHECKPOINT, checkpoint, indent=2)
+
+    inicio_historico = datetime.strptime(desde, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    ate = datetime.strptime(checkpoint['ate'], coletor_cve.FORMATO_DATA_NVD).replace(tzinfo=timezone.utc)
+    shards = calcular_shards(inicio_historico, ate, dias)
+    concluidos = checkpoint['concluidos']
+    pendentes = [(inicio, fim) for inicio, fim in shards if f"{inicio:%Y-%m-%d}" not in concluidos]
+
+    print(f"--- BACKFILL NVD: {desde} até {ate:%Y-%m-%d}, {len(shards)} shards de {dias} dias ---")
+    print(f"{len(shards) - len(pendentes)} já concluídos, {len(pendentes)} pendentes, {args.paralelos} em paralelo.\n")
+    if not pendentes:
+        print("Nada a fazer: o histórico já foi baixado (use --reiniciar para baixar de novo).")
+        return
+
+    con = armazenamento.conectar()
+    # Sem 'with': ao interromper, os shards ainda na fila são cancelados em vez de esperados
+    pool = ThreadPoolExecutor(max_workers=args.paralelos)
+    inicio_execucao = time.monotonic()
+    feitos, falhas, cves_gravadas = 0, 0, 0
+    try:
+        futuros = {pool.submit(buscar_shard, inicio, fim): (inicio, fim) for inicio, fim in pendentes}
+        for futuro in as_completed(futuros):
+            inicio, fim = futuros[futuro]
+            resultado = futuro.result()
+            if resultado is None:
+                falhas += 1
+                print(f"  FALHA no shard {inicio:%Y-%m-%d} → {fim:%Y-%m-%d}; fica para a próxima execução.")
+                continue
+
+            validos, removidos, recebidas = resultado
+            armazenamento.salvar_cves(con, validos)
+            armazenamento.remover_cves(con, removidos)
+            # Checkpoint só depois da gravação: se cair antes, o shard é refeito (o upsert é idempotente)
+            concluidos[f"{inicio:%Y-%m-%d}"] = {'recebidas': recebidas, 'validas': len(validos)}
+            salvar_json(CAMINHO_CHECKPOINT, checkpoint, indent=2)
+            feitos += 1
+            cves_gravadas += len(validos)
+
+            decorrido = time.monotonic() - inicio_execucao
+            restantes = len(pendentes) - feitos - falhas
+            eta = decorrido / feitos * restantes
+            print(f"[{len(concluidos):>{len(str(len(shards)))}}/{len(shards)}] "
+                  f"{inicio:%Y-%m-%d} → {fim:%Y-%m-%d}: {recebidas} CVEs, {len(validos)} com CVSS v3.1 | "
+                  f"{len(concluidos) / len(shards):.0%} | {formatar_duracao(decorrido)} decorridos, "
+                  f"ETA {formatar_duracao(eta)}")
+    except KeyboardInterrupt:
+        print("\nInterrompido: os shards concluídos estão no checkpoint; rode de novo para retomar.")
+        raise
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        coletor_cve.cliente.imprimir_resumo()
+        try:
+            if feitos:
+                armazenamento.exportar(con, coletor_cve.ARQUIVO_SAIDA)
+                armazenamento.exportar(con, 'tendencias.json')
+                regerados, _ = armazenamento.exportar_indice_cves(con)
+                print(f"Índice de CVEs: {regerados} shard(s) regerado(s).")
+        finally:
+            armazenamento.fechar(con)
+
+    print(f"\n{feitos} shards baixados nesta execução ({cves_gravadas} CVEs com CVSS v3.1) "
+          f"em {formatar_duracao(time.monotonic() - inicio_execucao)}.")
+    if falhas:
+        print(f"AVISO: {falhas} shards falharam; rode de novo para retomar de onde parou.")
+    else:
+        print(f"Histórico completo: {len(shards)} shards concluídos.")
+
+
+if __name__ == "__main__":
+    main()
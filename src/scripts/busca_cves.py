@@ -0,0 +1,483 @@
+# Busca textual nas descrições das CVEs: índice invertido pré-construído, em shards por faixa de termos
+import argparse
+import json
+import math
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from heapq import nlargest
+from itertools import accumulate
+
+from exportacao import salvar_bytes, salvar_json
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+# Derivado do aegis.db (reconstruído em segundos): fica fora do git
+PASTA_BUSCA = os.path.join("dados", "busca_cves")
+ARQUIVO_MANIFESTO = "manifesto.json"
+ARQUIVO_DOCUMENTOS = "documentos.json"
+# Muda quando o formato dos shards ou a tokenização mudam: índice de outra versão é reconstruído
+VERSAO = 1
+
+# Shards de termos: um shard fecha quando as listas de ocorrências passam disso
+BYTES_POR_SHARD = 256 * 1024
+# Ocorrências por bloco; cada bloco guarda as diferenças com a menor largura que cabe
+TAMANHO_BLOCO = 128
+MAGICO = b"AEGB"
+
+# BM25 (valores usuais)
+K1 = 1.2
+B = 0.75
+
+SEVERIDADES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+# ==============================================================================
+# 1. TOKENIZAÇÃO
+# ==============================================================================
+PADRAO_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Palavras de ligação do inglês (as descrições da NVD são em inglês)
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers him his how i if in into is it its itself just may me might more most must my
+no nor not now of off on once only or other our out over own same she should so some such than that
+the their them then there these they this those through to too under until up upon very via was we
+were what when where which while who whom why will with within without would you your
+""".split())
+
+_VOGAIS = frozenset("aeiou")
+# token -> termo: o vocabulário das descrições é pequeno perto do número de tokens
+_CACHE_TERMOS = {}
+
+
+def _consoante(palavra, i):
+    if palavra[i] in _VOGAIS:
+        return False
+    if palavra[i] == 'y':
+        return i == 0 or not _consoante(palavra, i - 1)
+    return True
+
+
+def _medida(radical):
+    """
+    Quantas sequências vogal-consoante o radical tem (o 'm' do Porter).
+    """
+    m, anterior_vogal = 0, False
+    for i in range(len(radical)):
+        consoante = _consoante(radical, i)
+        if consoante and anterior_vogal:
+            m += 1
+        anterior_vogal = not consoante
+    return m
+
+
+def _tem_vogal(radical):
+    return any(not _consoante(radical, i) for i in range(len(radical)))
+
+
+def _consoante_dupla(palavra):
+    return len(palavra) >= 2 and palavra[-1] == palavra[-2] and _consoante(palavra, len(palavra) - 1)
+
+
+def _cvc(palavra):
+    # consoante-vogal-consoante, com a última diferente de w, x e y ('hop', não 'snow')
+    return (len(palavra) >= 3 and _consoante(palavra, len(palavra) - 3)
+            and not _consoante(palavra, len(palavra) - 2) and _consoante(palavra, len(palavra) - 1)
+            and palavra[-1] not in "wxy")
+
+
+# Passos 2 a 4 do Porter: (sufixo, troca); a primeira terminação que casa decide
+_PASSO_2 = [("ational", "ate"), ("tional", "tion"), ("enci", "ence"), ("anci", "ance"), ("izer", "ize"),
+            ("bli", "ble"), ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous"),
+            ("ization", "ize"), ("ation", "ate"), ("ator", "ate"), ("alism", "al"), ("iveness", "ive"),
+            ("fulness", "ful"), ("ousness", "ous"), ("aliti", "al"), ("iviti", "ive"), ("biliti", "ble")]
+_PASSO_3 = [("icate", "ic"), ("ative", ""), ("alize", "al"), ("iciti", "ic"), ("ical", "ic"),
+            ("ful", ""), ("ness", "")]
+_PASSO_4 = ["al", "ance", "ence", "er", "ic", "able", "ible", "ant", "ement", "ment", "ent", "ion",
+            "ou", "ism", "ate", "iti", "ous", "ive", "ize"]
+
+
+def _trocar_sufixo(palavra, regras, medida_minima):
+    for sufixo, troca in regras:
+        if palavra.endswith(sufixo):
+            radical = palavra[:-len(sufixo)]
+            return radical + troca if _medida(radical) > medida_minima else palavra
+    return palavra
+
+
+def radical(palavra):
+    """
+    Stemmer de Porter (inglês): 'injection', 'injected' e 'injecting' viram 'inject'.
+    """
+    if len(palavra) <= 2:
+        return palavra
+
+    # Passo 1a: plurais
+    if palavra.endswith("sses") or palavra.endswith("ies"):
+        palavra = palavra[:-2]
+    elif palavra.endswith("s") and not palavra.endswith("ss"):
+        palavra = palavra[:-1]
+
+    # Passo 1b: -eed, -ed, -ing
+    if palavra.endswith("eed"):
+        if _medida(palavra[:-3]) > 0:
+            palavra = palavra[:-1]
+    else:
+        for sufixo in ("ed", "ing"):
+            if palavra.endswith(sufixo) and _tem_vogal(palavra[:-len(sufixo)]):
+                palavra = palavra[:-len(sufixo)]
+                if palavra.endswith(("at", "bl", "iz")):
+                    palavra += "e"
+                elif _consoante_dupla(palavra) and palavra[-1] not in "lsz":
+                    palavra = palavra[:-1]
+                elif _medida(palavra) == 1 and _cvc(palavra):
+                    palavra += "e"
+                break
+
+    # Passo 1c: y final depois de vogal vira i
+    if palavra.endswith("y") and _tem_vogal(palavra[:-1]):
+        palavra = palavra[:-1] + "i"
+
+    palavra = _trocar_sufixo(palavra, _PASSO_2, 0)
+    palavra = _trocar_sufixo(palavra, _PASSO_3, 0)
+
+    # Passo 4: -ion só sai depois de s ou t ('injection', não 'onion')
+    for sufixo in _PASSO_4:
+        if palavra.endswith(sufixo):
+            resto = palavra[:-len(sufixo)]
+            if _medida(resto) > 1 and (sufixo != "ion" or resto.endswith(("s", "t"))):
+                palavra = resto
+            break
+
+    # Passo 5: e final e ll
+    if palavra.endswith("e"):
+        resto = palavra[:-1]
+        if _medida(resto) > 1 or (_medida(resto) == 1 and not _cvc(resto)):
+            palavra = resto
+    if palavra.endswith("ll") and _medida(palavra) > 1:
+        palavra = palavra[:-1]
+    return palavra
+
+
+def termos(texto):
+    """
+    Termos indexáveis do texto, na ordem: minúsculas, sem stop words nem
+    tokens de um caractere. Tokens com dígitos ('log4j', '2021') não passam
+    pelo stemmer.
+    """
+    resultado = []
+    for token in PADRAO_TOKEN.findall((texto or "").lower()):
+        if len(token) < 2 or token in STOP_WORDS:
+            continue
+        if not token.isalpha():
+            resultado.append(token)
+            continue
+        termo = _CACHE_TERMOS.get(token)
+        if termo is None:
+            termo = _CACHE_TERMOS[token] = radical(token)
+        resultado.append(termo)
+    return resultado
+
+
+# ==============================================================================
+# 2. LISTAS DE OCORRÊNCIAS (postings)
+# ==============================================================================
+# Código do array com 4 bytes por item ('I' em quase toda plataforma)
+_TIPO_32 = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def _little_endian(valores):
+    if sys.byteorder != "little":
+        valores.byteswap()
+    return valores
+
+
+def codificar_ocorrencias(documentos, frequencias):
+    """
+    Documentos (crescentes) viram diferenças entre vizinhos, gravadas em blocos
+    de TAMANHO_BLOCO com a menor largura que cabe (1, 2 ou 4 bytes, indicada
+    no primeiro byte do bloco). As frequências vêm no fim, um byte cada (até 255).
+    """
+    diferencas = [documentos[0]] + [b - a for a, b in zip(documentos, documentos[1:])]
+    partes = []
+    for inicio in range(0, len(diferencas), TAMANHO_BLOCO):
+        bloco = diferencas[inicio:inicio + TAMANHO_BLOCO]
+        maior = max(bloco)
+        tipo = 'B' if maior < 1 << 8 else 'H' if maior < 1 << 16 else _TIPO_32
+        valores = _little_endian(array(tipo, bloco))
+        partes.append(bytes([valores.itemsize]))
+        partes.append(valores.tobytes())
+    partes.append(array('B', [min(f, 255) for f in frequencias]).tobytes())
+    return b"".join(partes)
+
+
+_TIPO_POR_LARGURA = {1: 'B', 2: 'H', 4: _TIPO_32}
+
+
+def decodificar_ocorrencias(dados, quantidade):
+    """
+    Inverso de codificar_ocorrencias: (documentos, frequências).
+    """
+    diferencas = []
+    posicao = 0
+    for inicio in range(0, quantidade, TAMANHO_BLOCO):
+        n = min(TAMANHO_BLOCO, quantidade - inicio)
+        largura = dados[posicao]
+        valores = array(_TIPO_POR_LARGURA[largura])
+        valores.frombytes(dados[posicao + 1:posicao + 1 + n * largura])
+        diferencas += _little_endian(valores)
+        posicao += 1 + n * largura
+    return list(accumulate(diferencas)), dados[posicao:posicao + quantidade]
+
+
+# ==============================================================================
+# 3. CONSTRUÇÃO
+# ==============================================================================
+def construir(registros, pasta=PASTA_BUSCA):
+    """
+    Constrói o índice a partir de dicts com cve_id, data_publicacao,
+    severidade e descricao, já ordenados por data de publicação: o número de
+    cada documento segue a data, e o filtro de datas vira uma faixa de números.
+    Retorna (documentos, termos, shards).
+    """
+    cve_ids, datas, severidades, comprimentos = [], [], [], []
+    ocorrencias = {}  # termo -> (array de documentos, array de frequências)
+    for documento, registro in enumerate(registros):
+        cve_ids.append(registro['cve_id'])
+        datas.append(registro['data_publicacao'])
+        severidades.append(SEVERIDADES.index(registro['severidade'])
+                           if registro['severidade'] in SEVERIDADES else -1)
+        contagem = Counter(termos(registro['descricao']))
+        comprimentos.append(sum(contagem.values()))
+        for termo, frequencia in contagem.items():
+            lista = ocorrencias.get(termo)
+            if lista is None:
+                lista = ocorrencias[termo] = (array(_TIPO_32), array(_TIPO_32))
+            lista[0].append(documento)
+            lista[1].append(frequencia)
+
+    # Shards por faixa de termos em ordem alfabética: a consulta só abre os
+    # shards dos termos pedidos
+    shards, atual, tamanho = [], {}, 0
+    for termo in sorted(ocorrencias):
+        documentos, frequencias = ocorrencias[termo]
+        atual[termo] = codificar_ocorrencias(documentos, frequencias)
+        tamanho += len(atual[termo])
+        if tamanho >= BYTES_POR_SHARD:
+            shards.append(atual)
+            atual, tamanho = {}, 0
+    if atual:
+        shards.append(atual)
+
+    nomes = []
+    for numero, shard in enumerate(shards):
+        nome = f"{numero:04d}.bin"
+        _salvar_shard(os.path.join(pasta, nome), shard, ocorrencias)
+        nomes.append([next(iter(shard)), nome])
+
+    salvar_json(os.path.join(pasta, ARQUIVO_DOCUMENTOS), {
+        "cve_ids": cve_ids,
+        "datas": datas,
+        "severidades": severidades,
+        "comprimentos": comprimentos,
+    }, separators=(",", ":"))
+    # O manifesto vai por último: até ele ser trocado, vale o índice anterior
+    salvar_json(os.path.join(pasta, ARQUIVO_MANIFESTO), {
+        "versao": VERSAO,
+        "documentos": len(cve_ids),
+        "comprimento_medio": sum(comprimentos) / len(comprimentos) if comprimentos else 0.0,
+        "shards": nomes,
+    }, indent=1)
+    # Shards que sobraram de um índice maior
+    for nome in os.listdir(pasta):
+        if nome.endswith(".bin") and nome not in {n for _, n in nomes}:
+            os.remove(os.path.join(pasta, nome))
+    return len(cve_ids), len(ocorrencias), len(nomes)
+
+
+def _salvar_shard(caminho, shard, ocorrencias):
+    """
+    MAGICO, tamanho do cabeçalho (uint32), cabeçalho JSON {termo: [docs, início, tamanho]}
+    e as listas de ocorrências em sequência.
+    """
+    cabecalho, inicio = {}, 0
+    for termo, dados in shard.items():
+        cabecalho[termo] = [len(ocorrencias[termo][0]), inicio, len(dados)]
+        inicio += len(dados)
+    texto = json.dumps(cabecalho, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    salvar_bytes(caminho, MAGICO + struct.pack("<I", len(texto)) + texto + b"".join(shard.values()))
+
+
+# ==============================================================================
+# 4. CONSULTA
+# ==============================================================================
+class IndiceBusca:
+    """
+    Consulta ao índice em disco. A tabela de documentos é lida na primeira
+    consulta; cada shard, só quando um termo dele é pedido, e fica em memória.
+
+        indice = IndiceBusca()
+        indice.buscar("remote code execution", desde="2024-01-01", severidades=["CRITICAL"])
+    """
+
+    def __init__(self, pasta=PASTA_BUSCA):
+        self.pasta = pasta
+        with open(os.path.join(pasta, ARQUIVO_MANIFESTO), "r", encoding="utf-8") as f:
+            self.manifesto = json.load(f)
+        if self.manifesto.get('versao') != VERSAO:
+            raise ValueError(f"Índice de busca da versão {self.manifesto.get('versao')}; "
+                             f"reconstrua com 'busca_cves.py --construir'.")
+        self.primeiros_termos = [primeiro for primeiro, _ in self.manifesto['shards']]
+        self.shards = {}
+        self.documentos = None
+
+    def _carregar_documentos(self):
+        with open(os.path.join(self.pasta, ARQUIVO_DOCUMENTOS), "r", encoding="utf-8") as f:
+            self.documentos = json.load(f)
+        # Parte do BM25 que só depende do documento, calculada uma vez
+        media = self.manifesto['comprimento_medio'] or 1.0
+        self.normas = [K1 * (1 - B + B * c / media) for c in self.documentos['comprimentos']]
+
+    def _shard(self, termo):
+        posicao = bisect_right(self.primeiros_termos, termo) - 1
+        if posicao < 0:
+            return None
+        nome = self.manifesto['shards'][posicao][1]
+        if nome not in self.shards:
+            with open(os.path.join(self.pasta, nome), "rb") as f:
+                dados = f.read()
+            if dados[:4] != MAGICO:
+                raise ValueError(f"Shard inválido: {nome}")
+            (tamanho,) = struct.unpack_from("<I", dados, 4)
+            cabecalho = json.loads(dados[8:8 + tamanho])
+            self.shards[nome] = (cabecalho, memoryview(dados)[8 + tamanho:])
+        return self.shards[nome]
+
+    def ocorrencias(self, termo):
+        """
+        (documentos, frequências) de um termo já normalizado; listas vazias se não existir.
+        """
+        shard = self._shard(termo)
+        if shard is None or termo not in shard[0]:
+            return [], b""
+        cabecalho, dados = shard
+        quantidade, inicio, tamanho = cabecalho[termo]
+        return decodificar_ocorrencias(dados[inicio:inicio + tamanho], quantidade)
+
+    def buscar(self, consulta, limite=10, desde=None, ate=None, severidades=None, todos=False):
+        """
+        As 'limite' CVEs mais relevantes (BM25) para a consulta em texto livre.
+        desde/ate: datas de publicação YYYY-MM-DD (inclusivas); severidades:
+        lista de LOW/MEDIUM/HIGH/CRITICAL; todos=True exige todos os termos.
+        Retorna dicts com cve_id, data_publicacao, severidade e pontuacao.
+        """
+        if self.documentos is None:
+            self._carregar_documentos()
+        datas = self.documentos['datas']
+        # Os documentos estão em ordem de data: o filtro é uma faixa de números
+        primeiro = bisect_left(datas, desde) if desde else 0
+        ultimo = bisect_right(datas, ate) if ate else len(datas)
+        codigos = None
+        if severidades:
+            codigos = {SEVERIDADES.index(s.upper()) for s in severidades if s.upper() in SEVERIDADES}
+
+        pedidos = sorted(set(termos(consulta)))
+        total = self.manifesto['documentos']
+        pontuacoes, encontrados = {}, Counter()
+        for termo in pedidos:
+            documentos, frequencias = self.ocorrencias(termo)
+            if not documentos:
+                if todos:
+                    return []
+                continue
+            idf = math.log(1 + (total - len(documentos) + 0.5) / (len(documentos) + 0.5))
+            inicio, fim = bisect_left(documentos, primeiro), bisect_left(documentos, ultimo)
+            # Laço quente: nomes locais e o peso do termo calculado uma vez
+            peso, normas, anterior = idf * (K1 + 1), self.normas, pontuacoes.get
+            for documento, frequencia in zip(documentos[inicio:fim], frequencias[inicio:fim]):
+                pontuacoes[documento] = anterior(documento, 0.0) + peso * frequencia / (frequencia + normas[documento])
+            if todos:
+                encontrados.update(documentos[inicio:fim])
+
+        candidatos = pontuacoes
+        if todos:
+            candidatos = [d for d in candidatos if encontrados[d] == len(pedidos)]
+        severidade_de = self.documentos['severidades']
+        if codigos is not None:
+            candidatos = [d for d in candidatos if severidade_de[d] in codigos]
+        melhores = [(d, pontuacoes[d]) for d in nlargest(limite, candidatos, key=pontuacoes.__getitem__)]
+
+        cve_ids = self.documentos['cve_ids']
+        return [{
+            "cve_id": cve_ids[documento],
+            "data_publicacao": datas[documento],
+            "severidade": SEVERIDADES[severidade_de[documento]] if severidade_de[documento] >= 0 else "N/A",
+            "pontuacao": round(pontuacao, 4),
+        } for documento, pontuacao in melhores]
+
+
+# ==============================================================================
+# 5. EXECUÇÃO
+# ==============================================================================
+def construir_do_banco(pasta=PASTA_BUSCA):
+    import armazenamento
+
+    con = armazenamento.conectar()
+    try:
+        return construir(armazenamento.consultar_descricoes_cves(con), pasta)
+    finally:
+        armazenamento.fechar(con)
+
+
+def main(argv=None):
+    """
+    python busca_cves.py --construir
+    python busca_cves.py "sql injection" --desde 2024-01-01 --severidade HIGH CRITICAL
+    """
+    parser = argparse.ArgumentParser(description="Busca textual nas descrições das CVEs.")
+    parser.add_argument('consulta', nargs='?', help="Texto livre (ex.: 'remote code execution').")
+    parser.add_argument('--construir', action='store_true', help="(Re)constrói o índice a partir do banco.")
+    parser.add_argument('--pasta', default=PASTA_BUSCA)
+    parser.add_argument('--limite', type=int, default=10)
+    parser.add_argument('--desde', help="Publicadas a partir de YYYY-MM-DD.")
+    parser.add_argument('--ate', help="Publicadas até YYYY-MM-DD.")
+    parser.add_argument('--severidade', nargs='+', choices=SEVERIDADES, type=str.upper)
+    parser.add_argument('--todos', action='store_true', help="Exige todos os termos da consulta.")
+    args = parser.parse_args(argv)
+
+    if args.construir:
+        inicio = time.perf_counter()
+        documentos, vocabulario, shards = construir_do_banco(args.pasta)
+        print(f"Índice de busca: {documentos} CVEs, {vocabulario} termos em {shards} shards "
+              f"({time.perf_counter() - inicio:.1f}s).")
+    if not args.consulta:
+        return
+
+    try:
+        indice = IndiceBusca(args.pasta)
+    except FileNotFoundError:
+        print(f"Índice não encontrado em '{args.pasta}': rode com --construir.")
+        return
+    inicio = time.perf_counter()
+    resultados = indice.buscar(args.consulta, args.limite, args.desde, args.ate, args.severidade, args.todos)
+    print(f"{len(resultados)} resultado(s) em {(time.perf_counter() - inicio) * 1000:.1f} ms.")
+
+    # A descrição não fica no índice de busca: vem do índice estático do site, se existir
+    import indice_cves
+    for posicao, resultado in enumerate(resultados, 1):
+        print(f"\n{posicao:>2}. {resultado['cve_id']} ({resultado['data_publicacao']}) "
+              f"{resultado['severidade']} | {resultado['pontuacao']}")
+        detalhes = indice_cves.buscar(resultado['cve_id'])
+        if detalhes is not None:
+            print(f"    {detalhes['descricao'][:200]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Cache em disco de respostas HTTP: validadores (ETag/Last-Modified) + corpo, com limite de tamanho (LRU)
+import hashlib
+import json
+import os
+import time
+
+from exportacao import salvar_bytes, salvar_json
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+PASTA_CACHE = os.path.join("dados", "cache_http")
+TAMANHO_MAXIMO = 50 * 1024 * 1024  # bytes (corpos + metadados)
+
+# AEGIS_SEM_CACHE=1 (ou orquestrador --sem-cache): requisições sempre completas
+VARIAVEL_DESATIVAR = "AEGIS_SEM_CACHE"
+
+
+def chave(url, params=None):
+    """
+    Uma entrada por URL + conjunto de parâmetros (a ordem dos parâmetros não importa).
+    Cabeçalhos ficam de fora: eles carregam as chaves de API.
+    """
+    parametros = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    identidade = json.dumps([url, parametros], ensure_ascii=False)
+    return hashlib.sha256(identidade.encode("utf-8")).hexdigest()[:32]
+
+
+class CacheHTTP:
+    """
+    Cada entrada são dois arquivos em 'pasta': <chave>.json (URL, validadores,
+    último acesso) e <chave>.corpo (a resposta). Acima de 'tamanho_maximo',
+    as entradas usadas há mais tempo são removidas.
+    """
+
+    def __init__(self, pasta=PASTA_CACHE, tamanho_maximo=TAMANHO_MAXIMO):
+        self.pasta = pasta
+        self.tamanho_maximo = tamanho_maximo
+
+    def ativo(self):
+        return os.getenv(VARIAVEL_DESATIVAR) != "1"
+
+    def _caminhos(self, chave_):
+        base = os.path.join(self.pasta, chave_)
+        return base + ".json", base + ".corpo"
+
+    def _ler_meta(self, chave_):
+        try:
+            with open(self._caminhos(chave_)[0], "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def validadores(self, chave_):
+        """
+        Cabeçalhos condicionais para a entrada, ou {} se ela não existir (ou perdeu o corpo).
+        """
+        meta = self._ler_meta(chave_)
+        if meta is None or not os.path.exists(self._caminhos(chave_)[1]):
+            return {}
+        cabecalhos = {}
+        if meta.get('etag'):
+            cabecalhos['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = meta['last_modified']
+        return cabecalhos
+
+    def corpo(self, chave_):
+        """
+        Corpo guardado e marca a entrada como usada agora (LRU). None se não existir.
+        """
+        caminho_meta, caminho_corpo = self._caminhos(chave_)
+        try:
+            with open(caminho_corpo, "rb") as f:
+                conteudo = f.read()
+        except FileNotFoundError:
+            return None
+        meta = self._ler_meta(chave_)
+        if meta is not None:
+            meta['ultimo_acesso'] = time.time()
+            salvar_json(caminho_meta, meta)
+        return conteudo
+
+    def guardar(self, chave_, url, params, response):
+        """
+        Guarda uma resposta 200 que tenha ETag ou Last-Modified (sem eles não há
+        como perguntar ao servidor se mudou). Retorna True se guardou.
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return False
+        caminho_meta, caminho_corpo = self._caminhos(chave_)
+        # Corpo antes dos metadados: metadados sem corpo valem como entrada ausente
+        salvar_bytes(caminho_corpo, response.content)
+        salvar_json(caminho_meta, {
+            'url': url,
+            'params': {str(k): str(v) for k, v in (params or {}).items()},
+            'etag': etag,
+            'last_modified': last_modified,
+            'bytes': len(response.content),
+            'ultimo_acesso': time.time(),
+        })
+        self.limitar()
+        return True
+
+    def remover(self, chave_):
+        for caminho in self._caminhos(chave_):
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+
+    def entradas(self):
+        """
+        [(ultimo_acesso, bytes ocupados, chave)] de todas as entradas.
+        """
+        try:
+            nomes = os.listdir(self.pasta)
+        except FileNotFoundError:
+            return []
+        resultado = []
+        for nome in nomes:
+            if not nome.endswith(".json"):
+                continue
+            chave_ = nome[:-len(".json")]
+            ocupado = 0
+            for caminho in self._caminhos(chave_):
+                try:
+                    ocupado += os.path.getsize(caminho)
+                except FileNotFoundError:
+                    pass  # outro coletor acabou de removê-la
+            meta = self._ler_meta(chave_) or {}
+            resultado.append((meta.get('ultimo_acesso', 0), ocupado, chave_))
+        return resultado
+
+    def limitar(self):
+        """
+        Remove as entradas menos usadas recentemente até caber em tamanho_maximo.
+        """
+        entradas = sorted(self.entradas())
+        ocupado = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, chave_ in entradas:
+            if ocupado <= self.tamanho_maximo:
+                break
+            self.remover(chave_)
+            ocupado -= tamanho
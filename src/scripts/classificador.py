@@ -0,0 +1,132 @@
+# Classificador de vulnerabilidades (CWE primeiro, descrição como reserva)
+import re
+
+# ==============================================================================
+# 0. CATEGORIAS (em ordem de prioridade, como no classificador original)
+# ==============================================================================
+RCE = 'RCE (Execução Remota)'
+DOS = 'DoS (Negação de Serviço)'
+SQLI = 'SQL Injection'
+XSS = 'XSS'
+PRIVILEGIO = 'Escalada de Privilégio'
+BUFFER = 'Buffer Overflow'
+OUTROS = 'Outros'
+
+PRIORIDADE = [RCE, DOS, SQLI, XSS, PRIVILEGIO, BUFFER]
+_ORDEM = {categoria: i for i, categoria in enumerate(PRIORIDADE)}
+
+# ==============================================================================
+# 1. TABELA CWE -> CATEGORIA
+# ==============================================================================
+_CWES_POR_CATEGORIA = {
+    RCE: [77, 78, 94, 95, 96, 502, 917, 1336],
+    DOS: [400, 401, 407, 674, 770, 772, 789, 835, 1333],
+    SQLI: [89, 564],
+    XSS: [79, 80, 83, 87],
+    PRIVILEGIO: [250, 266, 267, 268, 269, 270, 271, 272, 274, 648],
+    BUFFER: [119, 120, 121, 122, 131, 680, 787, 805, 806],
+}
+CWE_PARA_CATEGORIA = {
+    f"CWE-{numero}": categoria
+    for categoria, numeros in _CWES_POR_CATEGORIA.items()
+    for numero in numeros
+}
+
+# ==============================================================================
+# 2. PADRÕES DE TEXTO (reserva quando não há CWE mapeado)
+# ==============================================================================
+# Para cada categoria, em ordem de prioridade:
+#   - frases literais, procuradas com 'in' (busca de substring em C, muito mais
+#     rápida que o motor de regex do Python, que testa caractere a caractere);
+#   - termos curtos/ambíguos, que só passam por uma regex pré-compilada com limite
+#     de palavra quando o trecho aparece no texto. Isso elimina os falsos positivos
+#     do classificador antigo ('dos' em "Kudos"/"Dossier", 'xss' em identificadores).
+# Uma alternância única com todos os padrões foi medida: mesmo testada só onde
+# um trecho literal aparece, fica mais lenta que esta sequência de 'in'.
+_REGRAS = [
+    (RCE, ("remote code execution", "execute arbitrary code", "arbitrary code execution"), None, None),
+    (DOS, ("denial of service", "denial-of-service"), "dos", re.compile(r"\b(?:re|d)?dos\b")),
+    (SQLI, ("sql injection",), "sqli", re.compile(r"\bsqli\b")),
+    (XSS, ("cross-site scripting", "cross site scripting"), "xss", re.compile(r"\bxss\b")),
+    (PRIVILEGIO, ("privilege escalation", "escalate privileges", "elevation of privilege"), "privileges",
+     re.compile(r"\bgain(?:s|ed)? (?:elevated |root |admin(?:istrator)? )?privileges")),
+    (BUFFER, ("buffer overflow", "buffer overrun"), None, None),
+]
+
+
+def classificar_por_cwe(cwes):
+    """
+    Categoria de maior prioridade entre os CWEs conhecidos, ou None.
+    """
+    melhor = None
+    for cwe in cwes:
+        categoria = CWE_PARA_CATEGORIA.get(cwe)
+        if categoria is not None and (melhor is None or _ORDEM[categoria] < _ORDEM[melhor]):
+            melhor = categoria
+    return melhor
+
+
+def classificar_por_descricao(descricao):
+    """
+    Categoria de maior prioridade citada na descrição, ou 'Outros'.
+    """
+    if not descricao:
+        return OUTROS
+    desc = descricao.lower()
+    for categoria, frases, trecho, regex in _REGRAS:
+        for frase in frases:
+            if frase in desc:
+                return categoria
+        if trecho is not None and trecho in desc and regex.search(desc):
+            return categoria
+    return OUTROS
+
+
+def classificar_descricoes(descricoes):
+    """
+    classificar_por_descricao de cada descrição de uma lista.
+    """
+    return [classificar_por_descricao(descricao) for descricao in descricoes]
+
+
+def classificar(descricao, cwes=()):
+    """
+    Usa o CWE quando ele é conhecido pela tabela; só quando nenhum CWE do
+    registro está mapeado (ausente, 'NVD-CWE-Other', 'NVD-CWE-noinfo', ...)
+    recorre à descrição.
+    """
+    return classificar_por_cwe(cwes) or classificar_por_descricao(descricao)
+
+
+# ==============================================================================
+# 3. EXTRAÇÃO A PARTIR DO JSON DA NVD
+# ==============================================================================
+def extrair_descricao(cve):
+    # Preferimos o texto em inglês; se não houver, o primeiro disponível
+    descricoes = cve.get('descriptions') or []
+    for d in descricoes:
+        if d.get('lang') == 'en':
+            return d.get('value')
+    return descricoes[0].get('value') if descricoes else None
+
+
+def extrair_cwes(cve):
+    fraquezas = cve.get('weaknesses')
+    if not fraquezas:
+        return ()
+    return [d.get('value') for fraqueza in fraquezas for d in fraqueza.get('description') or ()]
+
+
+def classificar_lote(itens):
+    """
+    Classifica uma lista de itens brutos da NVD ({'cve': {...}}) numa chamada.
+    """
+    resultado = []
+    for item in itens:
+        cve = item.get('cve', {})
+        # O CWE resolve a maioria dos registros sem olhar o texto
+        categoria = classificar_por_cwe(extrair_cwes(cve))
+        if categoria is None:
+            categoria = classificar_por_descricao(extrair_descricao(cve))
+        resultado.append(categoria)
+    return resultado
@@ -0,0 +1,200 @@
+# Cliente HTTP compartilhado pelos coletores
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import cache_http
+
+# Status que valem uma nova tentativa (limite de taxa e falhas temporárias do servidor)
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+
+# Uma Session (pool de conexões keep-alive) por host, compartilhada entre clientes/threads
+_sessoes = {}
+_trava_sessoes = threading.Lock()
+
+
+def sessao_para(url, tamanho_pool=10):
+    host = urlparse(url).netloc
+    with _trava_sessoes:
+        sessao = _sessoes.get(host)
+        if sessao is None:
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamanho_pool)
+            sessao.mount("https://", adaptador)
+            sessao.mount("http://", adaptador)
+            _sessoes[host] = sessao
+        return sessao
+
+
+def segundos_retry_after(valor):
+    """
+    Interpreta o cabeçalho Retry-After (segundos ou data HTTP).
+    Retorna None se o valor não for válido.
+    """
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+        return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class ClienteHTTP:
+    """
+    Cliente de uma fonte de dados (NVD, OTX, AbuseIPDB, HIBP).
+
+    - reaproveita conexões (Session por host);
+    - repete requisições com backoff exponencial + jitter em erros de conexão,
+      timeouts e status 429/5xx, respeitando o Retry-After quando enviado;
+    - mantém contadores de requisições, bytes, latência e novas tentativas,
+      além do detalhe de cada tentativa;
+    - com um CacheHTTP, faz requisições condicionais (ETag/Last-Modified).
+
+    Depois das tentativas, a última resposta é devolvida (o coletor decide o que
+    fazer com o status) e a última exceção de conexão é relançada.
+    """
+
+    def __init__(self, fonte, timeout=20, max_tentativas=4, backoff_base=1.0,
+                 backoff_maximo=60.0, headers=None, tamanho_pool=10, cache=None):
+        self.fonte = fonte
+        self.timeout = timeout
+        self.max_tentativas = max_tentativas
+        self.backoff_base = backoff_base
+        self.backoff_maximo = backoff_maximo
+        self.headers = headers or {}
+        self.tamanho_pool = tamanho_pool
+        self.cache = cache
+
+        self._trava = threading.Lock()
+        self.requisicoes = 0
+        self.novas_tentativas = 0
+        self.bytes_recebidos = 0
+        self.latencia_total = 0.0
+        self.latencia_maxima = 0.0
+        self.tempo_em_backoff = 0.0
+        self.nao_modificados = 0
+        # Uma entrada por tentativa (lida pelo metricas.py)
+        self.detalhes = []
+
+    def _registrar(self, latencia, tamanho, url, params, status, tentativa):
+        with self._trava:
+            self.requisicoes += 1
+            self.bytes_recebidos += tamanho
+            self.latencia_total += latencia
+            self.latencia_maxima = max(self.latencia_maxima, latencia)
+            self.detalhes.append({
+                'url': url,
+                'params': {str(k): str(v) for k, v in (params or {}).items()},
+                'status': status,
+                'tentativa': tentativa + 1,
+                'latencia_s': round(latencia, 4),
+                'bytes': tamanho,
+            })
+
+    def _esperar(self, tentativa, retry_after=None):
+        if retry_after is not None:
+            espera = min(retry_after, self.backoff_maximo)
+        else:
+            # "Full jitter": sorteia entre 0 e o teto exponencial
+            espera = random.uniform(0, min(self.backoff_maximo, self.backoff_base * (2 ** tentativa)))
+        with self._trava:
+            self.novas_tentativas += 1
+            self.tempo_em_backoff += espera
+        time.sleep(espera)
+
+    def get(self, url, params=None, headers=None, timeout=None, condicional=False, limitador=None):
+        """
+        condicional=True (e um cache configurado): envia If-None-Match/If-Modified-Since
+        da última resposta confirmada. Num 304, a resposta volta com o corpo guardado
+        (status 304, response.json() funciona): o coletor decide se pula a etapa.
+
+        limitador: LimitadorTaxa consultado antes de CADA tentativa, inclusive
+        as novas tentativas depois de um 429/5xx, que também contam na cota.
+        """
+        sessao = sessao_para(url, self.tamanho_pool)
+        cabecalhos = dict(self.headers, **(headers or {}))
+        chave_cache = None
+        if condicional and self.cache is not None and self.cache.ativo():
+            chave_cache = cache_http.chave(url, params)
+            cabecalhos.update(self.cache.validadores(chave_cache))
+
+        for tentativa in range(self.max_tentativas):
+            ultima = tentativa == self.max_tentativas - 1
+            if limitador is not None:
+                limitador.aguardar()
+            inicio = time.monotonic()
+            try:
+                response = sessao.get(url, params=params, headers=cabecalhos,
+                                      timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._registrar(time.monotonic() - inicio, 0, url, params, e.__class__.__name__, tentativa)
+                if ultima:
+                    raise
+                print(f"    [{self.fonte}] Falha de conexão ({e.__class__.__name__}), tentando novamente...")
+                self._esperar(tentativa)
+                continue
+
+            self._registrar(time.monotonic() - inicio, len(response.content), url, params,
+                            response.status_code, tentativa)
+
+            if response.status_code not in STATUS_REPETIVEIS or ultima:
+                return self._com_cache(response, chave_cache, url, params)
+
+            retry_after = segundos_retry_after(response.headers.get('Retry-After'))
+            print(f"    [{self.fonte}] Status {response.status_code}, tentando novamente...")
+            self._esperar(tentativa, retry_after)
+
+    def _com_cache(self, response, chave_cache, url, params):
+        if chave_cache is None:
+            return response
+        response.cache_http = (chave_cache, url, params)
+        if response.status_code == 304:
+            corpo = self.cache.corpo(chave_cache)
+            if corpo is not None:
+                # 304 não tem corpo: devolvemos o da resposta guardada
+                response._content = corpo
+            with self._trava:
+                self.nao_modificados += 1
+        return response
+
+    def confirmar(self, response):
+        """
+        Guarda no cache uma resposta 200 de um get(condicional=True). Os coletores só
+        chamam depois de gravar/exportar os dados: se a etapa falhar, a próxima
+        execução baixa tudo de novo em vez de receber um 304.
+        """
+        if self.cache is None or getattr(response, 'cache_http', None) is None:
+            return False
+        chave_cache, url, params = response.cache_http
+        return self.cache.guardar(chave_cache, url, params, response)
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'fonte': self.fonte,
+                'requisicoes': self.requisicoes,
+                'novas_tentativas': self.novas_tentativas,
+                'bytes_recebidos': self.bytes_recebidos,
+                'latencia_media_s': round(self.latencia_total / self.requisicoes, 4) if self.requisicoes else 0.0,
+                'latencia_maxima_s': round(self.latencia_maxima, 4),
+                'tempo_em_backoff_s': round(self.tempo_em_backoff, 2),
+                'nao_modificados': self.nao_modificados,
+            }
+
+    def imprimir_resumo(self):
+        e = self.estatisticas()
+        print(f"[{e['fonte']}] {e['requisicoes']} requisições ({e['novas_tentativas']} novas tentativas), "
+              f"{e['bytes_recebidos'] / 1024:.1f} KB, latência média {e['latencia_media_s']}s, "
+              f"{e['tempo_em_backoff_s']}s em backoff"
+              + (f", {e['nao_modificados']} '304 Not Modified'." if e['nao_modificados'] else "."))
@@ -1,11 +1,19 @@
 # Importar bibliotecas necessárias
-import pandas as pd
-import requests
-from datetime import datetime, timedelta
-import time
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import argparse
 import json
 import os
 
+import armazenamento
+from classificador import classificar_lote, extrair_cwes, extrair_descricao
+from cliente_http import ClienteHTTP
+from exportacao import salvar_json
+from limitador import LimitadorTaxa
+from metricas import MetricasColeta
+
 # ==============================================================================
 # 0. CONFIGURAÇÃO DA API (NVD)
 # ==============================================================================
@@ -13,171 +21,330 @@ API_KEY = os.getenv("API_NVD_CVE")
 API_URL = "https://services.nvd.nist.gov/rest/json/cves/2.0"
 headers = {'apiKey': API_KEY}
 
-# --- FUNÇÃO DE CLASSIFICAÇÃO ---
-def classificar_vulnerabilidade(descricao):
-    """
-    Lê a descrição técnica e retorna uma categoria simplificada.
-    """
-    if not descricao:
-        return 'Outros'
-        
-    desc = descricao.lower()
-    
-    if 'remote code execution' in desc or 'execute arbitrary code' in desc:
-        return 'RCE (Execução Remota)'
-    elif 'denial of service' in desc or 'dos' in desc:
-        return 'DoS (Negação de Serviço)'
-    elif 'sql injection' in desc:
-        return 'SQL Injection'
-    elif 'cross-site scripting' in desc or 'xss' in desc:
-        return 'XSS'
-    elif 'privilege escalation' in desc or 'gain privileges' in desc:
-        return 'Escalada de Privilégio'
-    elif 'buffer overflow' in desc:
-        return 'Buffer Overflow'
-    else:
-        return 'Outros'
+# Vamos manter 1 ano de dados para permitir filtragem no frontend
+DIAS_PARA_BUSCAR_TOTAL = 365
+DIAS_POR_CHAMADA = 120 # Limite da API NVD (vale para pubDate e lastModDate)
+PAGE_SIZE = 2000
+FORMATO_DATA_NVD = '%Y-%m-%dT%H:%M:%S.000Z'
+
+# Cota pública da NVD: 5 requisições/30s sem chave, 50/30s com chave.
+# Substitui os sleeps fixos de 2s (por página) e 4s (por bloco).
+if API_KEY:
+    limitador = LimitadorTaxa(quota=50, periodo=30, capacidade=5)
+    MAX_CONEXOES = 8
+else:
+    limitador = LimitadorTaxa(quota=5, periodo=30, capacidade=1)
+    MAX_CONEXOES = 2
+
+cliente = ClienteHTTP('NVD', timeout=30, headers=headers, tamanho_pool=MAX_CONEXOES)
+
+ARQUIVO_SAIDA = "cve_kpis.json"
+metricas = MetricasColeta('cve')
+# Estado da última sincronização bem-sucedida (no cache do CI, junto com o aegis.db)
+CAMINHO_ESTADO = os.path.join("dados", "estado_cve.json")
+
+# --- FUNÇÃO DE TRANSFORMAÇÃO (T) ---
+def transformar_cve(item, tipo_falha):
+    """
+    Converte um item bruto da NVD no registro do dashboard.
+    'tipo_falha' vem do classificador (ver classificar_lote).
+    Retorna None quando a CVE não tem nota CVSS v3.1.
+    """
+    cve = item.get('cve', {})
+    cve_id = cve.get('id', 'N/A')
+    data_publicacao = cve.get('published', 'N/A')
+
+    cvss_score = None
+    severidade = "N/A"
+    vetor_cvss = None
+
+    metrics = cve.get('metrics', {})
+    if 'cvssMetricV31' in metrics:
+        try:
+            metric_data = metrics['cvssMetricV31'][0]['cvssData']
+            cvss_score = metric_data.get('baseScore')
+            severidade = metric_data.get('baseSeverity', 'N/A')
+            vetor_cvss = metric_data.get('vectorString')
+        except:
+            pass
+
+    if cvss_score is None:
+        return None
+
+    return {
+        "cve_id": cve_id,
+        "data_publicacao": data_publicacao.split('T')[0],
+        "cvss_score": cvss_score,
+        "severidade": severidade,
+        "tipo_falha": tipo_falha, # Novo campo
+        # Detalhes: ficam no banco e vão só para o índice estático (indice_cves.py)
+        "descricao": extrair_descricao(cve),
+        "vetor_cvss": vetor_cvss,
+        "cwes": list(extrair_cwes(cve)),
+        "referencias": extrair_referencias(cve),
+    }
+
+
+def extrair_referencias(cve):
+    return [r.get('url') for r in cve.get('references') or () if r.get('url')]
 
-print("="*80)
-print("ATRIBUIÇÃO: Este produto usa dados da NVD API, mas não é endossado ou certificado pela NVD.")
-print("="*80 + "\n")
 
 # ==============================================================================
-# 1. COLETA REAL DE DADOS (365 DIAS)
+# 1. FUNÇÕES DE COLETA
 # ==============================================================================
-print("--- 2. COLETANDO DADOS REAIS DA API DO NIST (NVD) ---")
+def inicio_do_bloco(filtro):
+    # O primeiro parâmetro do filtro é sempre a data inicial
+    return next(iter(filtro.values()))[:10]
 
-# Vamos buscar 1 ano de dados para permitir filtragem no frontend
-DIAS_PARA_BUSCAR_TOTAL = 365
-DIAS_POR_CHAMADA = 120 # Limite da API NVD
-dados_coletados = []
-
-data_final_global = datetime.now()
-data_limite_total = data_final_global - timedelta(days=DIAS_PARA_BUSCAR_TOTAL)
-
-# Loop para buscar em blocos de 120 dias (0 a 3)
-for i in range(0, (DIAS_PARA_BUSCAR_TOTAL // DIAS_POR_CHAMADA) + 1):
-    
-    start_index = 0
-    
-    # Calcula janela de tempo
-    data_final_janela = data_final_global - timedelta(days=i * DIAS_POR_CHAMADA)
-    data_inicial_janela = data_final_global - timedelta(days=(i + 1) * DIAS_POR_CHAMADA)
-    
-    if data_inicial_janela < data_limite_total:
-        data_inicial_janela = data_limite_total
-
-    if data_final_janela < data_limite_total:
-        break
-        
-    fmt_data_inicial = data_inicial_janela.strftime('%Y-%m-%dT%H:%M:%SZ')
-    fmt_data_final = data_final_janela.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-    print(f"\nBuscando bloco {i+1}: de {fmt_data_inicial} até {fmt_data_final}...")
-    
-    PAGE_SIZE = 2000
-    total_vulns_bloco = 0
-
-    while True:
-        params = {
-            'pubStartDate': fmt_data_inicial,
-            'pubEndDate': fmt_data_final,
-            'resultsPerPage': PAGE_SIZE,
-            'startIndex': start_index
-        }
-        
-        print(f"  - Buscando índice {start_index}...")
-        
-        try:
-            response = requests.get(API_URL, params=params, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                vulnerabilidades = data.get('vulnerabilities', [])
-                
-                if start_index == 0:
-                    total_vulns_bloco = data.get('totalResults', 0)
-                    print(f"    Sucesso! {total_vulns_bloco} vulnerabilidades neste bloco.")
-                
-                if not vulnerabilidades:
-                    break 
-
-                for item in vulnerabilidades:
-                    cve = item.get('cve', {})
-                    cve_id = cve.get('id', 'N/A')
-                    data_publicacao = cve.get('published', 'N/A')
-                    
-                    # Extrair descrição para classificar
-                    descricao = "N/A"
-                    try:
-                        descricao = cve['descriptions'][0]['value']
-                    except:
-                        pass
-                    
-                    # Classificar
-                    tipo_falha = classificar_vulnerabilidade(descricao)
-
-                    cvss_score = None
-                    severidade = "N/A"
-                    
-                    metrics = cve.get('metrics', {})
-                    if 'cvssMetricV31' in metrics:
-                        try:
-                            metric_data = metrics['cvssMetricV31'][0]['cvssData'] 
-                            cvss_score = metric_data.get('baseScore')
-                            severidade = metric_data.get('baseSeverity', 'N/A')
-                        except:
-                            pass
-                    
-                    if cvss_score is not None:
-                        dados_coletados.append({
-                            "cve_id": cve_id,
-                            "data_publicacao": data_publicacao.split('T')[0], 
-                            "cvss_score": cvss_score,
-                            "severidade": severidade,
-                            "tipo_falha": tipo_falha # Novo campo
-                        })
-                
-                start_index += PAGE_SIZE
-                
-                if start_index >= total_vulns_bloco:
+
+def buscar_pagina(filtro, start_index):
+    """
+    Busca uma página de uma janela. 'filtro' é o dicionário com o par de
+    datas (pubStartDate/pubEndDate ou lastModStartDate/lastModEndDate).
+    Retorna o JSON da resposta ou None em caso de erro.
+    """
+    params = dict(filtro, resultsPerPage=PAGE_SIZE, startIndex=start_index)
+    print(f"  - Buscando índice {start_index} do bloco {inicio_do_bloco(filtro)}...")
+
+    try:
+        # A cota vale para cada tentativa: o cliente consulta o limitador antes de todas
+        response = cliente.get(API_URL, params=params, limitador=limitador)
+        if response.status_code != 200:
+            print(f"    Erro API: {response.status_code}")
+            return None
+        return response.json()
+    except Exception as e:
+        print(f"    Erro conexão: {e}")
+        return None
+
+
+def paginas_das_janelas(filtros):
+    """
+    Gera, página por página, as vulnerabilidades de várias janelas, buscando
+    em paralelo e respeitando a cota da NVD.
+
+    A página 0 de todas as janelas é pedida de uma vez (para descobrir o
+    totalResults); as demais páginas de cada janela vão sendo pedidas com no
+    máximo MAX_CONEXOES em voo, então a memória fica limitada a algumas
+    páginas, não importa o tamanho da coleta. A ordem é a mesma da execução
+    sequencial (janela por janela, página por página).
+
+    Gera None quando uma página falha; as páginas seguintes daquela janela são
+    descartadas, como acontecia no loop antigo.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_CONEXOES) as pool:
+        primeiras = [pool.submit(buscar_pagina, filtro, 0) for filtro in filtros]
+
+        for i, filtro in enumerate(filtros):
+            primeira = primeiras[i].result()
+            primeiras[i] = None  # libera a página assim que ela é consumida
+            if primeira is None:
+                yield None
+                continue
+
+            total = primeira.get('totalResults', 0)
+            print(f"    Sucesso! {total} vulnerabilidades no bloco {inicio_do_bloco(filtro)}.")
+            yield primeira.get('vulnerabilities', [])
+            del primeira
+
+            inicios = iter(range(PAGE_SIZE, total, PAGE_SIZE))
+            em_voo = deque(pool.submit(buscar_pagina, filtro, inicio) for inicio in islice(inicios, MAX_CONEXOES))
+            while em_voo:
+                data = em_voo.popleft().result()
+                if data is None or not data.get('vulnerabilities'):
+                    for futuro in em_voo:
+                        futuro.cancel()
+                    if data is None:
+                        yield None
                     break
-                
-                print(f"    Aguardando 2s (Rate Limit)...")
-                time.sleep(2)
-            else:
-                print(f"    Erro API: {response.status_code}")
-                break
-        except Exception as e:
-            print(f"    Erro conexão: {e}")
+
+                proximo = next(inicios, None)
+                if proximo is not None:
+                    em_voo.append(pool.submit(buscar_pagina, filtro, proximo))
+                yield data['vulnerabilities']
+
+
+def calcular_janelas(agora):
+    """
+    Divide os últimos 365 dias em blocos de até 120 dias (limite da API).
+    """
+    janelas = []
+    data_limite_total = agora - timedelta(days=DIAS_PARA_BUSCAR_TOTAL)
+
+    for i in range(0, (DIAS_PARA_BUSCAR_TOTAL // DIAS_POR_CHAMADA) + 1):
+        data_final_janela = agora - timedelta(days=i * DIAS_POR_CHAMADA)
+        data_inicial_janela = max(agora - timedelta(days=(i + 1) * DIAS_POR_CHAMADA), data_limite_total)
+
+        if data_final_janela <= data_limite_total:
             break
-            
-    if data_inicial_janela <= data_limite_total:
-        break
-    
-    print(f"  Aguardando 4s entre blocos...")
-    time.sleep(4)
+        janelas.append((data_inicial_janela, data_final_janela))
 
+    return janelas
 
-# --- ETAPA DE CARGA (L) ---
-df = pd.DataFrame(dados_coletados)
 
-if df.empty:
-    print("\nAVISO: O DataFrame está vazio.")
-else:
-    print(f"\n--- AMOSTRA DO DATASET (Total: {len(df)} registros de 1 ano) ---")
-    print(df[['cve_id', 'severidade', 'tipo_falha']].head())
+def coleta_completa(agora):
+    """
+    Busca os últimos 365 dias por data de publicação, em blocos de 120 dias.
+    """
+    print("Modo COMPLETO: buscando a janela inteira de 1 ano.")
+    filtros = []
+    for i, (inicio, fim) in enumerate(calcular_janelas(agora)):
+        print(f"Bloco {i+1}: de {inicio:%Y-%m-%d} até {fim:%Y-%m-%d}")
+        filtros.append({
+            'pubStartDate': inicio.strftime(FORMATO_DATA_NVD),
+            'pubEndDate': fim.strftime(FORMATO_DATA_NVD),
+        })
+    return paginas_das_janelas(filtros)
+
+
+def coleta_incremental(desde, agora):
+    """
+    Busca apenas as CVEs publicadas OU modificadas desde a última sincronização.
+    """
+    print(f"Modo INCREMENTAL: mudanças desde {desde:%Y-%m-%d %H:%M:%S} UTC.")
+    return paginas_das_janelas([{
+        'lastModStartDate': desde.strftime(FORMATO_DATA_NVD),
+        'lastModEndDate': agora.strftime(FORMATO_DATA_NVD),
+    }])
+
+
+# ==============================================================================
+# 2. ESTADO E DATASET EXISTENTE
+# ==============================================================================
+def carregar_estado():
+    try:
+        with open(CAMINHO_ESTADO, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+        return datetime.strptime(estado['ultima_sincronizacao'], FORMATO_DATA_NVD).replace(tzinfo=timezone.utc)
+    except Exception:
+        return None
+
+
+def salvar_estado(momento):
+    salvar_json(CAMINHO_ESTADO, {'ultima_sincronizacao': momento.strftime(FORMATO_DATA_NVD)}, indent=2)
+
+
+def transformar_pagina(itens_brutos):
+    """
+    Retorna (registros válidos, cve_ids sem nota v3.1) de uma página da NVD.
+    Não mexe nas métricas: o backfill chama isto de várias threads.
+    """
+    # Classifica o lote inteiro de uma vez (CWE primeiro, descrição como reserva)
+    tipos = classificar_lote(itens_brutos)
+    validos, removidos = [], []
+    for item, tipo_falha in zip(itens_brutos, tipos):
+        registro = transformar_cve(item, tipo_falha)
+        if registro is not None:
+            validos.append(registro)
+        else:
+            removidos.append(item.get('cve', {}).get('id'))
+    return validos, removidos
+
+
+def aplicar_mudancas(con, itens_brutos):
+    """
+    Upsert por cve_id no banco. CVEs que perderam a nota v3.1 (ex.: rejeitadas)
+    são removidas. A chave primária também elimina as duplicatas das bordas
+    entre janelas vizinhas.
+    Retorna os cve_ids válidos recebidos.
+    """
+    with metricas.etapa('transformacao'):
+        validos, removidos = transformar_pagina(itens_brutos)
+    metricas.receber(len(itens_brutos))
+    metricas.descartar('sem_cvss_v31', len(removidos))
+
+    with metricas.etapa('gravacao'):
+        armazenamento.salvar_cves(con, validos)
+        armazenamento.remover_cves(con, removidos)
+    return [r['cve_id'] for r in validos]
+
+
+# ==============================================================================
+# 3. EXECUÇÃO (ETL)
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coletor de CVEs da NVD (janela de 1 ano).")
+    parser.add_argument('--completo', action='store_true',
+                        help="Ignora o estado salvo e rebaixa a janela inteira de 365 dias.")
+    args = parser.parse_args(argv)
+
+    print("="*80)
+    print("ATRIBUIÇÃO: Este produto usa dados da NVD API, mas não é endossado ou certificado pela NVD.")
+    print("="*80 + "\n")
+
+    print("--- 2. COLETANDO DADOS REAIS DA API DO NIST (NVD) ---")
+    metricas.acompanhar(cliente, limitador)
+
+    agora = datetime.now(timezone.utc)
+    ultima_sincronizacao = carregar_estado()
+    con = armazenamento.conectar()
+    banco_vazio = con.execute("SELECT COUNT(*) FROM cves").fetchone()[0] == 0
+
+    # O filtro lastMod da NVD também aceita no máximo 120 dias por consulta
+    pode_incrementar = (
+        not args.completo
+        and ultima_sincronizacao is not None
+        and not banco_vazio
+        and agora - ultima_sincronizacao < timedelta(days=DIAS_POR_CHAMADA)
+    )
+
+    if pode_incrementar:
+        paginas = coleta_incremental(ultima_sincronizacao, agora)
+    else:
+        paginas = coleta_completa(agora)
+
+    # Cada página é classificada e gravada assim que chega; só os IDs ficam em memória.
+    # Coletas parciais só fazem upsert; nada válido é apagado do banco
+    recebidos = set()
+    total_recebidos = 0
+    sucesso = True
+    # 'busca': tempo esperando a próxima página (rede, cota e parse do JSON)
+    for pagina in metricas.cronometrar('busca', paginas):
+        if pagina is None:
+            sucesso = False
+            continue
+        total_recebidos += len(pagina)
+        recebidos.update(aplicar_mudancas(con, pagina))
+
+    cliente.imprimir_resumo()
+
+    if sucesso and not pode_incrementar:
+        # A coleta completa é a foto fiel do último ano: o que sumiu da NVD sai do banco
+        # (o primeiro dia da janela só foi coberto em parte, então fica de fora)
+        inicio_janela = (agora - timedelta(days=DIAS_PARA_BUSCAR_TOTAL - 1)).strftime('%Y-%m-%d')
+        with metricas.etapa('gravacao'):
+            armazenamento.manter_apenas_cves(con, recebidos, inicio_janela)
 
     print("\n--- 4. EXPORTANDO DADOS COMPLETOS PARA O FRONT-END ---")
-    
-    # Converter para lista de dicionários
-    dados_para_json = df.to_dict('records')
 
-    caminho_arquivo = os.path.join("site", "cve_kpis.json")
-    
     try:
-        with open(caminho_arquivo, "w", encoding="utf-8") as f:
-            json.dump(dados_para_json, f, ensure_ascii=False) 
-        print(f"Arquivo 'cve_kpis.json' gerado com sucesso!")
+        # O JSON é escrito direto do cursor do banco, registro por registro
+        with metricas.etapa('exportacao'):
+            total = armazenamento.exportar(con, ARQUIVO_SAIDA)
+        amostra = list(islice(armazenamento.consultar_cves(con, armazenamento.data_corte(DIAS_PARA_BUSCAR_TOTAL)), 5))
     except Exception as e:
-        print(f"Erro ao salvar arquivo JSON: {e}")
\ No newline at end of file
+        print(f"Erro ao salvar arquivo JSON: {e}")
+        return
+    finally:
+        armazenamento.fechar(con)
+
+    if total == 0:
+        print("\nAVISO: O banco não tem CVEs no último ano.")
+        return
+
+    print(f"\n--- AMOSTRA DO DATASET (Total: {total} registros de 1 ano, {total_recebidos} recebidos nesta execução) ---")
+    for registro in amostra:
+        print(f"  {registro['cve_id']:<18} {registro['severidade']:<9} {registro['tipo_falha']}")
+    print(f"Arquivo 'cve_kpis.json' gerado com sucesso!")
+
+    # Só avançamos o estado se todas as páginas vieram; senão a próxima
+    # execução repete a consulta a partir da última sincronização válida.
+    if sucesso:
+        salvar_estado(agora)
+        print(f"Estado de sincronização atualizado para {agora.strftime(FORMATO_DATA_NVD)}.")
+    else:
+        print("AVISO: coleta incompleta; estado de sincronização NÃO foi avançado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,26 @@
 # Importar bibliotecas necessárias
-import pandas as pd
-import requests
-import json
 from datetime import datetime, timedelta
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
+import argparse
+import json
+import threading
 import os
 
+import armazenamento
+import transformacao_vetorizada
+from cache_http import CacheHTTP
+from cliente_http import ClienteHTTP
+from exportacao import salvar_json
+from limitador import LimitadorTaxa
+from metricas import MetricasColeta
+
 # ==============================================================================
 # 0. CONFIGURAÇÃO DA API (AlienVault OTX)
 # ==============================================================================
-API_KEY = os.getenv("API_OTX") 
-
-if not API_KEY:
-    print("ERRO: Chave API_OTX não encontrada!")
-    exit()
+API_KEY = os.getenv("API_OTX")
 
 headers = {
     'X-OTX-API-KEY': API_KEY
@@ -21,125 +28,349 @@ headers = {
 
 # Usando /subscribed pois mostrou-se mais estável que /activity
 API_URL = "https://otx.alienvault.com/api/v1/pulses/subscribed"
+# Cache: no modo incremental sem novidades, a 1ª página (mesmo modified_since) pode voltar 304
+cliente = ClienteHTTP('OTX', timeout=20, headers=headers, cache=CacheHTTP())
 
 # Configurações de Coleta
 RESULTS_PER_PAGE = 50
 MAX_PAGES = 200 # Limite de segurança para não rodar infinito (200 * 50 = 10.000 pulsos)
 DIAS_PARA_BUSCAR = 365 # Queremos 1 ano de dados
 
-print("="*80)
-print("ATRIBUIÇÃO: Usando a Base de Dados 'AlienVault OTX' (Open Threat Exchange).")
-print("="*80 + "\n")
+# Mesmo ritmo do antigo sleep(1.5) entre páginas (~40 por minuto), mas agora a
+# espera corre em paralelo com a requisição e com o processamento da página anterior
+limitador = LimitadorTaxa(quota=40, periodo=60, capacidade=1)
+PAGINAS_EM_VOO = 2
+
+ARQUIVO_SAIDA = "otx_kpis.json"
+metricas = MetricasColeta('otx')
+# Maior 'modified' já recebido (no cache do CI com o aegis.db, como o estado da NVD)
+CAMINHO_ESTADO = os.path.join("dados", "estado_otx.json")
+
 
 # ==============================================================================
 # 1. COLETA REAL DE DADOS (ETL - 365 DIAS)
 # ==============================================================================
-print("--- 2. COLETANDO DADOS REAIS DA API DA OTX (Janela de 1 Ano) ---")
-
-# Calcular a data limite (1 ano atrás)
-data_limite = datetime.now() - timedelta(days=DIAS_PARA_BUSCAR)
-print(f"Buscando dados a partir de: {data_limite.strftime('%Y-%m-%d')}")
-
-dados_coletados = []
-parar_coleta = False
-
-try:
-    # Loop de Paginação
-    for page in range(1, MAX_PAGES + 1):
-        if parar_coleta:
-            break
-
-        PARAMS = {
-            'limit': RESULTS_PER_PAGE,
-            'page': page
-        }
-        
-        print(f"Buscando página {page}... ({len(dados_coletados)} pulsos coletados)")
-        
+def transformar_pulso(pulso):
+    """
+    Converte um pulso bruto no registro do dashboard.
+    Retorna (registro, data_pulso) ou None quando o pulso não tem data.
+    """
+    # Pegar a data de criação
+    created_str = pulso.get('created', '')
+    # OTX retorna data assim: '2025-11-18T10:30:00.000'
+    try:
+        # Converter string para objeto data para comparar
+        data_pulso = datetime.strptime(created_str.split('.')[0], "%Y-%m-%dT%H:%M:%S")
+    except:
+        return None # Se não tem data, ignora
+
+    return {
+        "pulso_id": pulso.get('id'),
+        "data_criacao": created_str.split('T')[0], # Salva YYYY-MM-DD
+        "modificado_em": pulso.get('modified'), # Só para o checkpoint; não vai para o banco
+        # 1. Setores
+        "setores": pulso.get('industries', []),
+        # 2. Tags (Ameaças)
+        "ameacas": pulso.get('tags', []),
+        # 3. Países (Direto do objeto pulso, como descobrimos)
+        "paises": pulso.get('countries', []),
+    }, data_pulso
+
+
+def transformar_pulsos(pulsos):
+    """
+    A página inteira: em lote (pandas) com AEGIS_VETORIZADO=1, senão pulso a pulso.
+    """
+    if transformacao_vetorizada.ativo():
+        return transformacao_vetorizada.transformar_pulsos(pulsos)
+    return [transformar_pulso(pulso) for pulso in pulsos]
+
+
+def buscar_pagina(page, desde, cancelada):
+    """
+    Produtor: busca uma página, respeitando o limitador de taxa.
+    Devolve None se a coleta parou antes da vez desta página.
+    """
+    if cancelada.is_set():
+        return None
+
+    PARAMS = {
+        'limit': RESULTS_PER_PAGE,
+        'page': page
+    }
+    if desde:
+        PARAMS['modified_since'] = desde
+    # Só a 1ª página incremental é condicional: se ela não mudou, nada mudou
+    # O limitador é consultado antes de cada tentativa (novas tentativas também contam na cota)
+    return cliente.get(API_URL, params=PARAMS, condicional=bool(desde) and page == 1, limitador=limitador)
+
+
+def respostas_em_ordem(desde):
+    """
+    Mantém até PAGINAS_EM_VOO páginas sendo buscadas à frente do consumidor
+    e as entrega na ordem, como (page, response) ou (page, exceção).
+    Quando o consumidor fecha o gerador (data limite, fim dos resultados ou
+    erro), as buscas que ainda não começaram são canceladas.
+    """
+    cancelada = threading.Event()
+    paginas = iter(range(1, MAX_PAGES + 1))
+    with ThreadPoolExecutor(max_workers=PAGINAS_EM_VOO) as pool:
+        em_voo = deque((page, pool.submit(buscar_pagina, page, desde, cancelada))
+                       for page in islice(paginas, PAGINAS_EM_VOO))
         try:
-            response = requests.get(API_URL, headers=headers, params=PARAMS, timeout=20)
-            
-            if response.status_code == 200:
-                data = response.json()
-                pulsos = data.get('results', [])
-                
-                if not pulsos:
-                    print("Fim dos resultados da API.")
-                    break 
-
-                for pulso in pulsos:
-                    # Pegar a data de criação
-                    created_str = pulso.get('created', '')
-                    # OTX retorna data assim: '2025-11-18T10:30:00.000'
-                    try:
-                        # Converter string para objeto data para comparar
-                        data_pulso = datetime.strptime(created_str.split('.')[0], "%Y-%m-%dT%H:%M:%S")
-                    except:
-                        continue # Se não tem data, ignora
-                    
-                    # Se o pulso for mais antigo que 1 ano, paramos TUDO.
+            while em_voo:
+                page, futuro = em_voo.popleft()
+                # Repõe a fila antes de esperar: a próxima página já vai sendo buscada
+                proxima = next(paginas, None)
+                if proxima is not None:
+                    em_voo.append((proxima, pool.submit(buscar_pagina, proxima, desde, cancelada)))
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    resultado = e
+                yield page, resultado
+        finally:
+            cancelada.set()
+            for _, futuro in em_voo:
+                futuro.cancel()
+
+
+def coletar(desde=None, para_confirmar=None):
+    """
+    Consumidor: percorre as páginas de /pulses/subscribed, gerando a lista de
+    registros de cada página assim que ela chega. Gera None se a coleta for
+    interrompida por erro.
+
+    Sem 'desde' (modo completo), para ao atingir a data limite de 1 ano.
+    Com 'desde' (modo incremental), pede só os pulsos modificados depois
+    desse momento e vai até o fim dos resultados. A resposta da 1ª página vai
+    para 'para_confirmar': o main a guarda no cache se a coleta terminar bem.
+    """
+    # Calcular a data limite (1 ano atrás)
+    data_limite = datetime.now() - timedelta(days=DIAS_PARA_BUSCAR)
+    if desde:
+        print(f"Modo INCREMENTAL: pulsos modificados desde {desde}.")
+    else:
+        print(f"Modo COMPLETO: buscando dados a partir de: {data_limite.strftime('%Y-%m-%d')}")
+
+    total = 0
+    # As páginas podem "andar" enquanto paginamos (pulsos novos empurram os
+    # antigos para a página seguinte): o mesmo ID não é gerado duas vezes
+    vistos = set()
+    duplicados = 0
+
+    # Loop de Paginação (closing: sair do loop encerra o produtor na hora)
+    with closing(respostas_em_ordem(desde)) as respostas:
+        for page, response in metricas.cronometrar('busca', respostas):
+            if isinstance(response, Exception):
+                print(f"Erro na requisição: {response}")
+                yield None
+                return
+
+            if response.status_code == 304:
+                print("Nenhuma mudança desde a última coleta (304 Not Modified).")
+                break
+            if page == 1 and para_confirmar is not None:
+                para_confirmar.append(response)
+
+            try:
+                with metricas.etapa('transformacao'):
+                    pulsos = response.json().get('results', []) if response.status_code == 200 else None
+            except Exception as e:
+                print(f"Erro na requisição: {e}")
+                yield None
+                return
+
+            if pulsos is None:
+                if response.status_code == 403:
+                    print(f"Erro 403: Chave de API inválida ou expirada.")
+                else:
+                    print(f"Erro API: {response.status_code}")
+                yield None
+                return
+
+            if not pulsos:
+                print("Fim dos resultados da API.")
+                break
+
+            registros = []
+            parar_coleta = False
+            metricas.receber(len(pulsos))
+            with metricas.etapa('transformacao'):
+                for i, transformado in enumerate(transformar_pulsos(pulsos)):
+                    if transformado is None:
+                        metricas.descartar('sem_data')
+                        continue
+                    registro, data_pulso = transformado
+
+                    if registro['pulso_id'] in vistos:
+                        duplicados += 1
+                        metricas.descartar('duplicado')
+                        continue
+
                     if data_pulso < data_limite:
+                        if desde:
+                            # Pulso antigo que só foi editado: fora da janela do site
+                            metricas.descartar('fora_da_janela')
+                            continue
+                        # Se o pulso for mais antigo que 1 ano, paramos TUDO.
                         print(f"Atingimos a data limite ({data_pulso}). Parando coleta.")
+                        metricas.descartar('fora_da_janela', len(pulsos) - i)
                         parar_coleta = True
                         break
-                    
-                    # Se a data for válida, coletamos os dados
-                    # 1. Setores
-                    setores = pulso.get('industries', [])
-                    
-                    # 2. Tags (Ameaças)
-                    tags = pulso.get('tags', [])
-                    
-                    # 3. Países (Direto do objeto pulso, como descobrimos)
-                    paises = pulso.get('countries', [])
-                    
-                    dados_coletados.append({
-                        "data_criacao": created_str.split('T')[0], # Salva YYYY-MM-DD
-                        "setores": setores,
-                        "ameacas": tags,
-                        "paises": paises
-                    })
-            
-                # Rate limit
-                time.sleep(1.5)
-
-            elif response.status_code == 403:
-                print(f"Erro 403: Chave de API inválida ou expirada.")
-                break 
-            else:
-                print(f"Erro API: {response.status_code}")
-                break 
-                
-        except Exception as e:
-            print(f"Erro na requisição: {e}")
-            break
-
-    print(f"\nSucesso! {len(dados_coletados)} pulsos coletados no período de 1 ano.")
-
-except Exception as e:
-    print(f"Erro geral: {e}")
-
-print("\n" + "="*50 + "\n")
+
+                    if registro['pulso_id']:
+                        vistos.add(registro['pulso_id'])
+                    registros.append(registro)
+
+            total += len(registros)
+            print(f"Página {page}: {len(registros)} pulsos ({total} coletados)")
+            yield registros
+            if parar_coleta:
+                break
+        else:
+            print(f"AVISO: limite de {MAX_PAGES} páginas atingido.")
+            if desde:
+                # Sem ter visto todas as mudanças, o checkpoint não pode avançar
+                yield None
+                return
+
+    if duplicados:
+        print(f"{duplicados} pulsos repetidos entre páginas foram ignorados.")
+    print(f"\nSucesso! {total} pulsos coletados no período de 1 ano.")
+
+
+# ==============================================================================
+# 2. CHECKPOINT DA COLETA INCREMENTAL
+# ==============================================================================
+def carregar_estado():
+    try:
+        with open(CAMINHO_ESTADO, "r", encoding="utf-8") as f:
+            return json.load(f)['ultima_modificacao']
+    except Exception:
+        return None
+
+
+def salvar_estado(ultima_modificacao):
+    salvar_json(CAMINHO_ESTADO, {'ultima_modificacao': ultima_modificacao}, indent=2)
+
+
+def mais_recente(a, b):
+    """
+    Compara dois 'modified' da OTX ('2025-11-18T10:30:00.123000'); None perde sempre.
+    """
+    candidatos = []
+    for valor in (a, b):
+        try:
+            candidatos.append((datetime.fromisoformat(valor), valor))
+        except (TypeError, ValueError):
+            pass
+    return max(candidatos)[1] if candidatos else None
+
 
 # ==============================================================================
-# 3. EXPORTAR DADOS BRUTOS PARA O FRONT-END
+# 3. CARGA NO BANCO E EXPORTAÇÃO PARA O FRONT-END
 # ==============================================================================
-if dados_coletados:
+def exportar(con, paginas, banco_vazio):
+    """
+    Grava cada página no banco assim que ela chega (mesclando com o que já
+    existe) e depois gera o JSON.
+    Retorna (recebidos, coleta_interrompida, ultima_modificacao).
+    """
+    recebidos = novos = 0
+    coleta_interrompida = False
+    ultima_modificacao = None
+    exemplo = None
+    for registros in paginas:
+        if registros is None:
+            coleta_interrompida = True
+            continue
+        com_id = [p for p in registros if p['pulso_id']]
+        metricas.descartar('sem_id', len(registros) - len(com_id))
+        with metricas.etapa('gravacao'):
+            # Upsert por ID do pulso: reexecuções não duplicam nada
+            novos += len(com_id) - len(armazenamento.pulsos_existentes(con, [p['pulso_id'] for p in com_id]))
+            armazenamento.salvar_pulsos(con, com_id)
+        recebidos += len(registros)
+        for registro in registros:
+            ultima_modificacao = mais_recente(ultima_modificacao, registro['modificado_em'])
+        if exemplo is None and registros:
+            exemplo = registros[0]
+    cliente.imprimir_resumo()
+
+    print("\n" + "="*50 + "\n")
+
+    if coleta_interrompida:
+        # O banco já tem o resto do ano; os pulsos novos entram por upsert
+        print("AVISO: coleta interrompida por erro; gravando apenas o que foi recebido.")
+    if recebidos == 0:
+        # Mesmo sem novidades (304 ou delta vazio) a janela de 365 dias andou:
+        # reexportar tira do JSON os pulsos que saíram dela (sem mudança, nada é regravado)
+        print("Nenhum pulso novo ou modificado; reaplicando a janela de 1 ano.")
+    else:
+        print(f"{recebidos} pulsos recebidos: {novos} novos, {recebidos - novos} já estavam no banco.")
+
     print("--- 3. EXPORTANDO DADOS COMPLETOS PARA O DASHBOARD ---")
-    
-    caminho_arquivo = os.path.join("site", "otx_kpis.json")
+    if coleta_interrompida and banco_vazio:
+        # Sem histórico no banco, o JSON sairia só com o pedaço recebido
+        print("AVISO: banco ainda vazio; mantendo o 'otx_kpis.json' atual.")
+    else:
+        # O JSON sai do banco (último ano), não só do que veio nesta execução
+        with metricas.etapa('exportacao'):
+            total = armazenamento.exportar(con, ARQUIVO_SAIDA)
+        print(f"Arquivo 'otx_kpis.json' gerado com sucesso com {total} pulsos!")
+
+    # Preview para você ver no terminal
+    if exemplo is not None:
+        print(f"Exemplo de dado coletado: {exemplo}")
+    return recebidos, coleta_interrompida, ultima_modificacao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coletor de pulsos da AlienVault OTX (janela de 1 ano).")
+    parser.add_argument('--completo', action='store_true',
+                        help="Ignora o checkpoint salvo e percorre a janela inteira de 365 dias.")
+    args = parser.parse_args(argv)
 
+    if not API_KEY:
+        print("ERRO: Chave API_OTX não encontrada!")
+        return
+
+    print("="*80)
+    print("ATRIBUIÇÃO: Usando a Base de Dados 'AlienVault OTX' (Open Threat Exchange).")
+    print("="*80 + "\n")
+
+    print("--- 2. COLETANDO DADOS REAIS DA API DA OTX (Janela de 1 Ano) ---")
+    metricas.acompanhar(cliente, limitador)
+    con = armazenamento.conectar()
     try:
-        # Salvamos a LISTA BRUTA. O JavaScript vai fazer a contagem (Counter).
-        with open(caminho_arquivo, "w", encoding="utf-8") as f:
-            json.dump(dados_coletados, f, ensure_ascii=False)
-        print("Arquivo 'otx_kpis.json' gerado com sucesso!")
-        
-        # Preview para você ver no terminal
-        print(f"Exemplo de dado exportado: {dados_coletados[0]}")
-        
+        banco_vazio = con.execute("SELECT COUNT(*) FROM pulsos_otx").fetchone()[0] == 0
+        checkpoint = carregar_estado()
+        # Sem banco não há com o que mesclar: a primeira coleta é sempre completa
+        desde = checkpoint if checkpoint and not banco_vazio and not args.completo else None
+
+        # Coleta e carga andam juntas: só uma página de pulsos fica em memória
+        para_confirmar = []
+        _, coleta_interrompida, ultima_modificacao = exportar(con, coletar(desde, para_confirmar), banco_vazio)
     except Exception as e:
-        print(f"Erro ao salvar arquivo JSON: {e}")
-        
-else:
-    print("Nenhum dado coletado. Verifique a API.")
\ No newline at end of file
+        print(f"Erro ao salvar os dados: {e}")
+        return
+    finally:
+        armazenamento.fechar(con)
+
+    # Como na NVD: o checkpoint só avança se a coleta terminou sem erro
+    if coleta_interrompida:
+        print("AVISO: coleta incompleta; checkpoint NÃO foi avançado.")
+    else:
+        novo_checkpoint = mais_recente(desde, ultima_modificacao)
+        if novo_checkpoint:
+            salvar_estado(novo_checkpoint)
+            print(f"Checkpoint atualizado para {novo_checkpoint}.")
+        if novo_checkpoint == desde:
+            # Checkpoint parado: a próxima execução repete a mesma 1ª página
+            for response in para_confirmar:
+                cliente.confirmar(response)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,35 @@
 # Importar bibliotecas necessárias
-import pandas as pd
-import requests
-import json
-import time
 from datetime import datetime
 import os
 
+import requests
+
+import armazenamento
+import localizacao_ips
+import tabela_paises
+from cliente_http import ClienteHTTP
+from metricas import MetricasColeta
+
 # ==============================================================================
 # 0. CONFIGURAÇÃO DA API (AbuseIPDB)
 # ==============================================================================
 API_KEY = os.getenv("API_ABUSEIPDB")
 
-if not API_KEY:
-    print("ERRO: Chave API_ABUSEIPDB não encontrada.")
-    exit() 
-
 headers = {
     'Key': API_KEY,
     'Accept': 'application/json',
 }
 API_URL = "https://api.abuseipdb.com/api/v2/blacklist"
+# A blacklist tem ~10.000 IPs numa única resposta, então o timeout é maior
+cliente = ClienteHTTP('AbuseIPDB', timeout=60, headers=headers)
 # Limitamos a 10.000 IPs (máximo gratuito)
 PARAMS = {
     'confidenceMinimum': 50,
     'limit': 10000
 }
 
-# --- DICIONÁRIO DE MAPEAMENTO (Country Code -> Country Name) ---
-COUNTRY_MAP = {
-    "US": "United States", "CN": "China", "RU": "Russia", "DE": "Germany",
-    "NL": "Netherlands", "FR": "France", "GB": "United Kingdom",
-    "IN": "India", "BR": "Brazil", "VN": "Vietnam", "UA": "Ukraine",
-    "KR": "South Korea", "JP": "Japan", "CA": "Canada", "AU": "Australia",
-    "PL": "Poland", "TR": "Turkey", "HK": "Hong Kong", "SG": "Singapore",
-    "TW": "Taiwan", "IR": "Iran", "RO": "Romania", "CZ": "Czech Republic",
-    "ID": "Indonesia", "ES": "Spain", "IT": "Italy", "TH": "Thailand"
-}
-
-print("="*80)
-print("ATRIBUIÇÃO: Usando a Base de Dados 'AbuseIPDB'.")
-print("="*80 + "\n")
+ARQUIVO_SAIDA = "paises_kpis.json"
+metricas = MetricasColeta('paises')
 
 # ==============================================================================
 # 1. DICIONÁRIO DE DADOS (NOSSO ALVO)
@@ -47,85 +37,161 @@ print("="*80 + "\n")
 dicionario_dados_paises = {
     "pais_origem": "String (País de origem do IP)",
     "data_report": "Date (Data do último reporte de abuso)",
-    "confidence": "Integer (Nível de certeza de abuso)"
+    "confidence": "Integer (Nível de certeza de abuso)",
+    "asn": "Integer (Sistema autônomo dono do IP, via base offline)"
 }
-print("--- 1. ESTRUTURA DO DICIONÁRIO DE DADOS (NOSSO ALVO) ---")
-for chave, valor in dicionario_dados_paises.items():
-    print(f"{chave}: {valor}")
-print("\n" + "="*50 + "\n")
 
 
 # ==============================================================================
 # 2. COLETA REAL DE DADOS (ETL)
 # ==============================================================================
-print("--- 2. COLETANDO DADOS REAIS DA API DA AbuseIPDB ---")
-
-dados_coletados = []
-
-try:
-    print(f"Buscando a blacklist de IPs maliciosos de {API_URL}...")
-    response = requests.get(API_URL, headers=headers, params=PARAMS, timeout=20)
-    
-    if response.status_code == 200:
-        data = response.json().get('data', [])
-        
-        if not data:
-            print("Nenhum IP malicioso encontrado.")
-        else:
-            print(f"Sucesso! {len(data)} IPs maliciosos recebidos.")
+def transformar_report(ip_info, localizacao=None):
+    """
+    Converte um IP da blacklist no registro do dashboard.
+    'localizacao' é o (pais, asn, organizacao) da base offline, se houver: o país
+    da API tem prioridade, o da base só preenche a falta.
+    Retorna None quando nem a API nem a base conhecem o país.
+    """
+    pais_base, asn, organizacao = localizacao or (None, None, None)
+    code = ip_info.get('countryCode', None) or pais_base
+    # A API retorna data assim: "2025-11-18T15:30:00+00:00"
+    last_reported = ip_info.get('lastReportedAt', None)
+
+    if not code:
+        return None
+
+    # Mapear código para nome (tabela ISO-3166 completa)
+    pais = tabela_paises.nome_en(code)
+
+    # Limpar a data (pegar só YYYY-MM-DD)
+    data_limpa = "N/A"
+    if last_reported:
+         data_limpa = last_reported.split('T')[0]
+
+    return {
+        "pais": pais,
+        "codigo_pais": code,
+        "data_report": data_limpa,
+        "ip": ip_info.get('ipAddress'), # Opcional, para referência
+        "asn": asn,
+        "organizacao": organizacao
+    }
+
+
+def coletar():
+    """
+    Gera os registros da blacklist, um por vez, a partir da resposta da API.
+    """
+    try:
+        print(f"Buscando a blacklist de IPs maliciosos de {API_URL}...")
+        with metricas.etapa('busca'):
+            response = cliente.get(API_URL, params=PARAMS)
+            data = response.json().get('data', []) if response.status_code == 200 else None
+
+        if data is not None:
+            metricas.receber(len(data))
+
+            if not data:
+                print("Nenhum IP malicioso encontrado.")
+            else:
+                print(f"Sucesso! {len(data)} IPs maliciosos recebidos.")
+
+            # --- ENRIQUECIMENTO (país/ASN pela base de faixas local, sem chamadas à API) ---
+            localizacoes = [None] * len(data)
+            with metricas.etapa('enriquecimento'):
+                base = localizacao_ips.carregar_base()
+                if base is not None:
+                    localizacoes = base.localizar_lote(ip_info.get('ipAddress') for ip_info in data)
+            if base is not None:
+                sem_pais = sum(1 for ip_info in data if not ip_info.get('countryCode'))
+                print(f"Base offline: {sum(l is not None for l in localizacoes)} de {len(data)} IPs localizados "
+                      f"({sem_pais} sem país na API).")
 
             # --- ETAPA DE TRANSFORMAÇÃO (T) ---
-            for ip_info in data:
-                code = ip_info.get('countryCode', None)
-                # A API retorna data assim: "2025-11-18T15:30:00+00:00"
-                last_reported = ip_info.get('lastReportedAt', None)
-                
-                if code:
-                    # Mapear código para nome
-                    pais = COUNTRY_MAP.get(code, code)
-                    
-                    # Limpar a data (pegar só YYYY-MM-DD)
-                    data_limpa = "N/A"
-                    if last_reported:
-                         data_limpa = last_reported.split('T')[0]
-
-                    dados_coletados.append({
-                        "pais": pais,
-                        "data_report": data_limpa,
-                        "ip": ip_info.get('ipAddress') # Opcional, para referência
-                    })
-
-    elif response.status_code == 403:
-        print(f"Erro 403: Verifique sua chave de API.")
-    elif response.status_code == 429:
-        print(f"Erro 429: Limite de requisições diárias atingido.")
-    else:
-        print(f"Erro API: {response.status_code} - {response.text}")
-
-except Exception as e:
-    print(f"Erro na coleta: {e}")
-
-print("\n" + "="*50 + "\n")
+            for ip_info, localizacao in zip(data, localizacoes):
+                registro = transformar_report(ip_info, localizacao)
+                if registro is not None:
+                    yield registro
+                else:
+                    metricas.descartar('sem_pais')
+
+        elif response.status_code == 403:
+            print(f"Erro 403: Verifique sua chave de API.")
+        elif response.status_code == 429:
+            print(f"Erro 429: Limite de requisições diárias atingido.")
+        else:
+            print(f"Erro API: {response.status_code} - {response.text}")
+
+    # Só falhas de rede, de resposta (JSON inválido) e de leitura da base: um
+    # erro de programação não pode passar por "nenhum dado coletado"
+    except (requests.RequestException, ValueError, OSError) as e:
+        print(f"Erro na coleta: {e}")
+
 
 # ==============================================================================
-# 3. EXPORTAR DADOS BRUTOS PARA O FRONT-END
+# 3. CARGA NO BANCO E EXPORTAÇÃO PARA O FRONT-END
 # ==============================================================================
-if dados_coletados:
-    print("--- 3. EXPORTANDO DADOS COMPLETOS PARA O DASHBOARD ---")
-    
-    caminho_arquivo = os.path.join("site", "paises_kpis.json")
-
+def exportar(registros):
+    """
+    Grava os registros no banco à medida que são gerados e depois exporta o JSON.
+    """
+    con = armazenamento.conectar()
     try:
-        # Salvamos a lista bruta de objetos {pais, data}
-        with open(caminho_arquivo, "w", encoding="utf-8") as f:
-            json.dump(dados_coletados, f, ensure_ascii=False)
-        print("Arquivo 'paises_kpis.json' gerado com sucesso!")
-        
-        if len(dados_coletados) > 0:
-             print(f"Exemplo: {dados_coletados[0]}")
-        
+        # Cada blacklist é uma foto; o banco guarda quando cada IP apareceu por último
+        # A busca e a transformação acontecem enquanto a gravação consome o gerador
+        with metricas.etapa('gravacao'):
+            gravados = armazenamento.salvar_reports(con, metricas.cronometrar('transformacao', registros),
+                                                    datetime.now().isoformat(timespec='seconds'))
+        cliente.imprimir_resumo()
+
+        print("\n" + "="*50 + "\n")
+
+        if gravados == 0:
+            print("Nenhum dado coletado.")
+        else:
+            print("--- 3. EXPORTANDO DADOS COMPLETOS PARA O DASHBOARD ---")
+            # Salvamos a lista bruta de objetos {pais, data} da blacklist mais recente
+            with metricas.etapa('exportacao'):
+                total = armazenamento.exportar(con, ARQUIVO_SAIDA)
+                print(f"Arquivo 'paises_kpis.json' gerado com sucesso com {total} IPs!")
+                # Endereços empacotados + redes /24, /16 e /48 para consultas de pertinência
+                indexados = armazenamento.exportar_indice_ips(con)
+                print(f"Arquivo 'ips_blacklist.json' gerado com {indexados} IPs indexados.")
+                # Agregado por país, com nomes e centroides, para o mapa de ameaças
+                paises = armazenamento.exportar(con, "mapa_paises.json")
+                print(f"Arquivo 'mapa_paises.json' gerado com {paises} países.")
+
+            top_asns = armazenamento.consultar_top_asns(con)
+            if top_asns:
+                print("\nRedes (ASN) com mais IPs na blacklist:")
+                for asn, organizacao, ips in top_asns:
+                    print(f"  AS{asn:<8} {ips:>6} IPs  {organizacao or ''}")
     except Exception as e:
-        print(f"Erro ao salvar arquivo JSON: {e}")
-        
-else:
-    print("Nenhum dado coletado.")
\ No newline at end of file
+        print(f"Erro ao salvar os dados: {e}")
+    finally:
+        # Também em caso de erro: sem isso a conexão (e o WAL) ficava aberta
+        armazenamento.fechar(con)
+
+
+def main(argv=None):
+    if not API_KEY:
+        print("ERRO: Chave API_ABUSEIPDB não encontrada.")
+        return
+
+    print("="*80)
+    print("ATRIBUIÇÃO: Usando a Base de Dados 'AbuseIPDB'.")
+    print("="*80 + "\n")
+
+    print("--- 1. ESTRUTURA DO DICIONÁRIO DE DADOS (NOSSO ALVO) ---")
+    for chave, valor in dicionario_dados_paises.items():
+        print(f"{chave}: {valor}")
+    print("\n" + "="*50 + "\n")
+
+    print("--- 2. COLETANDO DADOS REAIS DA API DA AbuseIPDB ---")
+    metricas.acompanhar(cliente)
+    # Os registros vão da resposta direto para o banco, sem lista intermediária
+    exportar(coletar())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,11 @@
 # Importar bibliotecas necessárias
-import pandas as pd
-import requests
-import time
-import json
-import warnings
-import os
+from datetime import date
+from itertools import islice
 
-# Suprimir avisos de "UserWarning"
-warnings.filterwarnings('ignore', category=UserWarning)
+import armazenamento
+from cache_http import CacheHTTP
+from cliente_http import ClienteHTTP
+from metricas import MetricasColeta
 
 # ==============================================================================
 # 0. CONFIGURAÇÃO DA API (Have I Been Pwned - HIBP)
@@ -16,11 +14,12 @@ headers = {
     'User-Agent': 'Project-Aegis-Coletor-Academico'
 }
 API_URL = "https://haveibeenpwned.com/api/v3/breaches"
-SLEEP_TIME = 2
+# O catálogo muda poucas vezes por semana: com o cache, a API responde 304 quando nada mudou.
+# Uma requisição só por execução: sem sleep fixo (429/Retry-After ficam com o ClienteHTTP)
+cliente = ClienteHTTP('HIBP', timeout=15, headers=headers, cache=CacheHTTP())
 
-print("="*80)
-print("ATRIBUIÇÃO: Usando a Base de Dados 'Have I Been Pwned' (HIBP) v3.")
-print("="*80 + "\n")
+ARQUIVO_SAIDA = "hibp_kpis.json"
+metricas = MetricasColeta('vazamentos')
 
 # ==============================================================================
 # 1. DICIONÁRIO DE DADOS (NOSSO ALVO)
@@ -31,79 +30,150 @@ dicionario_dados_vazamento = {
     "contas_afetadas": "Integer (Número total de contas vazadas)",
     "setor": "String (Indústria da empresa, ex: 'Technology')"
 }
-print("--- 1. ESTRUTURA DO DICIONÁRIO DE DADOS (NOSSO ALVO) ---")
-for chave, valor in dicionario_dados_vazamento.items():
-    print(f"{chave}: {valor}")
-print("\n" + "="*50 + "\n")
 
 
 # ==============================================================================
 # 2. COLETA REAL DE DADOS (ETL)
 # ==============================================================================
-print("--- 2. COLETANDO DADOS REAIS DA API DO HIBP ---")
-
-dados_coletados = []
-df = pd.DataFrame()
-
-try:
-    print(f"Buscando lista completa de vazamentos em {API_URL}...")
-    response = requests.get(API_URL, headers=headers, timeout=15)
-    
-    print(f"Aguardando {SLEEP_TIME} segundos (Rate Limit)...")
-    time.sleep(SLEEP_TIME)
-    
-    if response.status_code == 200:
+def transformar_vazamento(item):
+    """
+    Converte um vazamento bruto no registro do dashboard.
+    Datas inválidas viram None; o número de contas vira inteiro.
+    """
+    data_vazamento = item.get('BreachDate')
+    try:
+        data_vazamento = date.fromisoformat(data_vazamento[:10]).isoformat()
+    except (TypeError, ValueError):
+        data_vazamento = None
+
+    contas = item.get('PwnCount', 0)
+    try:
+        contas = int(contas)
+    except (TypeError, ValueError):
+        contas = None
+
+    return {
+        "nome_vazamento": item.get('Name'),
+        "data_vazamento": data_vazamento,
+        "contas_afetadas": contas,
+        "setor": item.get('Industry', 'N/A')
+    }
+
+
+def buscar():
+    """
+    Baixa o catálogo com uma requisição condicional.
+    Retorna a resposta (200, ou 304 com o corpo do cache) ou None em caso de erro.
+    """
+    try:
+        print(f"Buscando lista completa de vazamentos em {API_URL}...")
+        with metricas.etapa('busca'):
+            response = cliente.get(API_URL, condicional=True)
+
+        if response.status_code in (200, 304):
+            return response
+        elif response.status_code == 403:
+             print(f"Erro API: {response.status_code} (Forbidden)")
+        else:
+            print(f"Erro API: {response.status_code}")
+
+    except Exception as e:
+        print(f"Erro durante a coleta HIBP: {e}")
+    return None
+
+
+def coletar(response):
+    """
+    Gera os registros de vazamento, um por vez, a partir da resposta da API.
+    """
+    try:
         vazamentos = response.json()
         print(f"Sucesso! {len(vazamentos)} vazamentos catalogados encontrados.")
-        
+        metricas.receber(len(vazamentos))
+
         for item in vazamentos:
-            dados_coletados.append({
-                "nome_vazamento": item.get('Name'),
-                "data_vazamento": item.get('BreachDate'),
-                "contas_afetadas": item.get('PwnCount', 0),
-                "setor": item.get('Industry', 'N/A')
-            })
-            
-    elif response.status_code == 403:
-         print(f"Erro API: {response.status_code} (Forbidden)")
-    else:
-        print(f"Erro API: {response.status_code}")
-
-except Exception as e:
-    print(f"Erro durante a coleta HIBP: {e}")
-
-
-# --- ETAPA DE CARGA (L) ---
-df = pd.DataFrame(dados_coletados)
-
-if df.empty:
-    print("\nAVISO: O DataFrame está vazio.")
-else:
-    print(f"\n--- AMOSTRA DO DATASET (Total: {len(df)} registros) ---")
-    # Converter data e números
-    df['data_vazamento'] = pd.to_datetime(df['data_vazamento'], errors='coerce')
-    df['contas_afetadas'] = pd.to_numeric(df['contas_afetadas'])
-    print(df.head())
+            yield transformar_vazamento(item)
 
-    print("\n" + "="*50 + "\n")
+    except Exception as e:
+        print(f"Erro durante a coleta HIBP: {e}")
 
-    # ==============================================================================
-    # 3. EXPORTAR DADOS COMPLETOS PARA O FRONT-END
-    # ==============================================================================
-    print("--- 3. EXPORTANDO DADOS COMPLETOS PARA O DASHBOARD ---")
 
-    # Converter data para STRING (YYYY-MM-DD) antes de salvar no JSON
-    # Isso evita o erro "Timestamp is not JSON serializable"
-    df['data_vazamento'] = df['data_vazamento'].dt.strftime('%Y-%m-%d')
-    
-    # Converter para lista de dicionários (JSON puro)
-    dados_para_json = df.to_dict('records')
+# ==============================================================================
+# 3. EXPORTAR DADOS COMPLETOS PARA O FRONT-END
+# ==============================================================================
+def exportar(registros):
+    """
+    Grava os registros no banco à medida que são gerados e depois exporta o JSON.
+    Retorna o número de registros exportados (0 se nada foi gerado).
+    """
+    try:
+        con = armazenamento.conectar()
+        # A transformação acontece enquanto a gravação consome o gerador
+        with metricas.etapa('gravacao'):
+            gravados = armazenamento.salvar_vazamentos(con, metricas.cronometrar('transformacao', registros))
+        cliente.imprimir_resumo()
+
+        if gravados == 0:
+            print("\nAVISO: Nenhum vazamento coletado.")
+            armazenamento.fechar(con)
+            return 0
+
+        print(f"\n--- AMOSTRA DO DATASET (Total: {gravados} registros) ---")
+        for registro in islice(armazenamento.consultar_vazamentos(con), 5):
+            print(f"  {registro['nome_vazamento']:<24} {registro['data_vazamento'] or '-':<10} "
+                  f"{registro['contas_afetadas'] or 0:>12,} {registro['setor']}")
+
+        print("\n" + "="*50 + "\n")
+
+        print("--- 3. EXPORTANDO DADOS COMPLETOS PARA O DASHBOARD ---")
+        with metricas.etapa('exportacao'):
+            total = armazenamento.exportar(con, ARQUIVO_SAIDA)
+        armazenamento.fechar(con)
+        print(f"Arquivo 'hibp_kpis.json' gerado com sucesso com {total} registros.")
+        return total
+    except Exception as e:
+        print(f"Erro ao salvar os dados: {e}")
+        return 0
 
-    caminho_arquivo = os.path.join("site", "hibp_kpis.json")
 
+def banco_tem_vazamentos():
+    con = armazenamento.conectar()
     try:
-        with open(caminho_arquivo, "w", encoding="utf-8") as f:
-            json.dump(dados_para_json, f, ensure_ascii=False)
-        print(f"Arquivo 'hibp_kpis.json' gerado com sucesso com {len(dados_para_json)} registros.")
-    except Exception as e:
-        print(f"Erro ao salvar arquivo JSON: {e}")
\ No newline at end of file
+        return con.execute("SELECT COUNT(*) FROM vazamentos_hibp").fetchone()[0] > 0
+    finally:
+        armazenamento.fechar(con)
+
+
+def main(argv=None):
+    print("="*80)
+    print("ATRIBUIÇÃO: Usando a Base de Dados 'Have I Been Pwned' (HIBP) v3.")
+    print("="*80 + "\n")
+
+    print("--- 1. ESTRUTURA DO DICIONÁRIO DE DADOS (NOSSO ALVO) ---")
+    for chave, valor in dicionario_dados_vazamento.items():
+        print(f"{chave}: {valor}")
+    print("\n" + "="*50 + "\n")
+
+    print("--- 2. COLETANDO DADOS REAIS DA API DO HIBP ---")
+    metricas.acompanhar(cliente)
+    response = buscar()
+    if response is None:
+        return
+
+    if response.status_code == 304:
+        if banco_tem_vazamentos():
+            cliente.imprimir_resumo()
+            print("\nCatálogo sem mudanças desde a última coleta (304 Not Modified): "
+                  "transformação e exportação puladas.")
+            return
+        # Banco perdido/novo: o corpo guardado no cache ainda serve
+        print("Catálogo sem mudanças (304), mas o banco está vazio: usando a cópia do cache.")
+
+    # Os registros vão da resposta direto para o banco, sem DataFrame intermediário
+    if exportar(coletar(response)) and response.status_code == 200:
+        # Só agora a resposta vira referência para o próximo If-None-Match
+        cliente.confirmar(response)
+
+
+if __name__ == "__main__":
+    main()
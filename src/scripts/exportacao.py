@@ -0,0 +1,95 @@
+# Funções de exportação compartilhadas pelos coletores
+import filecmp
+import json
+import os
+import tempfile
+
+
+def _gravar_atomico(caminho, escrever, binario=False):
+    """
+    Escreve num arquivo temporário na mesma pasta e só então o renomeia por
+    cima do destino. Assim o site nunca publica um arquivo pela metade, mesmo
+    se o processo morrer no meio. Se o conteúdo for idêntico ao atual, o
+    destino não é tocado (nem a data de modificação muda).
+    """
+    pasta = os.path.dirname(caminho) or "."
+    os.makedirs(pasta, exist_ok=True)
+
+    descritor, temporario = tempfile.mkstemp(dir=pasta, prefix=".tmp-", suffix=os.path.splitext(caminho)[1])
+    try:
+        if binario:
+            arquivo = os.fdopen(descritor, "wb")
+        else:
+            arquivo = os.fdopen(descritor, "w", encoding="utf-8")
+        with arquivo as f:
+            resultado = escrever(f)
+        if os.path.isfile(caminho) and filecmp.cmp(temporario, caminho, shallow=False):
+            os.remove(temporario)
+            return resultado
+        # mkstemp cria o arquivo como 0600; o site precisa de leitura para todos
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return resultado
+
+
+def salvar_json(caminho, dados, **opcoes_json):
+    """
+    Grava 'dados' em 'caminho' de forma atômica.
+    """
+    opcoes_json.setdefault('ensure_ascii', False)
+    _gravar_atomico(caminho, lambda f: json.dump(dados, f, **opcoes_json))
+
+
+def salvar_bytes(caminho, conteudo):
+    """
+    Grava 'conteudo' (bytes) em 'caminho' de forma atômica.
+    """
+    _gravar_atomico(caminho, lambda f: f.write(conteudo), binario=True)
+
+
+# ==============================================================================
+# ESCRITA INCREMENTAL (um registro por vez, memória constante)
+# ==============================================================================
+def _escrever_lista_json(f, registros, codificar):
+    # Mesma saída de json.dump(lista): '[' + registros separados por ', ' + ']'
+    total = 0
+    f.write("[")
+    for registro in registros:
+        if total:
+            f.write(", ")
+        f.write(codificar(registro))
+        total += 1
+    f.write("]")
+    return total
+
+
+def _escrever_ndjson(f, registros, codificar):
+    total = 0
+    for registro in registros:
+        f.write(codificar(registro))
+        f.write("\n")
+        total += 1
+    return total
+
+
+def salvar_json_stream(caminho, registros, **opcoes_json):
+    """
+    Grava uma lista JSON a partir de qualquer iterável (ex.: um cursor do banco)
+    sem montá-la em memória. Retorna o número de registros gravados.
+    """
+    opcoes_json.setdefault('ensure_ascii', False)
+    codificar = json.JSONEncoder(**opcoes_json).encode
+    return _gravar_atomico(caminho, lambda f: _escrever_lista_json(f, registros, codificar))
+
+
+def salvar_ndjson(caminho, registros, **opcoes_json):
+    """
+    Grava um registro JSON por linha (NDJSON). Retorna o número de registros.
+    """
+    opcoes_json.setdefault('ensure_ascii', False)
+    codificar = json.JSONEncoder(**opcoes_json).encode
+    return _gravar_atomico(caminho, lambda f: _escrever_ndjson(f, registros, codificar))
@@ -0,0 +1,152 @@
+# Formato colunar compacto para os datasets do site
+import os
+from collections import Counter
+from datetime import date, timedelta
+
+from exportacao import salvar_json
+
+FORMATO = "aegis-colunar"
+VERSAO = 1
+
+# ==============================================================================
+# 0. ESQUEMAS (tipo de cada coluna por dataset)
+# ==============================================================================
+# texto           -> lista simples de valores
+# numero          -> lista simples de números
+# categoria       -> dicionário de valores distintos + lista de códigos
+# lista_categoria -> dicionário compartilhado + lista de listas de códigos
+# data            -> 'YYYY-MM-DD' guardada como dias desde a menor data da coluna
+ESQUEMAS = {
+    'cve_kpis.json': {
+        'cve_id': 'texto', 'data_publicacao': 'data', 'cvss_score': 'numero',
+        'severidade': 'categoria', 'tipo_falha': 'categoria',
+    },
+    'otx_kpis.json': {
+        'data_criacao': 'data', 'setores': 'lista_categoria',
+        'ameacas': 'lista_categoria', 'paises': 'lista_categoria',
+    },
+    'paises_kpis.json': {
+        'pais': 'categoria', 'data_report': 'data',
+    },
+    'hibp_kpis.json': {
+        'nome_vazamento': 'texto', 'data_vazamento': 'data',
+        'contas_afetadas': 'numero', 'setor': 'categoria',
+    },
+}
+
+
+def ativo():
+    # Ligado pelo orquestrador (--colunar) ou manualmente pela variável de ambiente
+    return os.getenv("AEGIS_FORMATO_COLUNAR") == "1"
+
+
+def nome_colunar(nome_arquivo):
+    # 'paises_kpis.json' -> 'paises_kpis.col.json'
+    return nome_arquivo[:-len(".json")] + ".col.json"
+
+
+def _dicionario(valores):
+    # Valores mais frequentes recebem os menores códigos (menos dígitos no JSON)
+    contagem = Counter(valores)
+    dicionario = sorted(contagem, key=lambda v: (-contagem[v], str(v)))
+    return dicionario, {v: i for i, v in enumerate(dicionario)}
+
+
+def _para_data(valor):
+    try:
+        return date.fromisoformat(valor[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+# ==============================================================================
+# 1. CODIFICAÇÃO
+# ==============================================================================
+def codificar_coluna(tipo, valores):
+    if tipo in ('texto', 'numero'):
+        return {'tipo': tipo, 'valores': valores}
+
+    if tipo == 'categoria':
+        dicionario, codigo = _dicionario(valores)
+        return {'tipo': tipo, 'dicionario': dicionario, 'codigos': [codigo[v] for v in valores]}
+
+    if tipo == 'lista_categoria':
+        dicionario, codigo = _dicionario(v for lista in valores for v in lista or ())
+        return {'tipo': tipo, 'dicionario': dicionario,
+                'codigos': [[codigo[v] for v in lista or ()] for lista in valores]}
+
+    if tipo == 'data':
+        datas = [_para_data(v) for v in valores]
+        validas = [d for d in datas if d is not None]
+        base = min(validas) if validas else date(1970, 1, 1)
+        return {'tipo': tipo, 'base': base.isoformat(),
+                # Valores inválidos ('N/A', nulos) viram null e são devolvidos como None
+                'dias': [(d - base).days if d is not None else None for d in datas]}
+
+    raise ValueError(f"Tipo de coluna desconhecido: {tipo}")
+
+
+def codificar(registros, esquema):
+    """
+    'registros' pode ser qualquer iterável (ex.: um cursor do banco): ele é
+    percorrido uma única vez e só os valores de cada coluna ficam em memória.
+    """
+    valores = {nome: [] for nome in esquema}
+    linhas = 0
+    for registro in registros:
+        linhas += 1
+        for nome, coluna in valores.items():
+            coluna.append(registro.get(nome))
+
+    return {
+        'formato': FORMATO,
+        'versao': VERSAO,
+        'linhas': linhas,
+        'colunas': {nome: codificar_coluna(tipo, valores[nome]) for nome, tipo in esquema.items()},
+    }
+
+
+# ==============================================================================
+# 2. DECODIFICAÇÃO (leitor para os coletores/análises em Python)
+# ==============================================================================
+def decodificar_coluna(coluna):
+    tipo = coluna['tipo']
+    if tipo in ('texto', 'numero'):
+        return coluna['valores']
+    if tipo == 'categoria':
+        dicionario = coluna['dicionario']
+        return [dicionario[c] for c in coluna['codigos']]
+    if tipo == 'lista_categoria':
+        dicionario = coluna['dicionario']
+        return [[dicionario[c] for c in lista] for lista in coluna['codigos']]
+    if tipo == 'data':
+        base = date.fromisoformat(coluna['base'])
+        # Poucos dias distintos: converte cada deslocamento uma única vez
+        textos = {d: (base + timedelta(days=d)).isoformat() for d in set(coluna['dias']) if d is not None}
+        textos[None] = None
+        return [textos[d] for d in coluna['dias']]
+    raise ValueError(f"Tipo de coluna desconhecido: {tipo}")
+
+
+def decodificar(documento):
+    """
+    Converte o documento colunar de volta para a lista de registros (linhas).
+    """
+    if documento.get('formato') != FORMATO:
+        raise ValueError("Documento não está no formato colunar do Aegis.")
+    nomes = list(documento['colunas'])
+    colunas = [decodificar_coluna(documento['colunas'][nome]) for nome in nomes]
+    return [dict(zip(nomes, linha)) for linha in zip(*colunas)] if nomes else []
+
+
+# ==============================================================================
+# 3. EXPORTAÇÃO
+# ==============================================================================
+def salvar(pasta, nome_arquivo, registros):
+    """
+    Grava <pasta>/<nome>.col.json ao lado do JSON em linhas.
+    """
+    caminho = os.path.join(pasta, nome_colunar(nome_arquivo))
+    # Sem espaços após separadores: o formato existe para ser compacto
+    salvar_json(caminho, codificar(registros, ESQUEMAS[nome_arquivo]), separators=(',', ':'))
+    return caminho
@@ -0,0 +1,162 @@
+# Índice estático de detalhes das CVEs: um JSON pequeno por ano e faixa de números (site/cves/AAAA/NNN.json)
+import argparse
+import json
+import os
+import re
+
+from exportacao import salvar_json
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+# Fora do git (milhares de arquivos depois de um backfill): sai do aegis.db e
+# persiste entre execuções do CI no mesmo cache do site/publicado/
+PASTA_INDICE = os.path.join("site", "cves")
+# CVE-2021-44228 -> cves/2021/442.json. A página de análise usa a mesma conta
+# (analise_cves.html): mudar o divisor exige mudar lá também
+DIVISOR = 100
+# Lista dos shards (CVEs e bytes de cada um): muda quando algum shard muda,
+# então é ele que o orquestrador monitora para decidir o deploy. Sem ele, o
+# índice inteiro é regerado do banco
+ARQUIVO_MANIFESTO = "indice.json"
+# A página linka a NVD para o resto
+MAX_REFERENCIAS = 10
+
+PADRAO_CVE = re.compile(r"CVE-(\d{4})-(\d{4,})")
+
+
+def shard_de(cve_id):
+    """
+    'AAAA/NNN' do shard da CVE, ou None se o ID não for do formato CVE-AAAA-NNNN.
+    """
+    encontrado = PADRAO_CVE.fullmatch(cve_id or "")
+    if encontrado is None:
+        return None
+    ano, numero = encontrado.groups()
+    return f"{ano}/{int(numero) // DIVISOR}"
+
+
+def expressao_shard(coluna):
+    """
+    shard_de() em SQL, para os gatilhos que marcam os shards alterados.
+    """
+    return f"substr({coluna}, 5, 4) || '/' || (CAST(substr({coluna}, 10) AS INTEGER) / {DIVISOR})"
+
+
+def caminho_shard(shard, pasta=PASTA_INDICE):
+    ano, prefixo = shard.split("/")
+    return os.path.join(pasta, ano, f"{prefixo}.json")
+
+
+def numero_cve(cve_id):
+    return int(cve_id.rsplit("-", 1)[1])
+
+
+# ==============================================================================
+# 1. REGISTROS E SHARDS
+# ==============================================================================
+def compactar(linha):
+    """
+    Registro publicado de uma CVE (linha do banco com as listas já decodificadas).
+    """
+    return {
+        "publicada": linha['data_publicacao'],
+        "nota": linha['cvss_score'],
+        "severidade": linha['severidade'],
+        "vetor": linha['vetor_cvss'],
+        "tipo_falha": linha['tipo_falha'],
+        "cwes": linha['cwes'],
+        "descricao": linha['descricao'],
+        "referencias": linha['referencias'][:MAX_REFERENCIAS],
+    }
+
+
+def carregar_manifesto(pasta=PASTA_INDICE):
+    try:
+        with open(os.path.join(pasta, ARQUIVO_MANIFESTO), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def salvar_shards(por_shard, shards, pasta=PASTA_INDICE):
+    """
+    Regrava só os 'shards' pedidos a partir de por_shard ({shard: [linhas]}).
+    Shard sem CVEs tem o arquivo removido. Atualiza o manifesto e retorna
+    quantos arquivos mudaram de fato (conteúdo igual não é regravado).
+    """
+    manifesto = carregar_manifesto(pasta) or {}
+    entradas = dict(manifesto.get('shards', {}))
+    alterados = 0
+    for shard in shards:
+        caminho = caminho_shard(shard, pasta)
+        linhas = por_shard.get(shard)
+        if not linhas:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+                alterados += 1
+            entradas.pop(shard, None)
+            continue
+        documento = {linha['cve_id']: compactar(linha)
+                     for linha in sorted(linhas, key=lambda l: numero_cve(l['cve_id']))}
+        antes = os.path.getmtime(caminho) if os.path.exists(caminho) else None
+        salvar_json(caminho, documento, separators=(",", ":"))
+        if os.path.getmtime(caminho) != antes:
+            alterados += 1
+        entradas[shard] = {"cves": len(documento), "bytes": os.path.getsize(caminho)}
+
+    # Ordem numérica ('2021/9' antes de '2021/10'): o manifesto não muda à toa
+    ordenadas = sorted(entradas.items(), key=lambda e: tuple(int(p) for p in e[0].split("/")))
+    salvar_json(os.path.join(pasta, ARQUIVO_MANIFESTO), {
+        "divisor": DIVISOR,
+        "cves": sum(e['cves'] for _, e in ordenadas),
+        "shards": dict(ordenadas),
+    }, indent=1)
+    return alterados
+
+
+def buscar(cve_id, pasta=PASTA_INDICE):
+    """
+    Registro publicado da CVE, lendo só o shard dela. None se não estiver no índice.
+    """
+    cve_id = cve_id.strip().upper()
+    shard = shard_de(cve_id)
+    if shard is None:
+        return None
+    try:
+        with open(caminho_shard(shard, pasta), "r", encoding="utf-8") as f:
+            return json.load(f).get(cve_id)
+    except FileNotFoundError:
+        return None
+
+
+def main(argv=None):
+    """
+    Consulta o índice publicado: python indice_cves.py CVE-2021-44228
+    """
+    parser = argparse.ArgumentParser(description="Consulta CVEs no índice estático publicado.")
+    parser.add_argument('cves', nargs='*', help="IDs de CVE.")
+    parser.add_argument('--pasta', default=PASTA_INDICE)
+    args = parser.parse_args(argv)
+
+    manifesto = carregar_manifesto(args.pasta)
+    if manifesto is None:
+        print(f"Índice não encontrado em '{args.pasta}'.")
+        return
+    print(f"{manifesto['cves']} CVEs em {len(manifesto['shards'])} shards.")
+
+    for cve_id in args.cves:
+        registro = buscar(cve_id, args.pasta)
+        if registro is None:
+            print(f"\n{cve_id}: fora do índice")
+            continue
+        print(f"\n{cve_id.upper()} ({registro['publicada']}) {registro['nota']} {registro['severidade']} "
+              f"| {registro['tipo_falha']} | {', '.join(registro['cwes']) or '-'}")
+        print(f"  {registro['vetor'] or '-'}")
+        print(f"  {registro['descricao']}")
+        for url in registro['referencias']:
+            print(f"  - {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Índice compacto da blacklist da AbuseIPDB: IPs como inteiros ordenados, agregados por rede
+import argparse
+import base64
+import ipaddress
+import json
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import groupby
+
+from exportacao import salvar_json
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+ARQUIVO_SAIDA = "ips_blacklist.json"
+
+# Prefixos agregados por versão: /24 e /16 no IPv4, /48 no IPv6 (tamanho típico de um cliente)
+PREFIXOS = {4: [24, 16], 6: [48]}
+BITS = {4: 32, 6: 128}
+BYTES = {4: 4, 6: 16}
+
+# Redes com um único IP já estão na lista de endereços; só publicamos as repetidas
+MINIMO_AGREGADO = 2
+
+
+# ==============================================================================
+# 1. ÍNDICE
+# ==============================================================================
+class IndiceIPs:
+    """
+    IPs da blacklist em dois vetores ordenados e sem repetição: o IPv4 num
+    array('I') (4 bytes por endereço) e o IPv6 numa lista de inteiros de 128 bits.
+    Consultas por IP ou por faixa (CIDR) são duas buscas binárias: O(log n).
+    """
+
+    def __init__(self, v4=(), v6=()):
+        self.v4 = array('I', sorted(set(v4)))
+        self.v6 = sorted(set(v6))
+
+    @classmethod
+    def de_enderecos(cls, enderecos):
+        """
+        Monta o índice a partir de textos ('1.2.3.4', '2001:db8::1'). Inválidos são ignorados.
+        """
+        v4, v6 = [], []
+        for texto in enderecos:
+            try:
+                ip = ipaddress.ip_address(texto)
+            except (TypeError, ValueError):
+                continue
+            (v4 if ip.version == 4 else v6).append(int(ip))
+        return cls(v4, v6)
+
+    def __len__(self):
+        return len(self.v4) + len(self.v6)
+
+    def _vetor(self, versao):
+        return self.v4 if versao == 4 else self.v6
+
+    def contar(self, rede):
+        """
+        Quantos IPs da blacklist estão em 'rede' (IP ou CIDR, ex.: '45.9.0.0/16').
+        """
+        rede = ipaddress.ip_network(rede, strict=False)
+        vetor = self._vetor(rede.version)
+        inicio = bisect_left(vetor, int(rede.network_address))
+        return bisect_right(vetor, int(rede.broadcast_address), inicio) - inicio
+
+    def contem(self, rede):
+        """
+        True se o IP (ou algum IP da faixa) está na blacklist.
+        """
+        return self.contar(rede) > 0
+
+    def agregar(self, versao, prefixo, minimo=1):
+        """
+        Agrupa os IPs por rede /prefixo. Retorna [(cidr, quantidade)], das redes
+        com mais IPs para as com menos.
+        """
+        deslocamento = BITS[versao] - prefixo
+        classe = ipaddress.IPv4Network if versao == 4 else ipaddress.IPv6Network
+        # O vetor já está ordenado: IPs da mesma rede são vizinhos
+        redes = []
+        for chave, grupo in groupby(self._vetor(versao), key=lambda ip: ip >> deslocamento):
+            quantidade = sum(1 for _ in grupo)
+            if quantidade >= minimo:
+                redes.append((str(classe((chave << deslocamento, prefixo))), quantidade))
+        redes.sort(key=lambda r: -r[1])  # sort estável: empates ficam em ordem de endereço
+        return redes
+
+    # --------------------------------------------------------------------------
+    # Serialização: endereços empacotados em big-endian e codificados em base64
+    # --------------------------------------------------------------------------
+    def para_json(self):
+        documento = {"total": len(self)}
+        for versao in (4, 6):
+            vetor = self._vetor(versao)
+            documento[f"v{versao}"] = {
+                "quantidade": len(vetor),
+                "enderecos": base64.b64encode(empacotar(vetor, versao)).decode("ascii"),
+            }
+        documento["agregados"] = {
+            f"v{versao}/{prefixo}": [list(r) for r in self.agregar(versao, prefixo, MINIMO_AGREGADO)]
+            for versao, prefixos in PREFIXOS.items() for prefixo in prefixos
+        }
+        return documento
+
+    @classmethod
+    def de_json(cls, documento):
+        return cls(*(desempacotar(base64.b64decode(documento[f"v{versao}"]["enderecos"]), versao)
+                     for versao in (4, 6)))
+
+
+def empacotar(vetor, versao):
+    if versao == 4:
+        # array('I') já é o formato em memória; só falta a ordem dos bytes
+        copia = array('I', vetor)
+        if sys.byteorder == "little":
+            copia.byteswap()
+        return copia.tobytes()
+    return b"".join(ip.to_bytes(BYTES[6], "big") for ip in vetor)
+
+
+def desempacotar(conteudo, versao):
+    if versao == 4:
+        vetor = array('I')
+        vetor.frombytes(conteudo)
+        if sys.byteorder == "little":
+            vetor.byteswap()
+        return vetor
+    tamanho = BYTES[6]
+    return [int.from_bytes(conteudo[i:i + tamanho], "big") for i in range(0, len(conteudo), tamanho)]
+
+
+# ==============================================================================
+# 2. ARQUIVO
+# ==============================================================================
+def salvar(caminho, indice):
+    salvar_json(caminho, indice.para_json(), separators=(",", ":"))
+
+
+def carregar(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        return IndiceIPs.de_json(json.load(f))
+
+
+def main(argv=None):
+    """
+    Consulta o índice publicado: python indice_ips.py 45.9.20.1 2001:db8::/48
+    """
+    parser = argparse.ArgumentParser(description="Consulta IPs e faixas na blacklist publicada.")
+    parser.add_argument('consultas', nargs='*', help="IPs ou faixas CIDR.")
+    parser.add_argument('--arquivo', default=f"site/{ARQUIVO_SAIDA}")
+    parser.add_argument('--top', type=int, default=5, help="Redes mais frequentes listadas por prefixo.")
+    args = parser.parse_args(argv)
+
+    indice = carregar(args.arquivo)
+    print(f"{len(indice)} IPs na blacklist ({len(indice.v4)} IPv4, {len(indice.v6)} IPv6).")
+
+    if not args.consultas:
+        for versao, prefixos in PREFIXOS.items():
+            for prefixo in prefixos:
+                redes = indice.agregar(versao, prefixo)[:args.top]
+                print(f"\nIPv{versao} /{prefixo}: " + ", ".join(f"{cidr} ({n})" for cidr, n in redes))
+        return
+
+    for consulta in args.consultas:
+        try:
+            quantidade = indice.contar(consulta)
+        except ValueError:
+            print(f"{consulta}: endereço inválido")
+            continue
+        print(f"{consulta}: {'NA BLACKLIST' if quantidade else 'fora da blacklist'} ({quantidade} IPs)")
+
+
+if __name__ == "__main__":
+    main()
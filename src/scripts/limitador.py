@@ -0,0 +1,46 @@
+# Limitador de taxa compartilhado entre threads (token bucket)
+import threading
+import time
+
+
+class LimitadorTaxa:
+    """
+    Token bucket thread-safe.
+
+    Para respeitar uma cota de 'quota' requisições a cada 'periodo' segundos
+    em QUALQUER janela deslizante, a capacidade (rajada) mais o que é
+    reposto durante o período não pode passar da cota:
+        capacidade + taxa * periodo <= quota
+    Por isso a taxa de reposição é (quota - capacidade) / periodo.
+    """
+
+    def __init__(self, quota, periodo, capacidade=1):
+        capacidade = max(1, min(capacidade, quota - 1))
+        self.capacidade = capacidade
+        self.taxa = (quota - capacidade) / periodo
+        self._fichas = float(capacidade)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+        self.tempo_esperando = 0.0
+
+    def _repor(self, agora):
+        self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def aguardar(self):
+        """
+        Bloqueia até existir uma ficha disponível e a consome.
+        Retorna quantos segundos a chamada ficou esperando.
+        """
+        inicio = time.monotonic()
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                self._repor(agora)
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    espera = agora - inicio
+                    self.tempo_esperando += espera
+                    return espera
+                falta = (1 - self._fichas) / self.taxa
+            time.sleep(falta)
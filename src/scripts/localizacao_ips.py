@@ -0,0 +1,239 @@
+# Geolocalização/ASN offline: base de faixas de IP local, consultada por busca binária
+import csv
+import gzip
+import importlib.util
+import os
+import socket
+from array import array
+from bisect import bisect_right
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+# Padrão: ip2asn-combined.tsv.gz do iptoasn.com (faixa, ASN, país e organização, IPv4 e IPv6)
+URL_BASE_PADRAO = "https://iptoasn.com/data/ip2asn-combined.tsv.gz"
+CAMINHO_BASE = os.getenv("AEGIS_BASE_IPS", os.path.join("dados", "ip2asn-combined.tsv.gz"))
+
+# Opcional: só é usado quando a base configurada é um .mmdb (MaxMind/DB-IP)
+TEM_MAXMINDDB = importlib.util.find_spec("maxminddb") is not None
+
+# Faixas sem dono (ASN 0) vêm com país "None" no ip2asn
+SEM_PAIS = {"", "None", "ZZ", "-"}
+
+
+def para_inteiro(texto):
+    """
+    '1.2.3.4' -> (4, 16909060); '2001:db8::1' -> (6, ...). Retorna None se inválido.
+    inet_pton é bem mais rápido que ipaddress e igualmente estrito.
+    """
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, texto), "big")
+    except (OSError, TypeError):
+        pass
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, texto), "big")
+    except (OSError, TypeError):
+        return None
+
+
+# ==============================================================================
+# 1. ÍNDICE DE FAIXAS
+# ==============================================================================
+class IndiceFaixas:
+    """
+    Faixas [inicio, fim] ordenadas e sem sobreposição, uma tabela por versão de IP.
+    Cada faixa aponta para uma tupla (pais, asn, organizacao) guardada uma só vez:
+    a base tem centenas de milhares de faixas, mas poucos milhares de donos.
+    """
+
+    def __init__(self):
+        self.inicios = {4: array('I'), 6: []}
+        self.fins = {4: array('I'), 6: []}
+        self.donos = {4: array('I'), 6: array('I')}
+        self.tabela = []
+        self._posicoes = {}
+
+    def adicionar(self, inicio, fim, pais, asn=None, organizacao=None):
+        """
+        Acrescenta uma faixa (textos de IP). As faixas devem vir em ordem crescente,
+        como nos arquivos do ip2asn/DB-IP; ordenar() corrige bases fora de ordem.
+        """
+        a, b = para_inteiro(inicio), para_inteiro(fim)
+        if a is None or b is None or a[0] != b[0]:
+            return
+        pais = None if pais in SEM_PAIS else pais
+        if pais is None and not asn:
+            return  # faixa não alocada: não ajuda a enriquecer nada
+        dono = (pais, asn or None, organizacao or None)
+        posicao = self._posicoes.get(dono)
+        if posicao is None:
+            posicao = self._posicoes[dono] = len(self.tabela)
+            self.tabela.append(dono)
+        versao = a[0]
+        self.inicios[versao].append(a[1])
+        self.fins[versao].append(b[1])
+        self.donos[versao].append(posicao)
+
+    def ordenar(self):
+        for versao in (4, 6):
+            inicios = self.inicios[versao]
+            if all(inicios[i] <= inicios[i + 1] for i in range(len(inicios) - 1)):
+                continue
+            ordem = sorted(range(len(inicios)), key=inicios.__getitem__)
+            self.inicios[versao] = _reordenar(inicios, ordem)
+            self.fins[versao] = _reordenar(self.fins[versao], ordem)
+            self.donos[versao] = _reordenar(self.donos[versao], ordem)
+        return self
+
+    def __len__(self):
+        return len(self.inicios[4]) + len(self.inicios[6])
+
+    def localizar(self, ip):
+        """
+        Retorna (pais, asn, organizacao) do IP, ou None se ele não estiver na base.
+        """
+        convertido = para_inteiro(ip)
+        if convertido is None:
+            return None
+        versao, valor = convertido
+        # Última faixa que começa antes do IP; ele está nela se não passou do fim
+        i = bisect_right(self.inicios[versao], valor) - 1
+        if i < 0 or valor > self.fins[versao][i]:
+            return None
+        return self.tabela[self.donos[versao][i]]
+
+    def localizar_lote(self, ips):
+        """
+        Versão em lote de localizar(): uma resposta por IP, na mesma ordem.
+        IPs repetidos são resolvidos uma única vez, e o caminho do IPv4 (quase
+        toda a blacklist) fica num laço só, sem chamadas de método por IP.
+        """
+        inicios, fins, donos, tabela = self.inicios[4], self.fins[4], self.donos[4], self.tabela
+        pton, familia, de_bytes = socket.inet_pton, socket.AF_INET, int.from_bytes
+        cache = {}
+        resultados = []
+        for ip in ips:
+            if ip in cache:
+                resultados.append(cache[ip])
+                continue
+            try:
+                valor = de_bytes(pton(familia, ip), "big")
+            except (OSError, TypeError):
+                localizacao = self.localizar(ip)  # IPv6 ou inválido
+            else:
+                i = bisect_right(inicios, valor) - 1
+                localizacao = tabela[donos[i]] if i >= 0 and valor <= fins[i] else None
+            cache[ip] = localizacao
+            resultados.append(localizacao)
+        return resultados
+
+
+def _reordenar(vetor, ordem):
+    reordenado = [vetor[i] for i in ordem]
+    return array(vetor.typecode, reordenado) if isinstance(vetor, array) else reordenado
+
+
+# ==============================================================================
+# 2. LEITURA DAS BASES
+# ==============================================================================
+def _abrir_texto(caminho):
+    if caminho.endswith(".gz"):
+        return gzip.open(caminho, "rt", encoding="utf-8", newline="")
+    return open(caminho, "r", encoding="utf-8", newline="")
+
+
+def _para_asn(texto):
+    texto = (texto or "").strip().upper().removeprefix("AS")
+    return int(texto) if texto.isdigit() and int(texto) > 0 else None
+
+
+def ler_tsv_ip2asn(caminho):
+    """
+    Formato do iptoasn.com: inicio, fim, ASN, país, organização (separados por TAB).
+    """
+    indice = IndiceFaixas()
+    with _abrir_texto(caminho) as f:
+        for linha in f:
+            campos = linha.rstrip("\r\n").split("\t")
+            if len(campos) >= 4:
+                indice.adicionar(campos[0], campos[1], campos[3], _para_asn(campos[2]),
+                                 campos[4] if len(campos) > 4 else None)
+    return indice.ordenar()
+
+
+def ler_csv(caminho):
+    """
+    CSV por posição: inicio, fim, país [, ASN [, organização]] (ex.: DB-IP lite).
+    Uma linha de cabeçalho, se houver, é ignorada por não começar com um IP.
+    """
+    indice = IndiceFaixas()
+    with _abrir_texto(caminho) as f:
+        for campos in csv.reader(f):
+            if len(campos) < 3:
+                continue
+            asn = _para_asn(campos[3]) if len(campos) > 3 else None
+            indice.adicionar(campos[0], campos[1], campos[2], asn, campos[4] if len(campos) > 4 else None)
+    return indice.ordenar()
+
+
+class BaseMMDB:
+    """
+    Base MaxMind/DB-IP (.mmdb), que já é uma árvore de busca em disco. Mesma
+    interface do IndiceFaixas; exige o pacote opcional 'maxminddb'.
+    """
+
+    def __init__(self, caminho):
+        import maxminddb
+        self.leitor = maxminddb.open_database(caminho)
+
+    def __len__(self):
+        return self.leitor.metadata().node_count
+
+    def localizar(self, ip):
+        try:
+            registro = self.leitor.get(ip)
+        except (TypeError, ValueError):  # IP ausente ou inválido
+            return None
+        if not registro:
+            return None
+        pais = (registro.get('country') or registro.get('registered_country') or {}).get('iso_code')
+        asn = registro.get('autonomous_system_number')
+        organizacao = registro.get('autonomous_system_organization')
+        if pais is None and asn is None:
+            return None
+        return (pais, asn, organizacao)
+
+    def localizar_lote(self, ips):
+        """
+        Uma resposta por IP, na mesma ordem; IPs repetidos são lidos da base uma vez só.
+        """
+        cache = {}
+        resultados = []
+        for ip in ips:
+            if ip not in cache:
+                cache[ip] = self.localizar(ip)
+            resultados.append(cache[ip])
+        return resultados
+
+
+def carregar_base(caminho=CAMINHO_BASE):
+    """
+    Lê a base de faixas configurada. Retorna None (com aviso) se ela não existir:
+    o enriquecimento é opcional e o pipeline segue só com os dados da API.
+    """
+    if not os.path.exists(caminho):
+        print(f"Aviso: base de IPs '{caminho}' não encontrada; seguindo sem geolocalização offline "
+              f"(baixe {URL_BASE_PADRAO} ou defina AEGIS_BASE_IPS).")
+        return None
+    if caminho.endswith(".mmdb"):
+        if not TEM_MAXMINDDB:
+            print(f"Aviso: '{caminho}' é uma base .mmdb, mas o pacote 'maxminddb' não está instalado.")
+            return None
+        try:
+            return BaseMMDB(caminho)
+        except (OSError, RuntimeError) as e:  # maxminddb.InvalidDatabaseError é um RuntimeError
+            print(f"Aviso: base '{caminho}' ilegível ({e}); seguindo sem geolocalização offline.")
+            return None
+    if ".tsv" in os.path.basename(caminho):
+        return ler_tsv_ip2asn(caminho)
+    return ler_csv(caminho)
@@ -0,0 +1,224 @@
+# Métricas estruturadas de cada execução: requisições, esperas, registros e duração das etapas
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from exportacao import salvar_json
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+# Um arquivo por coletor (cada um roda no seu processo); o orquestrador junta
+# todos no CAMINHO_EXECUCAO. Nada disso vai para o git: é diagnóstico do CI
+PASTA_METRICAS = os.path.join("dados", "metricas")
+CAMINHO_EXECUCAO = "run_metrics.json"
+# Histórico opcional (orquestrador --historico-metricas N): as últimas N execuções
+CAMINHO_HISTORICO = os.path.join(PASTA_METRICAS, "historico.json")
+
+# Requisições detalhadas por coletor (as demais só entram nos totais)
+MAX_REQUISICOES_DETALHADAS = 1000
+
+
+def agora_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class MetricasColeta:
+    """
+    Métricas de um coletor numa execução:
+    - etapas: segundos acumulados por etapa (busca, transformacao, gravacao,
+      exportacao...). Nas coletas em fluxo as etapas se intercalam, então cada
+      uma soma todos os seus trechos; uma etapa aberta dentro de outra pausa a
+      de fora, e a soma das etapas nunca conta o mesmo segundo duas vezes;
+    - registros recebidos e descartados (por motivo);
+    - esperas por motivo (limitador de taxa, sleep fixo), além do backoff dos
+      clientes HTTP acompanhados;
+    - requisições (latência, bytes, status, tentativa) de cada ClienteHTTP.
+    """
+
+    def __init__(self, fonte):
+        self.fonte = fonte
+        self.inicio = agora_iso()
+        self._inicio = time.perf_counter()
+        self.etapas = defaultdict(float)
+        self._pilha = []  # [nome, início do trecho atual] das etapas abertas
+        self.recebidos = 0
+        self.descartados = Counter()
+        self.esperas = defaultdict(float)
+        self.clientes = []
+        self.limitadores = []
+
+    def _entrar(self, nome):
+        agora = time.perf_counter()
+        if self._pilha:
+            externa, inicio = self._pilha[-1]
+            self.etapas[externa] += agora - inicio
+        self._pilha.append([nome, agora])
+
+    def _sair(self):
+        agora = time.perf_counter()
+        nome, inicio = self._pilha.pop()
+        self.etapas[nome] += agora - inicio
+        if self._pilha:
+            self._pilha[-1][1] = agora  # a etapa de fora volta a contar
+
+    @contextmanager
+    def etapa(self, nome):
+        """
+        Cronometra o bloco. Não deve envolver um 'yield': num gerador, o
+        consumidor abriria as etapas dele no meio desta.
+        """
+        self._entrar(nome)
+        try:
+            yield
+        finally:
+            self._sair()
+
+    def cronometrar(self, nome, iteravel):
+        """
+        Gera os itens de 'iteravel', somando à etapa 'nome' o tempo gasto para
+        produzir cada um (ex.: esperar a próxima página de um gerador de coleta).
+        """
+        iterador = iter(iteravel)
+        while True:
+            self._entrar(nome)
+            try:
+                item = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                self._sair()
+            yield item
+
+    def receber(self, quantidade=1):
+        self.recebidos += quantidade
+
+    def descartar(self, motivo, quantidade=1):
+        if quantidade:
+            self.descartados[motivo] += quantidade
+
+    def esperar(self, motivo, segundos):
+        self.esperas[motivo] += segundos
+
+    def acompanhar(self, cliente=None, limitador=None):
+        """
+        Registra um ClienteHTTP e/ou LimitadorTaxa: os números deles entram no resumo.
+        """
+        if cliente is not None:
+            self.clientes.append(cliente)
+        if limitador is not None:
+            self.limitadores.append(limitador)
+
+    def resumo(self):
+        esperas = dict(self.esperas)
+        requisicoes = []
+        http = Counter()
+        for cliente in self.clientes:
+            estatisticas = cliente.estatisticas()
+            for chave in ('requisicoes', 'novas_tentativas', 'bytes_recebidos', 'nao_modificados'):
+                http[chave] += estatisticas[chave]
+            http['latencia_total_s'] += sum(r['latencia_s'] for r in cliente.detalhes)
+            esperas['backoff'] = esperas.get('backoff', 0.0) + estatisticas['tempo_em_backoff_s']
+            requisicoes += cliente.detalhes
+        for limitador in self.limitadores:
+            esperas['limitador'] = esperas.get('limitador', 0.0) + limitador.tempo_esperando
+
+        status = Counter(str(r['status']) for r in requisicoes)
+        latencias = sorted(r['latencia_s'] for r in requisicoes)
+        return {
+            'fonte': self.fonte,
+            'inicio': self.inicio,
+            'duracao_s': round(time.perf_counter() - self._inicio, 3),
+            'etapas_s': {nome: round(segundos, 3) for nome, segundos in self.etapas.items()},
+            'esperas_s': {motivo: round(segundos, 3) for motivo, segundos in esperas.items()},
+            'registros': {
+                'recebidos': self.recebidos,
+                'descartados': sum(self.descartados.values()),
+                'descartados_por_motivo': dict(self.descartados),
+            },
+            'http': {
+                'requisicoes': http['requisicoes'],
+                'novas_tentativas': http['novas_tentativas'],
+                'bytes_recebidos': http['bytes_recebidos'],
+                'nao_modificados': http['nao_modificados'],
+                'status': dict(status),
+                'latencia_total_s': round(http['latencia_total_s'], 3),
+                'latencia_p50_s': percentil(latencias, 0.50),
+                'latencia_p95_s': percentil(latencias, 0.95),
+                'latencia_maxima_s': latencias[-1] if latencias else 0.0,
+            },
+            'requisicoes': requisicoes[:MAX_REQUISICOES_DETALHADAS],
+        }
+
+    def salvar(self, pasta=PASTA_METRICAS):
+        caminho = os.path.join(pasta, f"{self.fonte}.json")
+        salvar_json(caminho, self.resumo(), indent=2)
+        return caminho
+
+
+def percentil(ordenados, fracao):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+
+# ==============================================================================
+# 1. ARQUIVO DA EXECUÇÃO (orquestrador)
+# ==============================================================================
+def ler_coletor(fonte, pasta=PASTA_METRICAS):
+    try:
+        with open(os.path.join(pasta, f"{fonte}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def limpar_coletor(fonte, pasta=PASTA_METRICAS):
+    """
+    Remove as métricas de uma execução anterior: coletor que morrer no meio
+    não deixa números velhos passando por novos.
+    """
+    try:
+        os.remove(os.path.join(pasta, f"{fonte}.json"))
+    except FileNotFoundError:
+        pass
+
+
+def totais(coletores):
+    soma = Counter()
+    esperas = defaultdict(float)
+    for metricas in coletores.values():
+        if 'http' not in metricas:
+            continue  # coletor que não chegou a gravar as métricas
+        soma['requisicoes'] += metricas['http']['requisicoes']
+        soma['novas_tentativas'] += metricas['http']['novas_tentativas']
+        soma['bytes_recebidos'] += metricas['http']['bytes_recebidos']
+        soma['registros_recebidos'] += metricas['registros']['recebidos']
+        soma['registros_descartados'] += metricas['registros']['descartados']
+        for motivo, segundos in metricas['esperas_s'].items():
+            esperas[motivo] += segundos
+    return dict(soma, esperas_s={motivo: round(s, 3) for motivo, s in esperas.items()})
+
+
+def gravar_execucao(execucao, historico=0):
+    """
+    Grava o run_metrics.json. Com historico > 0, acrescenta um resumo da
+    execução (sem o detalhe das requisições) ao CAMINHO_HISTORICO, mantendo
+    as últimas 'historico' execuções.
+    """
+    salvar_json(CAMINHO_EXECUCAO, execucao, indent=2)
+    if historico <= 0:
+        return
+    try:
+        with open(CAMINHO_HISTORICO, "r", encoding="utf-8") as f:
+            anteriores = json.load(f)
+    except (FileNotFoundError, ValueError):
+        anteriores = []
+    enxuta = dict(execucao, coletores={
+        fonte: {chave: valor for chave, valor in (metricas or {}).items() if chave != 'requisicoes'}
+        for fonte, metricas in execucao['coletores'].items()
+    })
+    salvar_json(CAMINHO_HISTORICO, (anteriores + [enxuta])[-historico:], indent=2)
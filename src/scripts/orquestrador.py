@@ -0,0 +1,306 @@
+# Orquestrador: roda os coletores em paralelo, cada um no seu processo
+import argparse
+import hashlib
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.connection import wait
+
+import armazenamento
+import busca_cves
+import indice_cves
+import metricas
+import publicacao
+import resumo_dashboard
+import transformacao_vetorizada
+from exportacao import salvar_json
+
+# ==============================================================================
+# 0. FONTES DISPONÍVEIS
+# ==============================================================================
+# nome -> (módulo do coletor, arquivo gerado em site/, timeout em segundos)
+FONTES = {
+    'otx': ('coletor_otx', 'otx_kpis.json', 20 * 60),
+    'paises': ('coletor_paises', 'paises_kpis.json', 5 * 60),
+    'cve': ('coletor_cve', 'cve_kpis.json', 30 * 60),
+    'vazamentos': ('coletor_vazamentos', 'hibp_kpis.json', 5 * 60),
+}
+
+# Decisão de commit/deploy lida pelo workflow (fora do git: não é um dado do site)
+CAMINHO_DECISAO = "resumo_execucao.json"
+
+
+def arquivos_monitorados():
+    """
+    Saídas que justificam um commit: só os arquivos de dados do site. Os
+    checkpoints das coletas (dados/estado_*.json) ficam de fora, porque os
+    coletores regravam o horário da sincronização a cada execução, e o
+    aegis.db também: o SQLite regrava páginas (e o contador de alterações do
+    cabeçalho) mesmo sem mudança nos dados. Os dois vão pelo cache do CI.
+    """
+    caminhos = [os.path.join(publicacao.PASTA_SITE, nome) for nome in publicacao.ARQUIVOS]
+    # Os shards do índice de CVEs são muitos: o manifesto muda junto com qualquer um deles
+    caminhos.append(os.path.join(indice_cves.PASTA_INDICE, indice_cves.ARQUIVO_MANIFESTO))
+    return caminhos
+
+
+class SaidaComPrefixo:
+    """
+    Prefixa cada linha impressa pelo coletor com o nome da fonte,
+    para o log do CI continuar legível com os processos intercalados.
+    """
+
+    def __init__(self, prefixo, destino):
+        self.prefixo = prefixo
+        self.destino = destino
+        self._pendente = ""
+
+    def write(self, texto):
+        self._pendente += texto
+        *linhas, self._pendente = self._pendente.split("\n")
+        for linha in linhas:
+            self.destino.write(f"[{self.prefixo}] {linha}\n")
+        self.destino.flush()
+        return len(texto)
+
+    def flush(self):
+        if self._pendente:
+            self.destino.write(f"[{self.prefixo}] {self._pendente}\n")
+            self._pendente = ""
+        self.destino.flush()
+
+
+def executar_coletor(nome, modulo):
+    sys.stdout = SaidaComPrefixo(nome, sys.__stdout__)
+    sys.stderr = SaidaComPrefixo(nome, sys.__stderr__)
+    try:
+        coletor = importlib.import_module(modulo)
+        try:
+            coletor.main([])
+        finally:
+            # Mesmo se o coletor quebrar, o que ele mediu até ali vai para o run_metrics.json
+            coletor.metricas.salvar()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def hash_arquivo(caminho):
+    try:
+        with open(caminho, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def gravar_decisao(antes):
+    """
+    Compara o hash de cada saída monitorada com o de antes da execução e grava
+    o resumo em CAMINHO_DECISAO. No GitHub Actions, também exporta 'mudou'
+    como output do passo. Retorna a lista de arquivos alterados.
+    """
+    arquivos = {}
+    for caminho in sorted(set(antes) | set(arquivos_monitorados())):
+        depois = hash_arquivo(caminho)
+        arquivos[caminho] = {'antes': antes.get(caminho), 'depois': depois,
+                             'mudou': antes.get(caminho) != depois}
+    alterados = [caminho for caminho, info in arquivos.items() if info['mudou']]
+    salvar_json(CAMINHO_DECISAO, {'mudou': bool(alterados), 'alterados': alterados, 'arquivos': arquivos},
+                indent=2)
+
+    saida_github = os.getenv("GITHUB_OUTPUT")
+    if saida_github:
+        with open(saida_github, "a", encoding="utf-8") as f:
+            f.write(f"mudou={'true' if alterados else 'false'}\n")
+    return alterados
+
+
+# ==============================================================================
+# 1. EXECUÇÃO
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa os coletores do Project Aegis em paralelo.")
+    parser.add_argument('fontes', nargs='*', metavar='fonte',
+                        help=f"Fontes a coletar: {', '.join(FONTES)} (padrão: todas).")
+    parser.add_argument('--timeout', type=int, default=None,
+                        help="Timeout (s) para todas as fontes, substituindo o padrão de cada uma.")
+    parser.add_argument('--colunar', action='store_true',
+                        help="Também gera a versão colunar (*.col.json) de cada dataset.")
+    parser.add_argument('--vetorizado', action='store_true',
+                        help="Transforma as páginas da OTX em lote com pandas (mesma saída).")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="Ignora o cache HTTP: nenhuma requisição condicional, tudo é baixado de novo.")
+    parser.add_argument('--busca-cves', action='store_true',
+                        help=f"Reconstrói o índice de busca textual das CVEs em {busca_cves.PASTA_BUSCA} (fora do git).")
+    parser.add_argument('--historico-metricas', type=int, default=0, metavar='N',
+                        help=f"Mantém as métricas das últimas N execuções em {metricas.CAMINHO_HISTORICO}.")
+    args = parser.parse_args(argv)
+
+    if args.colunar:
+        # Herdado pelos processos dos coletores
+        os.environ["AEGIS_FORMATO_COLUNAR"] = "1"
+    if args.sem_cache:
+        os.environ["AEGIS_SEM_CACHE"] = "1"
+    if args.vetorizado:
+        os.environ["AEGIS_VETORIZADO"] = "1"
+        if not transformacao_vetorizada.TEM_PANDAS:
+            print("AVISO: módulo 'pandas' não instalado; as transformações seguem registro a registro.")
+
+    desconhecidas = [nome for nome in args.fontes if nome not in FONTES]
+    if desconhecidas:
+        parser.error(f"fonte(s) desconhecida(s): {', '.join(desconhecidas)}")
+    selecionadas = args.fontes or list(FONTES)
+
+    print("="*80)
+    print(f"ORQUESTRADOR: coletando {', '.join(selecionadas)} em paralelo.")
+    print("="*80 + "\n")
+
+    inicio_execucao = metricas.agora_iso()
+    inicio = time.monotonic()
+    etapas = {}
+
+    # Conteúdo antes da coleta, para decidir no fim se há algo a commitar/publicar
+    antes = {caminho: hash_arquivo(caminho) for caminho in arquivos_monitorados()}
+
+    # Cada coletor roda isolado: se um travar ou quebrar, os outros seguem
+    processos = {}
+    for nome in selecionadas:
+        modulo, arquivo, timeout = FONTES[nome]
+        caminho = os.path.join("site", arquivo)
+        metricas.limpar_coletor(nome)
+        processo = multiprocessing.Process(target=executar_coletor, args=(nome, modulo), name=nome)
+        processo.start()
+        processos[nome] = {
+            'processo': processo,
+            'caminho': caminho,
+            'antes': hash_arquivo(caminho),
+            'prazo': time.monotonic() + (args.timeout or timeout),
+            'inicio': time.monotonic(),
+        }
+
+    # Espera os processos terminarem, encerrando quem passar do prazo
+    pendentes = dict(processos)
+    while pendentes:
+        prazo_mais_proximo = min(info['prazo'] for info in pendentes.values())
+        wait([info['processo'].sentinel for info in pendentes.values()],
+             timeout=max(0, prazo_mais_proximo - time.monotonic()))
+
+        for nome, info in list(pendentes.items()):
+            processo = info['processo']
+            if processo.is_alive() and time.monotonic() >= info['prazo']:
+                processo.terminate()
+                info['timeout'] = True
+            if not processo.is_alive():
+                processo.join()
+                info['fim'] = time.monotonic()
+                del pendentes[nome]
+
+    etapas['coleta'] = time.monotonic() - inicio
+
+    resumo = {}
+    for nome, info in processos.items():
+        processo = info['processo']
+        if info.get('timeout'):
+            situacao = 'TIMEOUT'
+        elif processo.exitcode != 0:
+            situacao = f'ERRO (código {processo.exitcode})'
+        elif hash_arquivo(info['caminho']) != info['antes']:
+            situacao = 'ATUALIZADO'
+        else:
+            situacao = 'SEM ALTERAÇÃO'
+
+        resumo[nome] = (situacao, info['fim'] - info['inicio'])
+
+    # Métricas gravadas por cada coletor (ausentes se ele morreu por timeout)
+    coletores = {
+        nome: dict(situacao=situacao, duracao_processo_s=round(duracao, 3), **(metricas.ler_coletor(nome) or {}))
+        for nome, (situacao, duracao) in resumo.items()
+    }
+
+    # ==============================================================================
+    # 2. RESUMO
+    # ==============================================================================
+    print("\n" + "="*80)
+    print("RESUMO DA COLETA")
+    print("="*80)
+    for nome, (situacao, duracao) in resumo.items():
+        arquivo = FONTES[nome][1]
+        linha = f"  {nome:<12} {arquivo:<20} {situacao:<18} {duracao:7.1f}s"
+        medidas = coletores[nome]
+        if 'http' in medidas:
+            espera = sum(medidas['esperas_s'].values())
+            linha += (f"  {medidas['http']['requisicoes']:>4} req  {espera:6.1f}s em espera  "
+                      f"{medidas['registros']['recebidos']:>6} recebidos  "
+                      f"{medidas['registros']['descartados']:>5} descartados")
+        print(linha)
+
+    atualizados = [nome for nome, (situacao, _) in resumo.items() if situacao == 'ATUALIZADO']
+    print(f"\n{len(atualizados)} de {len(resumo)} datasets atualizados.")
+
+    # ==============================================================================
+    # 3. TRANSFORMAÇÃO (agregados prontos para o dashboard)
+    # ==============================================================================
+    print()
+    inicio_etapa = time.monotonic()
+    resumo_dashboard.main()
+    etapas['resumo_dashboard'] = time.monotonic() - inicio_etapa
+
+    # Séries mensais de todo o histórico: saem dos agregados diários (O(dias)),
+    # mantidos pelo banco a cada gravação dos coletores
+    inicio_etapa = time.monotonic()
+    con = armazenamento.conectar()
+    try:
+        armazenamento.exportar(con, 'tendencias.json')
+        etapas['tendencias'] = time.monotonic() - inicio_etapa
+
+        # Índice estático da página de análise: só os shards com CVEs gravadas nesta execução
+        inicio_etapa = time.monotonic()
+        shards, alterados = armazenamento.exportar_indice_cves(con)
+        print(f"Índice de CVEs: {shards} shard(s) regerado(s), {alterados} arquivo(s) alterado(s).")
+        etapas['indice_cves'] = time.monotonic() - inicio_etapa
+
+        if args.busca_cves:
+            inicio_etapa = time.monotonic()
+            documentos, vocabulario, shards = busca_cves.construir(armazenamento.consultar_descricoes_cves(con))
+            print(f"Busca textual: {documentos} CVEs, {vocabulario} termos em {shards} shards.")
+            etapas['busca_cves'] = time.monotonic() - inicio_etapa
+    finally:
+        armazenamento.fechar(con)
+
+    # ==============================================================================
+    # 4. PUBLICAÇÃO (cópias com hash de conteúdo + manifest.json para o site)
+    # ==============================================================================
+    print()
+    inicio_etapa = time.monotonic()
+    publicacao.main()
+    etapas['publicacao'] = time.monotonic() - inicio_etapa
+
+    # ==============================================================================
+    # 5. DECISÃO (commit e deploy só quando algum dado mudou de fato)
+    # ==============================================================================
+    alterados = gravar_decisao(antes)
+    print()
+    if alterados:
+        print(f"{len(alterados)} arquivo(s) com conteúdo novo: {', '.join(alterados)}")
+    else:
+        print("Nenhum dado mudou nesta execução: nada a commitar nem publicar.")
+    print(f"Decisão gravada em '{CAMINHO_DECISAO}'.")
+
+    # ==============================================================================
+    # 6. MÉTRICAS (tempos, requisições, esperas e registros de cada etapa)
+    # ==============================================================================
+    metricas.gravar_execucao({
+        'inicio': inicio_execucao,
+        'duracao_s': round(time.monotonic() - inicio, 3),
+        'mudou': bool(alterados),
+        'etapas_s': {nome: round(segundos, 3) for nome, segundos in etapas.items()},
+        'totais': metricas.totais(coletores),
+        'coletores': coletores,
+    }, historico=args.historico_metricas)
+    print(f"Métricas gravadas em '{metricas.CAMINHO_EXECUCAO}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Etapa de publicação: cópias com hash de conteúdo, pré-comprimidas, e o manifest.json
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+
+import formato_colunar
+from exportacao import salvar_bytes, salvar_json
+
+# Opcional: sem ele, publicamos apenas as cópias .gz. Só é importado quando
+# há algo novo para comprimir (ver comprimir)
+TEM_BROTLI = importlib.util.find_spec("brotli") is not None
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+PASTA_SITE = "site"
+PASTA_PUBLICADO = "publicado"  # dentro de site/
+CAMINHO_MANIFESTO = os.path.join(PASTA_SITE, "manifest.json")
+
+DATASETS = ["cve_kpis.json", "otx_kpis.json", "paises_kpis.json", "hibp_kpis.json"]
+ARQUIVOS = (DATASETS
+            + [formato_colunar.nome_colunar(nome) for nome in DATASETS]
+            + ["dashboard_summary.json", "ips_blacklist.json", "mapa_paises.json", "tendencias.json"])
+
+TAMANHO_HASH = 12
+
+# Variantes pré-comprimidas geradas ao lado de cada cópia
+EXTENSOES = [".gz"] + ([".br"] if TEM_BROTLI else [])
+
+
+def hash_conteudo(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()[:TAMANHO_HASH]
+
+
+def nome_com_hash(nome_arquivo, hash_):
+    # 'cve_kpis.json' -> 'cve_kpis.<hash>.json'
+    base, extensao = os.path.splitext(nome_arquivo)
+    return f"{base}.{hash_}{extensao}"
+
+
+def comprimir(conteudo, extensao):
+    if extensao == ".br":
+        import brotli
+        return brotli.compress(conteudo, quality=11)
+    # mtime=0: o mesmo conteúdo gera sempre o mesmo .gz
+    return gzip.compress(conteudo, compresslevel=9, mtime=0)
+
+
+def carregar_manifesto(caminho=CAMINHO_MANIFESTO):
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f).get('arquivos', {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+# ==============================================================================
+# 1. PUBLICAÇÃO
+# ==============================================================================
+def publicar_arquivo(pasta_site, nome_arquivo):
+    with open(os.path.join(pasta_site, nome_arquivo), "rb") as f:
+        conteudo = f.read()
+
+    hash_ = hash_conteudo(conteudo)
+    nome_publicado = nome_com_hash(nome_arquivo, hash_)
+    destino = os.path.join(pasta_site, PASTA_PUBLICADO, nome_publicado)
+
+    # Conteúdo igual => mesmo nome: só gravamos o que ainda não existe
+    if not os.path.exists(destino):
+        salvar_bytes(destino, conteudo)
+    entrada = {"url": f"{PASTA_PUBLICADO}/{nome_publicado}", "hash": hash_, "bytes": len(conteudo)}
+    for extensao in EXTENSOES:
+        variante = destino + extensao
+        if not os.path.exists(variante):
+            salvar_bytes(variante, comprimir(conteudo, extensao))
+        entrada[extensao.lstrip(".")] = os.path.getsize(variante)
+    return entrada
+
+
+def remover_obsoletos(pasta, manter):
+    """
+    Apaga as cópias que não estão em 'manter' (nomes sem a extensão de compressão).
+    """
+    if not os.path.isdir(pasta):
+        return 0
+    removidos = 0
+    for nome in os.listdir(pasta):
+        if nome.startswith(".tmp-"):
+            continue
+        base = nome[:-3] if nome.endswith((".gz", ".br")) else nome
+        if base not in manter:
+            os.remove(os.path.join(pasta, nome))
+            removidos += 1
+    return removidos
+
+
+def publicar(pasta_site=PASTA_SITE):
+    """
+    Publica os arquivos de dados existentes e grava o manifest.json.
+    Retorna o dicionário de arquivos do manifesto.
+    """
+    caminho_manifesto = os.path.join(pasta_site, "manifest.json")
+    anterior = carregar_manifesto(caminho_manifesto)
+
+    arquivos = {}
+    for nome_arquivo in ARQUIVOS:
+        if os.path.exists(os.path.join(pasta_site, nome_arquivo)):
+            arquivos[nome_arquivo] = publicar_arquivo(pasta_site, nome_arquivo)
+
+    # As cópias do manifesto anterior ficam mais uma rodada: quem abriu a página
+    # antes da atualização ainda consegue baixá-las. No CI, site/publicado/ e o
+    # manifesto (fora do git) vêm do actions/cache da execução anterior
+    manter = {os.path.basename(e['url']) for e in list(arquivos.values()) + list(anterior.values())}
+    remover_obsoletos(os.path.join(pasta_site, PASTA_PUBLICADO), manter)
+
+    # Sem data/hora: o manifesto só muda quando algum arquivo muda
+    salvar_json(caminho_manifesto, {"arquivos": arquivos}, indent=2)
+    return arquivos
+
+
+def main(argv=None):
+    print("--- PUBLICAÇÃO: CÓPIAS COM HASH E PRÉ-COMPRIMIDAS ---")
+    if not TEM_BROTLI:
+        print("AVISO: módulo 'brotli' não instalado; gerando apenas as cópias .gz.")
+
+    arquivos = publicar()
+    print(f"{'arquivo':<26} {'bytes':>10} {'gzip':>9} {'brotli':>9}")
+    for nome_arquivo, entrada in arquivos.items():
+        br = f"{entrada['br']:>9,}" if 'br' in entrada else f"{'-':>9}"
+        print(f"{nome_arquivo:<26} {entrada['bytes']:>10,} {entrada['gz']:>9,} {br}")
+    print(f"Arquivo 'manifest.json' gerado com {len(arquivos)} arquivos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Etapa de transformação: pré-agrega os KPIs do dashboard por período
+import json
+import os
+from collections import Counter
+from datetime import date, timedelta
+
+from exportacao import salvar_json
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+PASTA_SITE = "site"
+CAMINHO_SAIDA = os.path.join(PASTA_SITE, "dashboard_summary.json")
+
+# Mesmos valores do <select id="period-filter"> do index.html
+PERIODOS = {'30d': 30, '90d': 90, '1ano': 365}
+
+SEVERIDADES = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'NONE']
+TOP_TIPOS = 6
+TOP_GERAL = 5
+
+
+def carregar(nome_arquivo):
+    try:
+        with open(os.path.join(PASTA_SITE, nome_arquivo), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"AVISO: não foi possível ler '{nome_arquivo}': {e}")
+        return []
+
+
+def data_valida(valor):
+    """
+    Devolve a data 'YYYY-MM-DD' do registro ou None ('N/A', nulo, etc.).
+    """
+    if not isinstance(valor, str):
+        return None
+    valor = valor[:10]
+    try:
+        date.fromisoformat(valor)
+        return valor
+    except ValueError:
+        return None
+
+
+def top(contador, n):
+    # most_common mantém a ordem de inserção nos empates, como o sort estável do JS
+    return dict(contador.most_common(n))
+
+
+# ==============================================================================
+# 1. AGREGAÇÕES (as mesmas que o script.js fazia no navegador)
+# ==============================================================================
+def agregar_cve(registros, corte):
+    filtrados = [r for r in registros if (data_valida(r.get('data_publicacao')) or '') > corte]
+
+    severidade = Counter({s: 0 for s in SEVERIDADES})
+    severidade.update(r['severidade'] for r in filtrados if r.get('severidade') in severidade)
+
+    criticas_por_dia = Counter(r['data_publicacao'] for r in filtrados if r.get('severidade') == 'CRITICAL')
+
+    tipos = Counter(r.get('tipo_falha') or 'Outros' for r in filtrados)
+    del tipos['Outros']
+
+    return {
+        'total': len(filtrados),
+        'severidade': dict(severidade),
+        'criticas_por_dia': dict(sorted(criticas_por_dia.items())),
+        'top_tipos': top(tipos, TOP_TIPOS),
+    }
+
+
+def agregar_hibp(registros, corte):
+    filtrados = [r for r in registros if (data_valida(r.get('data_vazamento')) or '') > corte]
+    mais_contas = sorted(filtrados, key=lambda r: r.get('contas_afetadas') or 0, reverse=True)[:TOP_GERAL]
+
+    return {
+        'total_contas': sum(r.get('contas_afetadas') or 0 for r in filtrados),
+        'top_vazamentos': [{
+            'nome_vazamento': r.get('nome_vazamento'),
+            'data_vazamento': data_valida(r.get('data_vazamento')),
+            'setor': r.get('setor'),
+            'contas_afetadas': r.get('contas_afetadas') or 0,
+        } for r in mais_contas],
+    }
+
+
+def agregar_otx(registros, corte):
+    ameacas, setores = Counter(), Counter()
+    for pulso in registros:
+        if (data_valida(pulso.get('data_criacao')) or '') <= corte:
+            continue
+        ameacas.update(t.lower().strip() for t in pulso.get('ameacas') or [])
+        setores.update(s.strip() for s in pulso.get('setores') or [])
+
+    return {
+        'top_ameacas': top(ameacas, TOP_GERAL),
+        'top_setores': top(setores, TOP_GERAL),
+    }
+
+
+def agregar_paises(registros, corte):
+    paises = Counter(r['pais'].strip() for r in registros
+                     if r.get('pais') and (data_valida(r.get('data_report')) or '') > corte)
+    return {'top_paises': top(paises, TOP_GERAL)}
+
+
+# ==============================================================================
+# 2. GERAÇÃO DO RESUMO
+# ==============================================================================
+def gerar_resumo(cves, vazamentos, pulsos, ips, ancora=None):
+    """
+    Os períodos terminam na 'ancora': por padrão, a data do registro mais
+    recente (não a data de hoje). Assim o resumo só muda quando os dados mudam,
+    e as janelas "últimos N dias" continuam certas num dia sem novo deploy.
+    """
+    # Data mais recente entre todos os datasets ("Última atualização" do cabeçalho)
+    datas = [data_valida(r.get('data_publicacao')) for r in cves]
+    datas += [data_valida(r.get('data_vazamento')) for r in vazamentos]
+    datas += [data_valida(r.get('data_criacao')) for r in pulsos]
+    datas += [data_valida(r.get('data_report')) for r in ips]
+    datas = [d for d in datas if d]
+    ultima_data = max(datas) if datas else None
+    if ancora is None:
+        ancora = date.fromisoformat(ultima_data) if ultima_data else date.today()
+
+    periodos = {}
+    for nome, dias in PERIODOS.items():
+        # O navegador usava "data >= agora - N dias": só entram os dias depois do corte
+        corte = (ancora - timedelta(days=dias)).isoformat()
+        periodos[nome] = {
+            'cve': agregar_cve(cves, corte),
+            'hibp': agregar_hibp(vazamentos, corte),
+            'otx': agregar_otx(pulsos, corte),
+            'paises': agregar_paises(ips, corte),
+        }
+
+    # Sem data/hora de geração: mesmos dados => mesmo arquivo
+    return {
+        'ultima_data': ultima_data,  # também a âncora dos períodos
+        'periodos': periodos,
+    }
+
+
+def main(argv=None):
+    print("--- TRANSFORMAÇÃO: GERANDO 'dashboard_summary.json' ---")
+
+    resumo = gerar_resumo(
+        carregar("cve_kpis.json"),
+        carregar("hibp_kpis.json"),
+        carregar("otx_kpis.json"),
+        carregar("paises_kpis.json"),
+    )
+
+    try:
+        salvar_json(CAMINHO_SAIDA, resumo)
+        print(f"Arquivo 'dashboard_summary.json' gerado com sucesso ({os.path.getsize(CAMINHO_SAIDA) / 1024:.1f} KB).")
+    except Exception as e:
+        print(f"Erro ao salvar arquivo JSON: {e}")
+
+
+if __name__ == "__main__":
+    main()
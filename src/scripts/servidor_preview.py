@@ -0,0 +1,136 @@
+# Servidor local de preview do site: serve as variantes pré-comprimidas com ETag e Cache-Control
+import argparse
+import hashlib
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from publicacao import PASTA_PUBLICADO
+
+# Ordem de preferência das variantes geradas pelo publicacao.py
+CODIFICACOES = [("br", ".br"), ("gzip", ".gz")]
+
+# Arquivos com hash no nome nunca mudam; o resto precisa ser revalidado
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+
+def codificacoes_aceitas(cabecalho):
+    """
+    Lê o Accept-Encoding ('gzip, br;q=0.5, deflate;q=0') e devolve as aceitas.
+    """
+    aceitas = set()
+    for parte in (cabecalho or "").split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        qualidade = parametros.strip()
+        if qualidade.startswith("q="):
+            try:
+                if float(qualidade[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if nome:
+            aceitas.add(nome.strip().lower())
+    return aceitas
+
+
+class Estatisticas:
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.respostas = 0
+        self.nao_modificados = 0
+        self.bytes_originais = 0
+        self.bytes_enviados = 0
+
+    def registrar(self, originais, enviados, nao_modificado=False):
+        with self.trava:
+            self.respostas += 1
+            self.nao_modificados += nao_modificado
+            self.bytes_originais += originais
+            self.bytes_enviados += enviados
+
+    def imprimir(self):
+        economia = 100 * (1 - self.bytes_enviados / self.bytes_originais) if self.bytes_originais else 0
+        print(f"\n{self.respostas} respostas ({self.nao_modificados} '304 Not Modified'): "
+              f"{self.bytes_enviados / 1024:.1f} KB enviados de {self.bytes_originais / 1024:.1f} KB "
+              f"sem compressão/cache ({economia:.1f}% de economia).")
+
+
+class ManipuladorPreview(SimpleHTTPRequestHandler):
+    estatisticas = Estatisticas()
+
+    def do_GET(self):
+        self.responder(com_corpo=True)
+
+    def do_HEAD(self):
+        self.responder(com_corpo=False)
+
+    def responder(self, com_corpo):
+        caminho = self.translate_path(self.path)
+        if os.path.isdir(caminho):
+            caminho = os.path.join(caminho, "index.html")
+        if not os.path.isfile(caminho):
+            self.send_error(404, "Arquivo não encontrado")
+            return
+
+        # Escolhe a melhor variante pré-comprimida que o navegador aceita
+        aceitas = codificacoes_aceitas(self.headers.get("Accept-Encoding"))
+        codificacao, arquivo = None, caminho
+        for nome, extensao in CODIFICACOES:
+            if nome in aceitas and os.path.isfile(caminho + extensao):
+                codificacao, arquivo = nome, caminho + extensao
+                break
+
+        with open(arquivo, "rb") as f:
+            conteudo = f.read()
+        tamanho_original = os.path.getsize(caminho)
+
+        imutavel = os.path.basename(os.path.dirname(caminho)) == PASTA_PUBLICADO
+        # Cada variante tem seu próprio ETag (o corpo enviado é diferente)
+        etag = f'"{hashlib.sha256(conteudo).hexdigest()[:16]}"'
+
+        if etag in [e.strip() for e in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.enviar_cabecalhos_cache(etag, imutavel)
+            self.end_headers()
+            self.estatisticas.registrar(tamanho_original, 0, nao_modificado=True)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(caminho))
+        self.send_header("Content-Length", str(len(conteudo)))
+        if codificacao:
+            self.send_header("Content-Encoding", codificacao)
+        self.enviar_cabecalhos_cache(etag, imutavel)
+        self.end_headers()
+        if com_corpo:
+            self.wfile.write(conteudo)
+        self.estatisticas.registrar(tamanho_original, len(conteudo) if com_corpo else 0)
+
+    def enviar_cabecalhos_cache(self, etag, imutavel):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", CACHE_IMUTAVEL if imutavel else CACHE_REVALIDAR)
+        self.send_header("Vary", "Accept-Encoding")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve o site/ localmente com as variantes pré-comprimidas.")
+    parser.add_argument('--pasta', default="site")
+    parser.add_argument('--porta', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    manipulador = partial(ManipuladorPreview, directory=args.pasta)
+    servidor = ThreadingHTTPServer(("127.0.0.1", args.porta), manipulador)
+    print(f"Servindo '{args.pasta}' em http://127.0.0.1:{args.porta}/ (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        ManipuladorPreview.estatisticas.imprimir()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Tabela ISO-3166-1 embutida no repositório: nomes em PT/EN e centroide de cada país
+import csv
+import os
+
+# ==============================================================================
+# 0. CONFIGURAÇÃO
+# ==============================================================================
+# 249 códigos oficiais + XK (Kosovo), que as bases de IP usam. Coordenadas são
+# centroides aproximados, suficientes para posicionar um ponto no mapa mundial
+CAMINHO_TABELA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paises_iso3166.csv")
+
+_TABELA = None
+
+
+def carregar_tabela():
+    """
+    Retorna {codigo: {"nome_en", "nome_pt", "lat", "lon"}}. O CSV é lido uma única vez.
+    """
+    global _TABELA
+    if _TABELA is None:
+        with open(CAMINHO_TABELA, "r", encoding="utf-8", newline="") as f:
+            _TABELA = {
+                linha['codigo']: {
+                    "nome_en": linha['nome_en'],
+                    "nome_pt": linha['nome_pt'],
+                    "lat": float(linha['latitude']),
+                    "lon": float(linha['longitude']),
+                }
+                for linha in csv.DictReader(f)
+            }
+    return _TABELA
+
+
+def nome_en(codigo):
+    # Códigos fora da tabela (ex.: 'EU', 'AP' de bases antigas) ficam como vieram
+    pais = carregar_tabela().get(codigo)
+    return pais['nome_en'] if pais else codigo
+
+
+def linha_mapa(codigo, ips):
+    """
+    Uma linha do mapa_paises.json. Código desconhecido: sem coordenadas (o mapa o ignora).
+    """
+    pais = carregar_tabela().get(codigo)
+    if pais is None:
+        return {"codigo": codigo, "nome_pt": codigo, "nome_en": codigo, "lat": None, "lon": None, "ips": ips}
+    return {"codigo": codigo, "nome_pt": pais['nome_pt'], "nome_en": pais['nome_en'],
+            "lat": pais['lat'], "lon": pais['lon'], "ips": ips}
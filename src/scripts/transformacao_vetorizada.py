@@ -0,0 +1,67 @@
+# Transformação em lote (NumPy/pandas) dos pulsos da OTX
+import importlib.util
+import os
+from datetime import datetime
+
+# Opcional: a saída é idêntica à de coletor_otx.transformar_pulso. pandas/NumPy
+# só são importados quando um lote é de fato transformado
+TEM_PANDAS = importlib.util.find_spec("pandas") is not None
+
+FORMATO_DATA_OTX = "%Y-%m-%dT%H:%M:%S"
+
+# As CVEs da NVD seguem registro a registro: quase todo o custo está em
+# percorrer o JSON aninhado (métricas, descrições, CWEs, referências), que é
+# Python puro nos dois caminhos, e o lote só somava as conversões de colunas
+# (0,8x do caminho escalar em páginas de 2000 CVEs no bench_transformacao)
+
+
+def ativo():
+    # Ligado pelo orquestrador (--vetorizado) ou pela variável de ambiente; sem pandas, nunca
+    return os.getenv("AEGIS_VETORIZADO") == "1" and TEM_PANDAS
+
+
+# ==============================================================================
+# 1. PULSOS (OTX)
+# ==============================================================================
+def _data_escalar(criado):
+    try:
+        return datetime.strptime(criado.split('.')[0], FORMATO_DATA_OTX)
+    except Exception:
+        return None
+
+
+def transformar_pulsos(pulsos):
+    """
+    Mesmo resultado de [coletor_otx.transformar_pulso(p) for p in pulsos]:
+    (registro, data_pulso) ou None para cada pulso.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if not pulsos:
+        return []
+    criados = [p.get('created', '') for p in pulsos]
+    textos = [c.split('.')[0] if type(c) is str else '' for c in criados]
+    # Um to_datetime de formato fixo para o lote, em vez de um strptime por pulso
+    datas = pd.to_datetime(textos, format=FORMATO_DATA_OTX, errors='coerce').to_numpy().astype('datetime64[us]')
+    # O pandas aceita o que o strptime recusa (ex.: segundo 60, que vira o
+    # minuto seguinte): só vale a data que, escrita de volta, é o mesmo texto
+    conferidas = np.datetime_as_string(datas, unit='s') == np.array(textos, dtype=str)
+
+    resultado = []
+    for pulso, criado, data, conferida in zip(pulsos, criados, datas.tolist(), conferidas.tolist()):
+        # O resto (texto sem zeros à esquerda, data fora da faixa do pandas,
+        # lixo) é raro e passa pelo strptime, como no caminho escalar
+        data_pulso = data if conferida else _data_escalar(criado)
+        if data_pulso is None:
+            resultado.append(None)
+            continue
+        resultado.append(({
+            "pulso_id": pulso.get('id'),
+            "data_criacao": criado.split('T')[0],
+            "modificado_em": pulso.get('modified'),
+            "setores": pulso.get('industries', []),
+            "ameacas": pulso.get('tags', []),
+            "paises": pulso.get('countries', []),
+        }, data_pulso))
+    return resultado